@@ -0,0 +1,35 @@
+import sqlite3
+import os
+
+# Database path
+DB_PATH = "labsynk.db"
+
+def add_links_stamp_column():
+    if not os.path.exists(DB_PATH):
+        print(f"Database not found at {DB_PATH}")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        # Check if column exists
+        cursor.execute("PRAGMA table_info(vlab_experiments)")
+        columns = [info[1] for info in cursor.fetchall()]
+        
+        if "links_stamp" in columns:
+            print("Column 'links_stamp' already exists in 'vlab_experiments' table.")
+        else:
+            print("Adding 'links_stamp' column to 'vlab_experiments' table...")
+            cursor.execute("ALTER TABLE vlab_experiments ADD COLUMN links_stamp TEXT")
+            conn.commit()
+            print("Successfully added 'links_stamp' column.")
+            
+    except Exception as e:
+        print(f"Error: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    add_links_stamp_column()
@@ -0,0 +1,135 @@
+"""
+Recall and latency of the MinHash/LSH Stage 3 backend against the
+exhaustive scan, on the bundled catalogue and on synthetic catalogues grown
+to larger sizes (see workload.make_catalogue).
+
+    cd backend && python benchmarks/bench_lsh.py \
+        [--sizes 0,10000,50000] [--queries 500] [--configs 32x2,16x3] \
+        [--seed 42] [--out lsh.json]
+
+A size of 0 is the bundled catalogue as-is. For every catalogue and every
+bands×rows config, each workload query runs Stage 3 against two pools —
+the one its subject resolves to and the whole catalogue (the fallback
+pool, the case LSH is for) — through both _scan_experiment and
+_lsh_experiment. Reported per pool:
+
+  recall      share of queries the scan matched for which LSH returns the
+              same entry (LSH never matches where the scan does not)
+  exact_ms    scan latency; lsh_ms LSH latency (candidates + re-rank)
+  candidates  names returned by the index per query
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import vlabs_matcher as m
+from benchmarks.bench_matcher import summarize
+from benchmarks.workload import make_catalogue, make_workload
+
+
+def run_pool(cat, lsh, queries):
+    """queries: [(topic, pool)] → recall, latencies and candidate counts."""
+    clock = time.perf_counter
+    exact_t, lsh_t, cands = [], [], []
+    found = agree = 0
+    for topic, pool in queries:
+        t0 = clock()
+        expected = m._scan_experiment(pool, topic, 0.30, cat)
+        t1 = clock()
+        got = m._lsh_experiment(lsh, pool, topic, 0.30, cat)
+        t2 = clock()
+        exact_t.append(t1 - t0)
+        lsh_t.append(t2 - t1)
+        q_norm, q_ids, _ = m._prepare_query(topic, cat)
+        cands.append(len(lsh[0].candidates(m._words(q_norm), q_ids)))
+        if expected is not None:
+            found += 1
+            agree += got is expected
+    return {
+        "recall": round(agree / found, 4) if found else 1.0,
+        "matched": found,
+        "exact_ms": summarize(exact_t, 1000),
+        "lsh_ms": summarize(lsh_t, 1000),
+        "candidates": summarize(cands),
+    }
+
+
+def run_size(n, n_queries, configs, seed):
+    if n:
+        data = make_catalogue(n, seed)
+        cat = m._Catalogue(m._build_index(data), version=f"synthetic-{n}-{seed}")
+    else:
+        m.warm_up()
+        cat = m._catalogue
+    workload = make_workload(n_queries, seed)
+    everything = {}
+    for labs in cat.index.values():
+        for lab, entries in labs.items():
+            everything.setdefault(lab, entries)
+
+    runs = []
+    for bands, rows in configs:
+        start = time.perf_counter()
+        lsh = m._build_lsh_index(cat, bands, rows)
+        build_s = time.perf_counter() - start
+        subject = [(topic, m._resolve_subject(subj, cat)) for topic, subj, _ in workload]
+        runs.append({
+            "bands": bands,
+            "rows": rows,
+            "build_s": round(build_s, 3),
+            "subject_pool": run_pool(cat, lsh, subject),
+            "full_pool": run_pool(cat, lsh, [(topic, everything) for topic, _, _ in workload]),
+        })
+    return {"catalogue_experiments": cat.experiment_count(), "queries": n_queries, "configs": runs}
+
+
+def print_run(run):
+    print(f"\n── {run['catalogue_experiments']} experiments, {run['queries']} queries")
+    for c in run["configs"]:
+        print(f"  {c['bands']}×{c['rows']}  build {c['build_s']:.2f}s")
+        for pool in ("subject_pool", "full_pool"):
+            p = c[pool]
+            print(f"    {pool:<12} recall {p['recall']:.1%} of {p['matched']}  "
+                  f"exact {p['exact_ms']['mean']:7.3f} / p95 {p['exact_ms']['p95']:7.3f} ms  "
+                  f"lsh {p['lsh_ms']['mean']:7.3f} / p95 {p['lsh_ms']['p95']:7.3f} ms  "
+                  f"candidates {p['candidates']['mean']:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="0,10000,50000",
+                        help="comma-separated catalogue sizes (0 = bundled catalogue)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--configs", default="32x2,16x3",
+                        help="comma-separated LSH bands×rows, e.g. 32x2,16x3")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    configs = [tuple(int(x) for x in c.split("x")) for c in args.configs.split(",") if c.strip()]
+    runs = []
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        run = run_size(n, args.queries, configs, args.seed)
+        print_run(run)
+        runs.append(run)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "meta": {
+                    "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "seed": args.seed,
+                },
+                "runs": runs,
+            }, f, indent=2)
+        print(f"\n✅ Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Matcher benchmark suite — per-stage latency, throughput, candidates scored
+and peak memory of services/vlabs_matcher.py on synthetic syllabus
+workloads (see workload.py for how topics and subjects are generated).
+
+    cd backend && python benchmarks/bench_matcher.py \
+        [--sizes 100,1000,10000] [--seed 42] [--out run.json] \
+        [--compare baseline.json] [--tolerance 0.25]
+
+For every workload size it runs:
+  pipeline — Stage 1, 2 and 3 called per query with no result cache, timed
+             per stage (this is what find_vlabs_link costs on a cache miss),
+             with exact score evaluations and fallbacks read from the stage
+             trace (see vlabs_matcher.matcher_stats)
+  batch    — find_vlabs_links_batch per subject group from a cold cache, as
+             the routers call it, timed and then re-run under tracemalloc
+
+Results are written as JSON ({"meta": {...}, "runs": [...]}) so runs from
+different commits can be compared; --compare prints the change in stage
+latencies against a saved run and exits 1 if any p95 grew by more than
+--tolerance (a fraction).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import vlabs_matcher as m
+from benchmarks.workload import make_workload
+
+STAGES = ("discipline", "lab", "experiment")
+
+
+def summarize(values, scale=1.0):
+    """mean / p50 / p95 / max of values (times scale), rounded for JSON."""
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "mean": round(sum(ordered) / len(ordered) * scale, 4),
+        "p50": round(pick(0.50) * scale, 4),
+        "p95": round(pick(0.95) * scale, 4),
+        "max": round(ordered[-1] * scale, 4),
+    }
+
+
+def run_pipeline(cat, workload):
+    """Per-query stage timings, score evaluations, pool sizes and fallback flags."""
+    times = {stage: [] for stage in STAGES}
+    scored = {stage: [] for stage in STAGES}
+    by_kind = {}
+    pools, disc_fallback, lab_fallback, matched = [], 0, 0, 0
+    clock = time.perf_counter
+
+    for topic, subject, kind in workload:
+        trace = {}
+        t0 = clock()
+        discs = m._match_discipline(subject, cat=cat, trace=trace)
+        t1 = clock()
+        labs = m._match_labs(discs, subject, cat=cat, trace=trace)
+        t2 = clock()
+        entry = m._match_experiments(labs, [topic], cat=cat, trace=trace)[0]
+        t3 = clock()
+
+        times["discipline"].append(t1 - t0)
+        times["lab"].append(t2 - t1)
+        times["experiment"].append(t3 - t2)
+        for stage in STAGES:
+            scored[stage].append(trace.get(f"{stage}_scored", 0))
+        by_kind.setdefault(kind, []).append(t3 - t0)
+        pools.append(sum(len(es) for es in labs.values()))
+        disc_fallback += trace["discipline_fallback"]
+        lab_fallback += trace["lab_fallback"]
+        matched += entry is not None
+
+    total = [a + b + c for a, b, c in zip(*(times[s] for s in STAGES))]
+    n = len(workload)
+    return {
+        "stages_ms": {
+            **{stage: summarize(times[stage], 1000) for stage in STAGES},
+            "total": summarize(total, 1000),
+        },
+        "by_kind_ms": {kind: summarize(v, 1000) for kind, v in sorted(by_kind.items())},
+        "pipeline_qps": round(n / max(sum(total), 1e-9), 1),
+        "candidates_scored": {stage: summarize(scored[stage]) for stage in STAGES},
+        "pool_size": summarize(pools),
+        "fallback_rate": {
+            "discipline": round(disc_fallback / n, 4),
+            "lab": round(lab_fallback / n, 4),
+        },
+        "match_rate": round(matched / n, 4),
+    }
+
+
+def run_batch(workload):
+    """find_vlabs_links_batch per subject group from a cold cache."""
+    groups = {}
+    for topic, subject, _ in workload:
+        groups.setdefault(subject, []).append(topic)
+
+    def once():
+        m.clear_match_cache()
+        start = time.perf_counter()
+        for subject, topics in groups.items():
+            m.find_vlabs_links_batch(topics, subject)
+        return time.perf_counter() - start
+
+    elapsed = once()
+    tracemalloc.start()
+    try:
+        once()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    m.clear_match_cache()
+    return {
+        "batch_qps": round(len(workload) / max(elapsed, 1e-9), 1),
+        "subjects": len(groups),
+        "peak_traced_kb": round(peak / 1024, 1),
+    }
+
+
+def run_size(n, seed):
+    cat = m._catalogue
+    workload = make_workload(n, seed)
+    pipeline = run_pipeline(cat, workload)
+    batch = run_batch(workload)
+    kinds = {}
+    for _, _, kind in workload:
+        kinds[kind] = kinds.get(kind, 0) + 1
+    return {
+        "n_topics": n,
+        "mix": kinds,
+        "stages_ms": pipeline["stages_ms"],
+        "by_kind_ms": pipeline["by_kind_ms"],
+        "throughput_qps": {"pipeline": pipeline["pipeline_qps"], "batch": batch["batch_qps"]},
+        "candidates_scored": pipeline["candidates_scored"],
+        "pool_size": pipeline["pool_size"],
+        "fallback_rate": pipeline["fallback_rate"],
+        "match_rate": pipeline["match_rate"],
+        "peak_memory_kb": {
+            "traced": batch["peak_traced_kb"],
+            # ru_maxrss is KiB on Linux, bytes on macOS; process-wide high-water mark
+            "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            // (1024 if sys.platform == "darwin" else 1),
+        },
+    }
+
+
+def print_run(run):
+    st = run["stages_ms"]
+    print(f"\n── {run['n_topics']} topics  {run['mix']}")
+    for stage in (*STAGES, "total"):
+        s = st[stage]
+        print(f"  {stage:<11} mean {s['mean']:8.3f}  p50 {s['p50']:8.3f}  "
+              f"p95 {s['p95']:8.3f}  max {s['max']:8.3f} ms")
+    for kind, s in run["by_kind_ms"].items():
+        print(f"  [{kind:<8}] mean {s['mean']:8.3f}  p95 {s['p95']:8.3f} ms")
+    cs = run["candidates_scored"]
+    print("  scored/query  " + "  ".join(f"{s} {cs[s]['mean']:.1f} (p95 {cs[s]['p95']:.0f})"
+                                         for s in STAGES))
+    print(f"  pool {run['pool_size']['mean']:.0f} avg / {run['pool_size']['max']:.0f} max, "
+          f"fallback disc {run['fallback_rate']['discipline']:.1%} "
+          f"lab {run['fallback_rate']['lab']:.1%}, matched {run['match_rate']:.1%}")
+    print(f"  throughput {run['throughput_qps']['pipeline']:.0f} q/s uncached, "
+          f"{run['throughput_qps']['batch']:.0f} q/s batched; "
+          f"peak traced {run['peak_memory_kb']['traced']:.0f} KiB, "
+          f"max RSS {run['peak_memory_kb']['max_rss']} KiB")
+
+
+def compare(runs, baseline_path, tolerance):
+    """Print stage latency changes vs. a saved run; return True if any p95 regressed."""
+    with open(baseline_path) as f:
+        baseline = {r["n_topics"]: r for r in json.load(f)["runs"]}
+    regressed = False
+    print(f"\n── vs. {baseline_path}")
+    for run in runs:
+        base = baseline.get(run["n_topics"])
+        if base is None:
+            continue
+        for stage in (*STAGES, "total"):
+            old, new = base["stages_ms"][stage]["p95"], run["stages_ms"][stage]["p95"]
+            change = (new - old) / old if old else 0.0
+            flag = ""
+            if change > tolerance:
+                flag, regressed = "  ⚠️  regression", True
+            print(f"  {run['n_topics']:>7} {stage:<11} p95 {old:8.3f} → {new:8.3f} ms "
+                  f"({change:+.1%}){flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        help="comma-separated workload sizes (up to 100000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="results JSON of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p95 growth before --compare fails")
+    args = parser.parse_args()
+
+    m.warm_up()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    runs = []
+    for n in sizes:
+        run = run_size(n, args.seed)
+        print_run(run)
+        runs.append(run)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": m._backend,
+            "catalogue_version": m._catalogue.version,
+            "catalogue_experiments": m._catalogue.experiment_count(),
+            "seed": args.seed,
+        },
+        "runs": runs,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n✅ Results written to {args.out}")
+    if args.compare and compare(runs, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Syllabus parser benchmark — serial vs. process-pool page parsing of
+synthetic syllabus PDFs (see syllabus_pdf.py for the layout), and
+incremental re-parsing of a revised PDF.
+
+    cd backend && python benchmarks/bench_parse.py \
+        [--pages 4,40,120] [--workers 1,2,4] [--repeat 3] [--out run.json]
+
+For every PDF size and worker count it reports the median wall time of
+parse_syllabus_with_pdfplumber, pages per second, the time until
+iter_syllabus_subjects yields its first subject (what a streaming upload
+waits for) and the speed-up against one worker. Worker counts above 1 use
+the parallel path only when the PDF has at least SYLLABUS_PARALLEL_MIN_PAGES
+pages; the shared pool is sized for the largest worker count (smaller counts
+keep fewer runs in flight) and warmed up before timing, as it is in a running
+server after the first large upload. Parallel runs are checked to return exactly
+the serial result. The page cache is cleared before every timed parse.
+
+It then re-parses each PDF with one page revised, on the serial path, and
+reports that time against the cold parse: only the changed page goes
+through layout analysis, the rest come from the page cache.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import settings
+from services import syllabus_service as s
+from benchmarks.syllabus_pdf import build_pdf, make_syllabus_pdf, syllabus_pages
+
+
+def time_parse(pdf, workers, repeat):
+    """(median seconds for a full parse, median seconds to first subject, result)."""
+    totals, firsts, result = [], [], None
+    for _ in range(repeat):
+        s._page_cache.clear()
+        start = time.perf_counter()
+        result = s.parse_syllabus_with_pdfplumber(pdf, workers=workers)
+        totals.append(time.perf_counter() - start)
+
+        s._page_cache.clear()
+        start = time.perf_counter()
+        subjects = s.iter_syllabus_subjects(pdf, workers=workers)
+        next(subjects, None)
+        firsts.append(time.perf_counter() - start)
+        subjects.close()
+    return statistics.median(totals), statistics.median(firsts), result
+
+
+def run(pages, workers_list, repeat):
+    runs = []
+    settings.SYLLABUS_PARSE_WORKERS = max(workers_list)   # the pool is sized once
+    for n_pages in pages:
+        pdf = make_syllabus_pdf(n_pages)
+        serial_time = serial_result = None
+        for workers in workers_list:
+            if workers > 1:
+                s.parse_syllabus_with_pdfplumber(pdf, workers=workers)   # warm the pool
+            total, first, result = time_parse(pdf, workers, repeat)
+            if workers == 1:
+                serial_time, serial_result = total, result
+            elif serial_result is not None and result != serial_result:
+                raise SystemExit(f"⚠️  {workers} workers changed the result for {n_pages} pages")
+            runs.append({
+                "pages": n_pages,
+                "workers": workers,
+                "parallel": workers > 1 and n_pages >= settings.SYLLABUS_PARALLEL_MIN_PAGES,
+                "total_s": round(total, 4),
+                "first_subject_s": round(first, 4),
+                "pages_per_sec": round(n_pages / max(total, 1e-9), 1),
+                "speedup": round(serial_time / total, 2) if serial_time else None,
+            })
+    return runs
+
+
+def run_revisions(pages, repeat):
+    """Cold parse vs. re-parse after one page (the middle one) changed."""
+    runs = []
+    for n_pages in pages:
+        original = syllabus_pages(n_pages)
+        changed = n_pages // 2
+        revised = list(original)
+        subject, code, topics = revised[changed]
+        revised[changed] = (subject, code, topics[::-1])
+        cold, warm = [], []
+        for _ in range(repeat):
+            s._page_cache.clear()
+            start = time.perf_counter()
+            s.parse_syllabus_with_pdfplumber(build_pdf(original), workers=1)
+            cold.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            s.parse_syllabus_with_pdfplumber(build_pdf(revised), workers=1)
+            warm.append(time.perf_counter() - start)
+        cold_s, warm_s = statistics.median(cold), statistics.median(warm)
+        runs.append({
+            "pages": n_pages,
+            "changed_pages": 1,
+            "cold_s": round(cold_s, 4),
+            "revised_s": round(warm_s, 4),
+            "speedup": round(cold_s / max(warm_s, 1e-9), 2),
+        })
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", default="4,40,120", help="comma-separated PDF sizes")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts (1 = serial)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    # Quiet the per-page progress lines
+    sys.stdout = open(os.devnull, "w")
+    try:
+        pages = [int(p) for p in args.pages.split(",") if p.strip()]
+        runs = run(pages, sorted({int(w) for w in args.workers.split(",") if w.strip()}),
+                   max(1, args.repeat))
+        revisions = run_revisions(pages, max(1, args.repeat))
+    finally:
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+
+    print(f"── {os.cpu_count()} CPU(s), parallel from {settings.SYLLABUS_PARALLEL_MIN_PAGES} pages")
+    for r in runs:
+        speedup = f"{r['speedup']:.2f}×" if r["speedup"] else "—"
+        print(f"  {r['pages']:>5} pages  {r['workers']} worker(s) {'(serial)' if not r['parallel'] else '':<9}"
+              f"{r['total_s'] * 1000:9.1f} ms  {r['pages_per_sec']:7.1f} pages/s  "
+              f"first {r['first_subject_s'] * 1000:7.1f} ms  speed-up {speedup}")
+    print("── one page revised, serial")
+    for r in revisions:
+        print(f"  {r['pages']:>5} pages  cold {r['cold_s'] * 1000:9.1f} ms  "
+              f"re-parse {r['revised_s'] * 1000:8.1f} ms  speed-up {r['speedup']:.1f}×")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "meta": {
+                    "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpus": os.cpu_count(),
+                    "parallel_min_pages": settings.SYLLABUS_PARALLEL_MIN_PAGES,
+                },
+                "runs": runs,
+                "revisions": revisions,
+            }, f, indent=2)
+        print(f"\n✅ Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
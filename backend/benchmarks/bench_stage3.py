@@ -0,0 +1,56 @@
+"""
+Stage 3 benchmark — branch-and-bound scan vs. exhaustive scoring.
+
+Scores topics against the full-catalogue fallback pool (every lab), which
+is the path taken for generic subjects such as "Lab Practice".
+
+    cd backend && python benchmarks/bench_stage3.py [n_topics]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import vlabs_matcher as m
+from benchmarks.workload import make_topics
+
+
+def exhaustive(labs, topic, threshold=0.30):
+    """Reference Stage 3: exact score for every entry, first max wins."""
+    query = m._prepare_query(topic)
+    best_score, best_entry = 0.0, None
+    for entries in labs.values():
+        for entry in entries:
+            s = m._score_prepared(query, m._intern_name(entry.get("experiment_name", "")))
+            if s > best_score:
+                best_score, best_entry = s, entry
+    return best_entry if best_entry and best_score >= threshold else None
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    m.warm_up()
+    all_labs = {}
+    for labs in m._catalogue.index.values():
+        all_labs.update(labs)
+    topics = make_topics(n)
+
+    t0 = time.perf_counter()
+    reference = [exhaustive(all_labs, t) for t in topics]
+    t1 = time.perf_counter()
+    bounded = [m._scan_experiment(all_labs, t, 0.30) for t in topics]
+    t2 = time.perf_counter()
+
+    mismatches = sum(a is not b for a, b in zip(reference, bounded))
+    pool = sum(len(es) for es in all_labs.values())
+    print(f"pool: {pool} experiments, topics: {n}")
+    print(f"exhaustive : {(t1 - t0) / n * 1000:8.2f} ms/topic")
+    print(f"bounded    : {(t2 - t1) / n * 1000:8.2f} ms/topic")
+    print(f"speedup    : {(t1 - t0) / max(t2 - t1, 1e-9):8.1f}x")
+    print(f"mismatches : {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Synthetic syllabus PDFs in the layout parse_syllabus_with_pdfplumber reads:
+one lab per page, the lab name as the first line, then a ruled two-column
+table with a "SUBJECT CODE: NNNNNNN" row and one "UNIT - N" row per
+experiment. Topics come from workload.make_topics, so they match (or
+deliberately miss) the bundled VLabs catalogue the same way benchmark
+topics do.
+
+The PDF is written by hand (Helvetica, no embedded fonts), so tests and
+benchmarks need nothing beyond the parser's own dependencies.
+"""
+import random
+from typing import List, Tuple
+
+from benchmarks.workload import HINT_SUBJECTS, FALLBACK_SUBJECTS, make_topics
+
+# A4 portrait, points
+_WIDTH, _HEIGHT = 595, 842
+_LEFT, _SPLIT, _RIGHT = 50, 180, 545
+_ROW = 24
+_MAX_TOPIC = 64
+
+
+def _pdf_string(text: str) -> str:
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _text(x: float, y: float, size: int, text: str) -> str:
+    return f"BT /F1 {size} Tf {x} {y} Td {_pdf_string(text)} Tj ET"
+
+
+def _page_stream(subject: str, code: str, topics: List[str]) -> bytes:
+    ops = [_text(_LEFT, _HEIGHT - 60, 14, subject)]
+    rows = [(f"SUBJECT CODE: {code}", "")] + [
+        (f"UNIT - {i}", topic[:_MAX_TOPIC]) for i, topic in enumerate(topics, 1)
+    ]
+    top = _HEIGHT - 90
+    for i, (left, right) in enumerate(rows):
+        y = top - (i + 1) * _ROW
+        ops.append(f"{_LEFT} {y} {_SPLIT - _LEFT} {_ROW} re S")
+        ops.append(f"{_SPLIT} {y} {_RIGHT - _SPLIT} {_ROW} re S")
+        ops.append(_text(_LEFT + 4, y + 8, 9, left))
+        if right:
+            ops.append(_text(_SPLIT + 4, y + 8, 9, right))
+    return "\n".join(ops).encode("latin-1")
+
+
+def build_pdf(pages: List[Tuple[str, str, List[str]]]) -> bytes:
+    """PDF bytes with one page per (subject, subject code, topics)."""
+    n = len(pages)
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page + content pair per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [" + " ".join(f"{4 + 2 * i} 0 R" for i in range(n))
+         + f"] /Count {n} >>").encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for i, page in enumerate(pages):
+        stream = _page_stream(*page)
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_WIDTH} {_HEIGHT}] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>").encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{off:010d} 00000 n \n" for off in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def syllabus_pages(n_pages: int, experiments_per_page: int = 10,
+                   seed: int = 42) -> List[Tuple[str, str, List[str]]]:
+    """(subject, subject code, topics) for n_pages labs, as build_pdf takes them."""
+    rnd = random.Random(seed)
+    topics = make_topics(n_pages * experiments_per_page, seed)
+    subjects = [s for s in HINT_SUBJECTS + FALLBACK_SUBJECTS if s]
+    pages = []
+    for i in range(n_pages):
+        subject = subjects[i % len(subjects)]
+        code = f"{2018500 + rnd.randrange(100)}"
+        pages.append((subject, code, topics[i * experiments_per_page:(i + 1) * experiments_per_page]))
+    return pages
+
+
+def make_syllabus_pdf(n_pages: int, experiments_per_page: int = 10, seed: int = 42) -> bytes:
+    """A syllabus of n_pages labs with experiments_per_page experiments each."""
+    return build_pdf(syllabus_pages(n_pages, experiments_per_page, seed))
@@ -0,0 +1,134 @@
+"""
+Reproducible synthetic syllabus workloads built from the bundled VLabs catalogue.
+
+Topics are catalogue experiment names reshaped the way syllabus PDFs phrase
+them (truncated, wrapped in "Write a program for ...", or generic lab words
+that match nothing). Subjects are drawn from three groups so every Stage 1/2
+path is exercised:
+
+  hint     — names that hit a DISCIPLINE_HINTS keyword (single discipline)
+  fuzzy    — lab names that go through fuzzy discipline/lab scoring
+  fallback — generic names that fall through to the all-disciplines /
+             all-labs pool (the expensive full-catalogue scans)
+
+make_catalogue() grows the catalogue itself to a given size with synthetic
+providers, for benchmarks of backends meant for much larger catalogues.
+
+All generators are deterministic for a given seed and catalogue.
+"""
+import random
+from typing import Dict, List, Tuple
+
+from services import vlabs_matcher as m
+
+HINT_SUBJECTS = [
+    "Data Structures Lab", "Computer Networks", "Database Management Systems",
+    "Analog Electronics", "Digital Signal Processing", "Electrical Machines",
+    "Fluid Mechanics Lab", "Heat Transfer", "Concrete Technology",
+    "Engineering Physics", "Organic Chemistry Lab", "Microbiology",
+]
+
+FALLBACK_SUBJECTS = [
+    "", "Lab Practice", "Project Work", "General Proficiency",
+    "Skill Development", "Mini Project", "Seminar",
+]
+
+_NOISE_WORDS = ["verify", "measure", "xyzzy", "lab", "practical",
+                "characteristics", "analysis", "circuit"]
+
+
+def _experiment_names() -> List[str]:
+    m.warm_up()
+    return sorted({e.get("experiment_name", "")
+                   for labs in m._catalogue.index.values()
+                   for es in labs.values() for e in es})
+
+
+def _lab_subject(lab: str) -> str:
+    """A lab name as a syllabus would print it as a subject."""
+    lab = lab.replace("(New)", "").replace("Virtual Lab", "").replace(" Lab", "")
+    return " ".join(lab.split()) or "Laboratory"
+
+
+def make_topics(n: int, seed: int = 42) -> List[str]:
+    """n experiment topics, about 40% truncated names, 20% syllabus phrasing,
+    20% generic lab words and 20% exact catalogue names."""
+    rnd = random.Random(seed)
+    names = _experiment_names()
+    topics = []
+    for _ in range(n):
+        words = rnd.choice(names).split()
+        roll = rnd.random()
+        if roll < 0.4:
+            words = words[:rnd.randint(1, len(words))]          # truncated name
+        elif roll < 0.6:
+            words = ["Write", "a", "program", "for"] + words   # syllabus phrasing
+        elif roll < 0.8:
+            words = rnd.sample(_NOISE_WORDS, 3)
+        topics.append(" ".join(words))
+    return topics
+
+
+def make_workload(n: int, seed: int = 42,
+                  mix: Tuple[float, float, float] = (0.5, 0.3, 0.2)) -> List[Tuple[str, str, str]]:
+    """
+    n (topic, subject, kind) triples, kind being "hint", "fuzzy" or
+    "fallback" in the proportions of mix.
+    """
+    rnd = random.Random(seed + 1)
+    labs = sorted({lab for disc in m._catalogue.index.values() for lab in disc}) \
+        if m._catalogue.index else []
+    fuzzy_subjects = [_lab_subject(lab) for lab in labs] or ["Laboratory"]
+    topics = make_topics(n, seed)
+
+    workload = []
+    for topic in topics:
+        roll = rnd.random()
+        if roll < mix[0]:
+            workload.append((topic, rnd.choice(HINT_SUBJECTS), "hint"))
+        elif roll < mix[0] + mix[1]:
+            workload.append((topic, rnd.choice(fuzzy_subjects), "fuzzy"))
+        else:
+            workload.append((topic, rnd.choice(FALLBACK_SUBJECTS), "fallback"))
+    return workload
+
+
+PROVIDERS = ["OLabs", "Amrita VLab", "PhET", "NPTEL Sim", "Open Source Physics",
+             "LabXchange", "MIT OCW Sim", "Coursera Lab"]
+
+_VARIANT_WORDS = ["simulation", "virtual", "interactive", "part ii", "advanced",
+                  "demonstration", "experiment", "module", "model", "study of"]
+
+
+def make_catalogue(n: int, seed: int = 42) -> List[Dict]:
+    """
+    The bundled catalogue entries plus synthetic ones up to n entries: each
+    is a catalogue experiment re-published by a synthetic provider under a
+    reworded name (words dropped, reordered or added, other experiments'
+    words mixed in), in that provider's copy of the lab.
+    """
+    rnd = random.Random(seed + 2)
+    m.warm_up()
+    base = [e for labs in m._catalogue.index.values() for es in labs.values() for e in es]
+    vocab = sorted({w for e in base for w in e.get("experiment_name", "").split() if len(w) > 3})
+    data = list(base)
+    while len(data) < n:
+        src = rnd.choice(base)
+        words = src.get("experiment_name", "").split()
+        roll = rnd.random()
+        if roll < 0.3 and len(words) > 2:
+            words.pop(rnd.randrange(len(words)))
+        elif roll < 0.5:
+            rnd.shuffle(words)
+        if rnd.random() < 0.6:
+            words.insert(rnd.randint(0, len(words)), rnd.choice(_VARIANT_WORDS))
+        if rnd.random() < 0.5:
+            words.append(rnd.choice(vocab))
+        provider = rnd.choice(PROVIDERS)
+        data.append({
+            "discipline_name": src.get("discipline_name", "Unknown"),
+            "lab_name": f"{src.get('lab_name', 'Unknown')} ({provider})",
+            "experiment_name": " ".join(words),
+            "experiment_url": f"https://sim.example.org/{provider.lower().replace(' ', '-')}/{len(data)}",
+        })
+    return data
@@ -0,0 +1,20 @@
+"""
+Compile data/vlabs_experiments.json into the matcher's binary index snapshot
+(data/vlabs_index.pickle):
+
+    cd backend && python build_vlabs_snapshot.py
+
+Optional: the server writes the same snapshot itself the first time it
+builds the index from the JSON, so later processes on that disk (restarts,
+rematch workers) load it. Running this ahead of time only saves that first
+build.
+
+The matcher uses the snapshot only while its source hash matches the JSON
+and its stamp matches the matcher's text-processing code, so a stale
+snapshot is ignored rather than served.
+"""
+from services.vlabs_matcher import build_snapshot, _SNAPSHOT_PATH
+
+if __name__ == "__main__":
+    digest = build_snapshot()
+    print(f"✅ Wrote {_SNAPSHOT_PATH} (source sha256 {digest[:12]}…)")
@@ -13,4 +13,47 @@ class Settings:
     # AI - Gemini
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
 
+    # VLabs matcher — scoring backend: "python" (default), "sparse" (numpy/scipy) or "lsh" (approximate)
+    VLABS_MATCHER_BACKEND: str = os.getenv("VLABS_MATCHER_BACKEND", "python")
+    # VLabs matcher — max cached (topic, subject) results; 0 disables the cache
+    VLABS_MATCH_CACHE_SIZE: int = int(os.getenv("VLABS_MATCH_CACHE_SIZE", "4096"))
+    # VLabs matcher — build the catalogue index in the background at startup
+    VLABS_MATCHER_WARM_UP: bool = os.getenv("VLABS_MATCHER_WARM_UP", "true").lower() in ("1", "true", "yes")
+    # VLabs matcher — record per-stage timings/counters for /vlabs/matcher/stats
+    VLABS_MATCHER_METRICS: bool = os.getenv("VLABS_MATCHER_METRICS", "true").lower() in ("1", "true", "yes")
+    # VLabs matcher — VLabs alternatives offered per experiment in simulation_links
+    VLABS_MAX_ALTERNATIVES: int = int(os.getenv("VLABS_MAX_ALTERNATIVES", "1"))
+    # VLabs matcher — seconds between checks of vlabs_experiments.json for edits; 0 disables
+    VLABS_CATALOGUE_POLL_SECONDS: float = float(os.getenv("VLABS_CATALOGUE_POLL_SECONDS", "60"))
+    # VLabs matcher — "lsh" backend: MinHash bands × rows per band (more bands → higher recall, more candidates)
+    VLABS_LSH_BANDS: int = int(os.getenv("VLABS_LSH_BANDS", "32"))
+    VLABS_LSH_ROWS: int = int(os.getenv("VLABS_LSH_ROWS", "2"))
+    # VLabs matcher — directory of extra per-source catalogue files (default: data/catalogues)
+    VLABS_CATALOGUE_DIR: str = os.getenv("VLABS_CATALOGUE_DIR", "")
+    # VLabs matcher — threads querying catalogue shards concurrently; 0 = auto (4 with the sparse backend, else in turn), 1 = in turn
+    VLABS_SHARD_WORKERS: int = int(os.getenv("VLABS_SHARD_WORKERS", "0"))
+    # VLabs matcher — max cached subject → discipline / lab pool resolutions; 0 disables
+    VLABS_SUBJECT_CACHE_SIZE: int = int(os.getenv("VLABS_SUBJECT_CACHE_SIZE", "1024"))
+    # VLabs matcher — max cached (subject, topic) simulation link lists; 0 disables the cache
+    VLABS_LINKS_CACHE_SIZE: int = int(os.getenv("VLABS_LINKS_CACHE_SIZE", "4096"))
+    # VLabs matcher — keep subject resolutions in the vlab_subject_resolutions table across restarts
+    VLABS_SUBJECT_CACHE_PERSIST: bool = os.getenv("VLABS_SUBJECT_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+
+    # Syllabus parser — size of the process pool shared by all uploads for parallel page parsing; 0 = CPU count, 1 = serial
+    SYLLABUS_PARSE_WORKERS: int = int(os.getenv("SYLLABUS_PARSE_WORKERS", "0"))
+    # Syllabus parser — PDFs with fewer pages than this are always parsed serially
+    SYLLABUS_PARALLEL_MIN_PAGES: int = int(os.getenv("SYLLABUS_PARALLEL_MIN_PAGES", "8"))
+    # Syllabus parser — parsed pages kept by content hash, so revised PDFs re-parse only changed pages; 0 disables
+    SYLLABUS_PAGE_CACHE_ENTRIES: int = int(os.getenv("SYLLABUS_PAGE_CACHE_ENTRIES", "4096"))
+    # Syllabus uploads — threads parsing and matching uploads off the event loop
+    SYLLABUS_UPLOAD_WORKERS: int = int(os.getenv("SYLLABUS_UPLOAD_WORKERS", "2"))
+    # Syllabus uploads — uploads allowed to wait for a thread; beyond that they get 503
+    SYLLABUS_UPLOAD_QUEUE: int = int(os.getenv("SYLLABUS_UPLOAD_QUEUE", "8"))
+    # Syllabus uploads — parsed results kept in memory, keyed by PDF hash; 0 disables
+    SYLLABUS_CACHE_ENTRIES: int = int(os.getenv("SYLLABUS_CACHE_ENTRIES", "64"))
+    # Syllabus uploads — on-disk result store size limit in MB, oldest evicted first; 0 disables
+    SYLLABUS_CACHE_MAX_MB: int = int(os.getenv("SYLLABUS_CACHE_MAX_MB", "256"))
+    # Syllabus uploads — on-disk result store directory (default: data/syllabus_cache)
+    SYLLABUS_CACHE_DIR: str = os.getenv("SYLLABUS_CACHE_DIR", "")
+
 settings = Settings()
@@ -0,0 +1,33 @@
+"""
+Rebuild data/vlabs_experiments.json from a VLabs catalogue export — the
+Google Sheets HTML table or the CSV — and optionally recompile the matcher
+snapshot:
+
+    cd backend && python ingest_vlabs.py "../iib vlabs table.html" [--format auto|csv|html]
+                                          [--out data/vlabs_experiments.json] [--snapshot]
+
+The export is streamed row by row, de-duplicated and URL-checked (see
+services/vlabs_ingest.py). Running workers pick the new file up on their
+next catalogue check, or immediately via the admin reload endpoint.
+"""
+import argparse
+
+from services.vlabs_ingest import ingest
+from services.vlabs_matcher import _DATA_PATH, _SNAPSHOT_PATH
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a VLabs catalogue export")
+    parser.add_argument("source", help="HTML or CSV export")
+    parser.add_argument("--format", choices=("auto", "csv", "html"), default="auto")
+    parser.add_argument("--out", default=_DATA_PATH, help="catalogue JSON to write")
+    parser.add_argument("--snapshot", action="store_true",
+                        help=f"also rebuild the index snapshot ({_SNAPSHOT_PATH})")
+    args = parser.parse_args()
+
+    stats = ingest(args.source, args.out, fmt=args.format,
+                   snapshot_path=_SNAPSHOT_PATH if args.snapshot else None)
+    rejected = ", ".join(f"{n} {reason}" for reason, n in stats["rejected"].items() if n) or "none"
+    print(f"✅ Wrote {stats['written']} experiments to {args.out} in {stats['elapsed']}s "
+          f"({stats['rows']} rows read, {stats['duplicates']} duplicates, rejected: {rejected})")
+    if args.snapshot:
+        print(f"✅ Rebuilt {_SNAPSHOT_PATH}")
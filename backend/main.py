@@ -34,6 +34,8 @@ def _keep_alive():
 
 import models
 from database import engine, SessionLocal
+from core.config import settings
+from services import vlabs_matcher, vlabs_rematch
 
 models.Base.metadata.create_all(bind=engine)
 
@@ -95,6 +97,19 @@ def startup_event():
     ping_thread = threading.Thread(target=_keep_alive, daemon=True)
     ping_thread.start()
 
+    # Build the VLabs matcher index off the request path; the first match
+    # request waits for this build instead of starting its own
+    if settings.VLABS_MATCHER_WARM_UP:
+        vlabs_matcher.start_background_warm_up()
+
+    # Every catalogue reload (watcher or admin endpoint) re-matches stored
+    # experiments in the background, so reads don't recompute stale links
+    vlabs_matcher.add_reload_listener(vlabs_rematch.on_catalogue_reload)
+
+    # Pick up catalogue corrections without a restart
+    if settings.VLABS_CATALOGUE_POLL_SECONDS > 0:
+        vlabs_matcher.start_catalogue_watcher(settings.VLABS_CATALOGUE_POLL_SECONDS)
+
 
 @app.get("/")
 def read_root():
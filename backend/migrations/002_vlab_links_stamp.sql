@@ -0,0 +1,9 @@
+-- ====================================================
+-- LABSYNk: Stored simulation link stamps
+-- Safe to re-run (uses IF NOT EXISTS)
+-- ====================================================
+
+-- VLAB EXPERIMENTS
+-- Existing rows start unstamped and get their links recomputed on first
+-- read (or by rematch_vlabs.py)
+ALTER TABLE vlab_experiments ADD COLUMN IF NOT EXISTS links_stamp VARCHAR;
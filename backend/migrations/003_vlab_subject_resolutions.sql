@@ -0,0 +1,15 @@
+-- ====================================================
+-- LABSYNk: VLabs matcher subject resolution cache
+-- Safe to re-run (uses IF NOT EXISTS)
+-- Only used with VLABS_SUBJECT_CACHE_PERSIST=true
+-- ====================================================
+
+CREATE TABLE IF NOT EXISTS vlab_subject_resolutions (
+    subject_key VARCHAR PRIMARY KEY,
+    version VARCHAR,
+    labs TEXT,
+    discipline_fallback BOOLEAN DEFAULT FALSE,
+    lab_fallback BOOLEAN DEFAULT FALSE,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS ix_vlab_subject_resolutions_version ON vlab_subject_resolutions (version);
@@ -136,6 +136,22 @@ class VLabExperiment(Base):
     description = Column(Text, nullable=True)
     suggested_simulation = Column(String, nullable=True)
     simulation_links = Column(Text, nullable=True)  # JSON string
+    # "<links version>:<hash of subject + topic>" the links were computed for,
+    # or "manual" for hand-edited links (see services/vlabs_rematch.py)
+    links_stamp = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     subject = relationship("VLabSubject", back_populates="experiments")
+
+
+# Persisted VLabs matcher Stage 1/2 outcome per subject name
+# (see services/vlabs_subject_store.py)
+class VLabSubjectResolution(Base):
+    __tablename__ = "vlab_subject_resolutions"
+
+    subject_key = Column(String, primary_key=True)  # normalised subject name
+    version = Column(String, index=True)  # matcher + catalogue version it was resolved under
+    labs = Column(Text)  # JSON [[discipline, lab], ...] in pool order
+    discipline_fallback = Column(Boolean, default=False)
+    lab_fallback = Column(Boolean, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,34 @@
+"""
+Recompute stale simulation_links of stored VLab experiments, e.g. after
+data/vlabs_experiments.json was updated:
+
+    cd backend && python rematch_vlabs.py [--workers N] [--chunk-size 500] [--force]
+
+Rows whose links_stamp is current are skipped unless --force is given;
+hand-edited links are never touched. Matching runs in a process pool (see
+services/vlabs_rematch.py).
+"""
+import argparse
+
+from services.vlabs_rematch import rematch_all
+
+
+def _progress(state):
+    total = state["total"] or 1
+    print(f"  {state['processed']}/{state['total']} ({state['processed'] / total:.0%}) "
+          f"· {state['recomputed']} recomputed · {state['updated']} updated · {state['rows_per_sec']} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-match stored VLab experiments")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="rows per DB read / update batch")
+    parser.add_argument("--force", action="store_true", help="recompute rows with a current stamp too")
+    args = parser.parse_args()
+
+    summary = rematch_all(workers=args.workers, chunk_size=args.chunk_size,
+                          progress=_progress, force=args.force)
+    print(f"✅ Re-matched {summary['processed']} experiments in {summary['elapsed']}s "
+          f"with {summary['workers']} worker(s): {summary['recomputed']} recomputed, "
+          f"{summary['updated']} updated, {summary['skipped']} edited meanwhile (kept), "
+          f"{summary['rows_per_sec']} rows/s")
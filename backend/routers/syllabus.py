@@ -1,6 +1,15 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from typing import List
-from services import syllabus_service
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+import asyncio
+import json
+import threading
+from core.config import settings
+from services import syllabus_cache, syllabus_service
+from utils.auth import require_role
+from utils.executor import BoundedExecutor, QueueFull
+from models import User
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -35,18 +44,136 @@ class SyllabusTopic(BaseModel):
     suggested_simulation: str
     simulation_links: List[SimulationLink]
 
-@router.post("/upload", response_model=SyllabusResponse)
-async def upload_syllabus(file: UploadFile = File(...)):
-    if not file.filename.endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
-    
+# ====== Worker queue ======
+# Parsing and matching are CPU-bound and synchronous; they run here instead
+# of on the event loop, and uploads beyond the queue limit get a 503.
+upload_executor = BoundedExecutor(
+    workers=settings.SYLLABUS_UPLOAD_WORKERS,
+    max_queue=settings.SYLLABUS_UPLOAD_QUEUE,
+    name="syllabus-upload"
+)
+
+def _submit(fn, *args):
+    """Queue fn on upload_executor; 503 with Retry-After when the queue is full."""
     try:
-        content = await file.read()
-        print(f"PDF file received: {file.filename}, size: {len(content)} bytes")
+        return upload_executor.submit(fn, *args)
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Syllabus parser is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+def _experiments_with_links(subject: dict, first_id: int) -> list:
+    """The subject's experiments with simulation links, numbered from first_id."""
+    links_per_exp = syllabus_service.get_simulation_links_batch(
+        [exp.get("suggested_simulation", exp["topic"]) for exp in subject["experiments"]],
+        subject_name=subject["subject"]
+    )
+    return [
+        {
+            "id": first_id + i,
+            "subject": subject["subject"],
+            "subject_code": subject["subject_code"],
+            "unit": exp.get("unit"),
+            "topic": exp.get("topic"),
+            "description": exp.get("description"),
+            "suggested_simulation": exp.get("suggested_simulation"),
+            "simulation_links": links
+        }
+        for i, (exp, links) in enumerate(zip(subject["experiments"], links_per_exp))
+    ]
+
+def _subject_payload(subject: dict, first_id: int) -> dict:
+    """One parsed subject as sent to the client (and cached)."""
+    return {
+        "branch": "",
+        "page": subject.get("page"),
+        "subject": subject["subject"],
+        "subject_code": subject["subject_code"],
+        "experiments": _experiments_with_links(subject, first_id)
+    }
+
+def _response_from(payloads: list) -> dict:
+    return {
+        "branch": payloads[0]["branch"] if payloads else "",
+        "experiments": [exp for payload in payloads for exp in payload["experiments"]]
+    }
+
+def _cache_lookup(content: bytes):
+    """(cache key, cached payloads or None); hashing runs off the event loop."""
+    key = syllabus_cache.cache_key(content)
+    return key, syllabus_cache.get(key)
+
+# ====== Streaming upload ======
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def _stream_events(content: bytes, cache_key: str = None):
+    """
+    (event, payload) per parsed subject, then a final "done" — or "error"
+    if parsing fails or finds nothing. Runs on upload_executor, page by
+    page; a complete result is stored under cache_key.
+    """
+    payloads = []
+    experiment_counter = 1
+    try:
+        for subject in syllabus_service.iter_syllabus_subjects(content):
+            payload = _subject_payload(subject, experiment_counter)
+            experiment_counter += len(payload["experiments"])
+            payloads.append(payload)
+            yield "subject", payload
     except Exception as e:
-        print(f"Error reading file: {e}")
-        raise HTTPException(status_code=400, detail=f"Could not read file: {str(e)}")
-    
+        import traceback
+        traceback.print_exc()
+        yield "error", {"detail": f"Parsing failed: {str(e)}"}
+        return
+    if not payloads:
+        yield "error", {"detail": "No experiments found in PDF. The PDF might not contain recognizable lab content."}
+        return
+    if cache_key:
+        syllabus_cache.put(cache_key, payloads)
+    yield "done", {"subjects": len(payloads), "experiments": experiment_counter - 1}
+
+def _cached_events(payloads: list):
+    """The events _stream_events produced for a cached upload."""
+    for payload in payloads:
+        yield "subject", payload
+    yield "done", {"subjects": len(payloads),
+                   "experiments": sum(len(p["experiments"]) for p in payloads)}
+
+def _format_events(events, fmt: str):
+    for event, payload in events:
+        if fmt == "sse":
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        else:
+            yield json.dumps({"event": event, **payload}) + "\n"
+
+async def _relay(chunks: asyncio.Queue, cancelled: threading.Event):
+    """Hand the worker's chunks to the response; tell the worker to stop if the client goes away."""
+    try:
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        cancelled.set()
+
+def _produce_stream(content: bytes, cache_key: str, fmt: str, loop, chunks: asyncio.Queue,
+                    cancelled: threading.Event):
+    """Runs on upload_executor: parse and match page by page, passing chunks to the event loop."""
+    try:
+        for chunk in _format_events(_stream_events(content, cache_key), fmt):
+            if cancelled.is_set():
+                return
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+    finally:
+        if not cancelled.is_set():
+            loop.call_soon_threadsafe(chunks.put_nowait, None)
+
+def _parse_and_match(content: bytes, cache_key: str) -> dict:
+    """Runs on upload_executor: the whole buffered upload response, cached under cache_key."""
     # Parse with pdfplumber (more accurate table extraction)
     try:
         print("Parsing with pdfplumber for accurate extraction...")
@@ -66,31 +193,55 @@ async def upload_syllabus(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail="No experiments found in PDF. The PDF might not contain recognizable lab content.")
 
     # 3. Process all subjects and add simulation links
-    all_experiments = []
+    payloads = []
     experiment_counter = 1
-    
     for subject in subjects_data:
-        for exp in subject["experiments"]:
-            links = syllabus_service.get_simulation_links(
-                exp.get("suggested_simulation", exp["topic"]),
-                subject_name=subject["subject"]
-            )
-            all_experiments.append({
-                "id": experiment_counter,
-                "subject": subject["subject"],
-                "subject_code": subject["subject_code"],
-                "unit": exp.get("unit"),
-                "topic": exp.get("topic"),
-                "description": exp.get("description"),
-                "suggested_simulation": exp.get("suggested_simulation"),
-                "simulation_links": links
-            })
-            experiment_counter += 1
+        payloads.append(_subject_payload(subject, experiment_counter))
+        experiment_counter += len(payloads[-1]["experiments"])
+    syllabus_cache.put(cache_key, payloads)
     
-    return {
-        "branch": branch,
-        "experiments": all_experiments
-    }
+    return {**_response_from(payloads), "branch": branch}
+
+@router.post("/upload", response_model=SyllabusResponse)
+async def upload_syllabus(file: UploadFile = File(...),
+                          stream: Optional[str] = Query(None, description="'ndjson' or 'sse' to stream subjects as pages are parsed")):
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    if stream is not None and stream not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="stream must be 'ndjson' or 'sse'")
+    
+    try:
+        content = await file.read()
+        print(f"PDF file received: {file.filename}, size: {len(content)} bytes")
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        raise HTTPException(status_code=400, detail=f"Could not read file: {str(e)}")
+
+    # The same PDF parsed under the same parser / catalogue versions before:
+    # answer from the cache without taking a worker slot
+    cache_key, cached = await run_in_threadpool(_cache_lookup, content)
+    if cached is not None:
+        print(f"✅ Syllabus cache hit: {len(cached)} subject(s)")
+        if stream:
+            return StreamingResponse(
+                iter(list(_format_events(_cached_events(cached), stream))),
+                media_type=STREAM_MEDIA_TYPES[stream],
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        return _response_from(cached)
+
+    if stream:
+        # One event per subject as soon as its page is parsed and matched
+        chunks: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        _submit(_produce_stream, content, cache_key, stream, asyncio.get_running_loop(), chunks, cancelled)
+        return StreamingResponse(
+            _relay(chunks, cancelled),
+            media_type=STREAM_MEDIA_TYPES[stream],
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    return await asyncio.wrap_future(_submit(_parse_and_match, content, cache_key))
 
 @router.post("/manual", response_model=List[SyllabusTopic])
 async def manual_syllabus(data: dict):
@@ -104,6 +255,13 @@ async def manual_syllabus(data: dict):
     # OR we can ask Gemini to find descriptions/simulations for these list items.
     # Let's use Gemini to "enrich" the list.
     
-    enriched_data = syllabus_service.enrich_topics(topics, data.get("subject", ""))
+    enriched_data = await asyncio.wrap_future(
+        _submit(syllabus_service.enrich_topics, topics, data.get("subject", ""))
+    )
     
     return enriched_data
+
+@router.get("/upload/stats")
+def get_upload_stats(current_user: User = Depends(require_role("hod"))):
+    """Running / queued uploads, rejections, queue wait and run time histograms, and result cache stats"""
+    return {**upload_executor.stats(), "cache": syllabus_cache.stats()}
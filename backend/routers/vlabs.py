@@ -8,8 +8,9 @@ import os
 import uuid
 
 from database import get_db
-from models import College, Department, VLabSubject, VLabExperiment
-from services import syllabus_service
+from models import College, Department, VLabSubject, VLabExperiment, User
+from services import vlabs_matcher, vlabs_rematch
+from utils.auth import require_role
 
 router = APIRouter(
     prefix="/vlabs",
@@ -87,6 +88,8 @@ class VLabExperimentUpdate(BaseModel):
     description: Optional[str] = None
     suggested_simulation: Optional[str] = None
     simulation_links: Optional[List[SimulationLink]] = None
+    # True only when the user changed the links; echoed-back links are ignored
+    links_edited: bool = False
 
 class VLabExperimentResponse(BaseModel):
     id: int
@@ -329,14 +332,14 @@ def get_experiments(
     
     experiments = query.order_by(VLabExperiment.unit).all()
     
-    # Generate simulation links dynamically based on topic + subject name
+    # Links are served as stored; only rows whose stamp is stale (catalogue or
+    # matcher changed, or topic / subject edited) are recomputed and saved
+    if vlabs_rematch.refresh_stale_links(experiments):
+        db.commit()
+
     result = []
     for exp in experiments:
-        # Pass both subject name and topic for better language detection
-        links = syllabus_service.get_simulation_links(
-            exp.topic or exp.suggested_simulation or "",
-            subject_name=exp.subject.name or ""
-        )
+        links = json.loads(exp.simulation_links) if exp.simulation_links else []
         result.append({
             "id": exp.id,
             "subject_id": exp.subject_id,
@@ -358,17 +361,20 @@ def create_experiment(data: VLabExperimentCreate, db: Session = Depends(get_db))
     if not subject:
         raise HTTPException(status_code=404, detail="Subject not found")
     
-    # Process links
-    links_json = json.dumps([link.dict() for link in data.simulation_links])
-    
     experiment = VLabExperiment(
         subject_id=data.subject_id,
         unit=data.unit,
         topic=data.topic,
         description=data.description,
-        suggested_simulation=data.suggested_simulation,
-        simulation_links=links_json
+        suggested_simulation=data.suggested_simulation
     )
+    experiment.subject = subject
+    if data.simulation_links:
+        # Hand-entered links are kept as they are
+        experiment.simulation_links = json.dumps([link.dict() for link in data.simulation_links])
+        experiment.links_stamp = vlabs_rematch.MANUAL_STAMP
+    else:
+        vlabs_rematch.refresh_stale_links([experiment])
     db.add(experiment)
     db.commit()
     db.refresh(experiment)
@@ -392,8 +398,14 @@ def update_experiment(experiment_id: int, data: VLabExperimentUpdate, db: Sessio
         experiment.description = data.description
     if data.suggested_simulation is not None:
         experiment.suggested_simulation = data.suggested_simulation
-    if data.simulation_links is not None:
+    if data.links_edited and data.simulation_links is not None:
+        # Links edited by hand: keep them and stop recomputing this row
         experiment.simulation_links = json.dumps([link.dict() for link in data.simulation_links])
+        experiment.links_stamp = vlabs_rematch.MANUAL_STAMP
+    else:
+        # Links only echoed back (they may be older than the stored ones):
+        # recomputed if the topic changed
+        vlabs_rematch.refresh_stale_links([experiment])
     
     db.commit()
     db.refresh(experiment)
@@ -464,23 +476,23 @@ def save_to_vlabs(data: SaveToVLabsRequest, db: Session = Depends(get_db)):
             experiments_list = subj_data.get("experiments", [])
             print(f"Adding {len(experiments_list)} experiments for {subject.name}")
             
+            new_experiments = []
             for exp_data in experiments_list:
-                # Get simulation links
-                links = syllabus_service.get_simulation_links(
-                    exp_data.get("suggested_simulation", exp_data.get("topic", "")),
-                    subject_name=subj_data.get("subject", "")
-                )
-                
                 experiment = VLabExperiment(
                     subject_id=subject.id,
                     unit=exp_data.get("unit"),
                     topic=exp_data.get("topic", ""),
                     description=exp_data.get("description", ""),
-                    suggested_simulation=exp_data.get("suggested_simulation", ""),
-                    simulation_links=json.dumps(links)
+                    suggested_simulation=exp_data.get("suggested_simulation", "")
                 )
+                experiment.subject = subject
+                new_experiments.append(experiment)
                 db.add(experiment)
                 saved_experiments += 1
+            
+            # Materialize simulation links now (one VLabs lab lookup per subject)
+            # so reads are served from storage
+            vlabs_rematch.refresh_stale_links(new_experiments)
                 
         db.commit()
         print("Save successful")
@@ -497,3 +509,59 @@ def save_to_vlabs(data: SaveToVLabsRequest, db: Session = Depends(get_db)):
         "message": f"Saved {len(saved_subjects)} subject(s) with {saved_experiments} experiment(s)",
         "subjects": saved_subjects
     }
+
+
+# ====== VLabs Catalogue & Matcher ======
+
+@router.post("/catalogue/reload")
+def reload_catalogue(
+    force: bool = Query(False),
+    current_user: User = Depends(require_role("hod"))
+):
+    """
+    Reload vlabs_experiments.json if it changed (force=true rebuilds regardless).
+    Any reload, this one or the file watcher's, makes every stored link stamp
+    stale and starts a background re-match (see on_catalogue_reload); its
+    progress is returned as "rematch".
+    """
+    result = vlabs_matcher.reload_catalogue(force=force)
+    result["rematch"] = vlabs_rematch.rematch_job_status()
+    return result
+
+
+@router.post("/catalogue/rematch", status_code=202)
+def start_rematch(
+    workers: Optional[int] = Query(None, ge=1),
+    chunk_size: int = Query(500, ge=1, le=10000),
+    force: bool = Query(False),
+    current_user: User = Depends(require_role("hod"))
+):
+    """
+    Recompute stale stored simulation links in the background
+    (force=true recomputes every row except hand-edited ones)
+    """
+    if not vlabs_rematch.start_rematch_job(workers=workers, chunk_size=chunk_size, force=force):
+        raise HTTPException(status_code=409, detail="A re-match job is already running")
+    return vlabs_rematch.rematch_job_status()
+
+
+@router.get("/catalogue/rematch")
+def get_rematch_status(current_user: User = Depends(require_role("hod"))):
+    """Progress and throughput of the current / last re-match job"""
+    return vlabs_rematch.rematch_job_status()
+
+
+@router.get("/matcher/stats")
+def get_matcher_stats(
+    top_subjects: int = Query(20, ge=0, le=200),
+    current_user: User = Depends(require_role("hod"))
+):
+    """Per-stage timings, candidates scored, fallbacks and cache stats of the VLabs matcher"""
+    return vlabs_matcher.matcher_stats(top_subjects=top_subjects)
+
+
+@router.post("/matcher/stats/reset")
+def reset_matcher_stats(current_user: User = Depends(require_role("hod"))):
+    """Zero the matcher counters and histograms"""
+    vlabs_matcher.reset_matcher_stats()
+    return {"success": True}
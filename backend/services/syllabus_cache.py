@@ -0,0 +1,172 @@
+"""
+Content-addressed cache of parsed syllabus uploads.
+
+Many faculty upload the same university syllabus PDF. An upload's result
+(its per-subject payloads: experiments with simulation links) is stored
+under a key made of the PDF's sha256, syllabus_service.PARSER_VERSION and
+simulation_links_version() (matcher, link format and catalogue versions).
+A parser upgrade or a catalogue change therefore misses instead of serving
+stale links.
+
+Two tiers:
+  memory — LRUCache of SYLLABUS_CACHE_ENTRIES results
+  disk   — gzipped JSON files in SYLLABUS_CACHE_DIR, at most
+           SYLLABUS_CACHE_MAX_MB in total. The least recently used files
+           (by mtime, bumped on every hit) are removed first. Entries of
+           old versions are never hit again and age out the same way.
+
+Entry points: cache_key(), get(), put(), stats(), clear().
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from core.config import settings
+from services import syllabus_service
+from utils.cache import LRUCache, MISSING
+from utils.metrics import LATENCY_MS_BUCKETS, MetricSet
+
+_DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "syllabus_cache")
+
+_memory = LRUCache(settings.SYLLABUS_CACHE_ENTRIES)
+_disk_lock = threading.Lock()
+_metrics = MetricSet(
+    histograms={"lookup_ms": LATENCY_MS_BUCKETS},
+    counters=("memory_hits", "disk_hits", "misses", "stores", "disk_evictions", "disk_errors"),
+)
+
+
+def _cache_dir() -> str:
+    return settings.SYLLABUS_CACHE_DIR or _DEFAULT_DIR
+
+
+def _max_bytes() -> int:
+    return max(0, settings.SYLLABUS_CACHE_MAX_MB) * 1024 * 1024
+
+
+def cache_key(content: bytes) -> str:
+    """PDF hash plus everything else the parsed result depends on."""
+    digest = hashlib.sha256(content).hexdigest()
+    return f"{digest}.p{syllabus_service.PARSER_VERSION}.{syllabus_service.simulation_links_version()}"
+
+
+def _path(key: str) -> str:
+    return os.path.join(_cache_dir(), hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json.gz")
+
+
+def _read_disk(key: str) -> Optional[List[Dict]]:
+    path = _path(key)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        # Truncated or corrupt entry: drop it and treat as a miss
+        _metrics.record({"disk_errors": 1})
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    if stored.get("key") != key:
+        return None
+    try:
+        os.utime(path)              # mtime is the recency used for eviction
+    except OSError:
+        pass
+    return stored["payloads"]
+
+
+def get(key: str) -> Optional[List[Dict]]:
+    """Cached payloads for key (memory first, then disk), or None."""
+    started = time.perf_counter()
+    payloads = _memory.get(key)
+    if payloads is not MISSING:
+        counter = "memory_hits"
+    else:
+        payloads = _read_disk(key) if _max_bytes() else None
+        if payloads is not None:
+            _memory.put(key, payloads)
+            counter = "disk_hits"
+        else:
+            counter = "misses"
+    _metrics.record({counter: 1}, {"lookup_ms": (time.perf_counter() - started) * 1000})
+    return payloads
+
+
+def _evict(limit: int) -> int:
+    """Remove least recently used files until the directory fits in limit bytes."""
+    entries = []
+    with os.scandir(_cache_dir()) as it:
+        for entry in it:
+            if entry.name.endswith(".json.gz"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def put(key: str, payloads: List[Dict]) -> None:
+    """Store payloads in memory and, unless disabled, on disk (atomically)."""
+    payloads = json.loads(json.dumps(payloads))     # plain, detached copy
+    _memory.put(key, payloads)
+    counters = {"stores": 1}
+    limit = _max_bytes()
+    if limit:
+        path = _path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(_cache_dir(), exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump({"key": key, "payloads": payloads}, f)
+            os.replace(tmp_path, path)
+            with _disk_lock:
+                counters["disk_evictions"] = _evict(limit)
+        except OSError as e:
+            print(f"⚠️  Syllabus cache write failed: {e}")
+            counters["disk_errors"] = 1
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    _metrics.record(counters)
+
+
+def stats() -> Dict:
+    """Hit / miss / store counters, lookup latency and both tiers' sizes."""
+    snapshot = _metrics.snapshot(top=0)
+    disk_files = disk_bytes = 0
+    if os.path.isdir(_cache_dir()):
+        with os.scandir(_cache_dir()) as it:
+            for entry in it:
+                if entry.name.endswith(".json.gz"):
+                    disk_files += 1
+                    disk_bytes += entry.stat().st_size
+    return {
+        "counters": snapshot["counters"],
+        "lookup_ms": snapshot["histograms"]["lookup_ms"],
+        "memory": _memory.stats(),
+        "disk": {"files": disk_files, "bytes": disk_bytes, "max_bytes": _max_bytes()},
+    }
+
+
+def clear() -> None:
+    """Drop both tiers."""
+    _memory.clear()
+    if os.path.isdir(_cache_dir()):
+        with _disk_lock:
+            _evict(0)
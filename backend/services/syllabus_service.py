@@ -1,5 +1,15 @@
+import hashlib
+import multiprocessing
 import os
-from services.vlabs_matcher import find_vlabs_link
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from core.config import settings
+from services.vlabs_matcher import (
+    MATCHER_VERSION, catalogue_version, shard_versions,
+    find_vlabs_links_batch, find_all_vlabs_links_batch, find_source_links_batch,
+)
+from utils.cache import LRUCache, MISSING, FrozenDict
+from utils.keywords import KeywordClassifier
 try:
     from google import genai
     from google.genai import types
@@ -12,6 +22,7 @@ except ImportError:
 from pypdf import PdfReader
 import pdfplumber
 from io import BytesIO
+from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
 import json
 import re
 
@@ -37,74 +48,260 @@ def extract_text_from_pdf(file_content: bytes) -> str:
         print(f"Error reading PDF: {e}")
         return ""
 
-def parse_syllabus_with_pdfplumber(file_content: bytes) -> dict:
+# Bump when _parse_pdf_page changes what it extracts (invalidates cached uploads)
+PARSER_VERSION = 1
+
+def _parse_pdf_page(page) -> dict:
+    """
+    Subject on one pdfplumber page: name from the page header (first line),
+    code and experiments from the table rows. None if the page has no
+    experiments.
+    """
+    text = page.extract_text()
+    if not text:
+        return None
+
+    # First line is the lab/subject name (largest heading)
+    lines = [l.strip() for l in text.split('\n') if l.strip()]
+    subject_name = lines[0] if lines else "Unknown Subject"
+
+    # Clean up subject name
+    subject_name = subject_name.strip()
+
+    # Extract subject code from table
+    subject_code = ""
+    tables = page.extract_tables()
+    for table in tables:
+        if not table:
+            continue
+        for row in table:
+            if row and row[0] and 'SUBJECT' in str(row[0]).upper() and 'CODE' in str(row[0]).upper():
+                # Extract code like "2018506" or "2018507A" from "SUBJECT\nCODE:\n2018506"
+                code_match = re.search(r'(\d{7}[A-Z]?)', str(row[0]))
+                if code_match:
+                    subject_code = code_match.group(1)
+
+    # Extract experiments from tables
+    experiments = []
+    exp_id = 1
+    for table in tables:
+        if not table:
+            continue
+        for row in table:
+            if not row or not row[0]:
+                continue
+            # Match UNIT – XX or UNIT - XX pattern
+            unit_match = re.match(r'UNIT\s*[–\-]\s*(\d+)', str(row[0]), re.IGNORECASE)
+            if unit_match and len(row) > 1 and row[1]:
+                topic = str(row[1]).strip()
+                # Clean up topic text
+                topic = re.sub(r'\s+', ' ', topic)
+                if topic and len(topic) > 5:
+                    experiments.append({
+                        "id": exp_id,
+                        "unit": int(unit_match.group(1)),
+                        "topic": topic,
+                        "description": f"Practical: {topic}",
+                        "suggested_simulation": topic
+                    })
+                    exp_id += 1
+
+    if not experiments:
+        return None
+    return {
+        "subject": subject_name,
+        "subject_code": subject_code,
+        "experiments": experiments
+    }
+
+# ===== Per-page result cache =====
+# (PARSER_VERSION, page content digest) → the page's subject, or None when
+# the page has no experiments. Revised PDFs usually change a few pages;
+# the others are reused without layout analysis or table extraction.
+_page_cache = LRUCache(settings.SYLLABUS_PAGE_CACHE_ENTRIES)
+
+# Nesting deeper than this gives up on the digest rather than truncating it
+_DIGEST_MAX_DEPTH = 32
+
+def _feed_digest(h, obj, seen: set, depth: int = 0) -> None:
+    """
+    Hash a PDF object tree: references resolved, streams by their raw bytes.
+    Raises ValueError past _DIGEST_MAX_DEPTH: hashing a deeper object by
+    reference only would let an in-place edit of it keep the same digest.
+    """
+    if depth > _DIGEST_MAX_DEPTH:
+        raise ValueError("PDF object tree too deep to digest")
+    if isinstance(obj, PDFObjRef):
+        if obj.objid in seen:
+            h.update(f"ref{obj.objid}".encode())
+            return
+        seen.add(obj.objid)
+        obj = resolve1(obj)
+    if isinstance(obj, PDFStream):
+        _feed_digest(h, obj.attrs, seen, depth + 1)
+        h.update(obj.get_rawdata() or b"")
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=str):
+            h.update(f"/{key}".encode())
+            _feed_digest(h, obj[key], seen, depth + 1)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _feed_digest(h, item, seen, depth + 1)
+        h.update(b"]")
+    else:
+        h.update(repr(obj).encode())
+
+def _page_digest(page):
+    """
+    Digest of everything a page's parse depends on: its content streams, the
+    resources they draw with (fonts, form XObjects), media box and rotation.
+    None if the page can't be hashed (it is then always parsed).
+    """
+    try:
+        page_obj = page.page_obj
+        h = hashlib.sha1()
+        _feed_digest(h, [page_obj.mediabox, page_obj.rotate], set())
+        for stream in page_obj.contents:
+            _feed_digest(h, stream, set())
+        _feed_digest(h, page_obj.resources, set())
+        return h.hexdigest()
+    except Exception:
+        return None
+
+def _parse_page_at(pdf, index: int):
+    page = pdf.pages[index]
+    try:
+        return _parse_pdf_page(page)
+    finally:
+        page.close()
+
+def _emit(index: int, subject, cached: bool):
+    """The subject as yielded for page index (a fresh copy; cache entries stay untouched)."""
+    if not subject:
+        return None
+    print(f"✅ Page {index+1}: {subject['subject']} ({subject['subject_code']}) "
+          f"- {len(subject['experiments'])} experiments{' (unchanged)' if cached else ''}")
+    return {**subject, "experiments": [dict(exp) for exp in subject["experiments"]], "page": index + 1}
+
+def _parse_page_list(file_content: bytes, indices: list) -> list:
+    """Process-pool task: open the PDF bytes and parse the given pages → [(index, subject)]."""
+    with pdfplumber.open(BytesIO(file_content)) as pdf:
+        return [(i, _parse_page_at(pdf, i)) for i in indices]
+
+# ===== Parallel page parsing =====
+
+_parse_pool = None
+_parse_pool_workers = 0
+_parse_pool_lock = threading.Lock()
+
+def parse_workers() -> int:
+    """Configured parse processes (SYLLABUS_PARSE_WORKERS, 0 = CPU count)."""
+    return max(1, settings.SYLLABUS_PARSE_WORKERS or os.cpu_count() or 1)
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """
+    Shared process pool of parse_workers() processes, created on first use.
+    Concurrent uploads share it, so it is never resized or shut down while
+    the server runs; a request that wants fewer processes keeps fewer runs
+    in flight instead (see _iter_parallel).
+    """
+    global _parse_pool, _parse_pool_workers
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else None)
+            _parse_pool_workers = parse_workers()
+            _parse_pool = ProcessPoolExecutor(max_workers=_parse_pool_workers, mp_context=context)
+        return _parse_pool
+
+def _iter_parallel(file_content: bytes, parsed: list, digests: list, missing: list, workers: int):
+    """
+    Pages still to parse (missing) are split into runs of about half a
+    worker's share and parsed in the pool; all pages are yielded in page
+    order. Smaller runs mean the first subjects arrive before the last run
+    is done and a slow run doesn't hold up a whole worker's share. When
+    workers is below the pool's size, at most that many runs are in flight
+    at once, the next one submitted as the earliest is consumed.
+    """
+    pool = _get_parse_pool()
+    workers = max(1, min(workers, _parse_pool_workers, len(missing)))
+    size = -(-len(missing) // (workers * 2))
+    runs = [missing[start:start + size] for start in range(0, len(missing), size)]
+    ahead = len(runs) if workers >= _parse_pool_workers else workers
+    to_parse = set(missing)
+    owner = {}
+    futures = []
+
+    def submit_next():
+        run = runs[len(futures)]
+        future = pool.submit(_parse_page_list, file_content, run)
+        futures.append(future)
+        owner.update(dict.fromkeys(run, future))
+
+    try:
+        while len(futures) < ahead:
+            submit_next()
+        for i in range(len(parsed)):
+            cached = i not in to_parse
+            if not cached and parsed[i] is MISSING:
+                for j, subject in owner[i].result():
+                    parsed[j] = subject
+                    if digests[j]:
+                        _page_cache.put((PARSER_VERSION, digests[j]), subject)
+                if len(futures) < len(runs):
+                    submit_next()
+            subject = _emit(i, parsed[i], cached)
+            if subject:
+                yield subject
+    finally:
+        for future in futures:
+            future.cancel()
+
+def iter_syllabus_subjects(file_content: bytes, workers: int = None):
+    """
+    Generator form of parse_syllabus_with_pdfplumber: yields each subject
+    (with its 1-based "page") as soon as its page is parsed. Each page's
+    cached layout objects are released once it is done, so memory stays at
+    about one page. Parse errors propagate to the caller.
+
+    Pages whose content digest was parsed before (e.g. the unchanged pages
+    of a revised syllabus) come from the page cache; only the others are
+    parsed. With more than one worker (default: parse_workers()) and at
+    least SYLLABUS_PARALLEL_MIN_PAGES of those, they are parsed in a process
+    pool, each worker opening the PDF bytes itself; subjects still come
+    out in page order. workers can lower parse_workers() but not raise it.
+    """
+    workers = min(workers or parse_workers(), parse_workers())
+    with pdfplumber.open(BytesIO(file_content)) as pdf:
+        digests = [_page_digest(page) for page in pdf.pages]
+        parsed = [_page_cache.get((PARSER_VERSION, d)) if d else MISSING for d in digests]
+        missing = [i for i, subject in enumerate(parsed) if subject is MISSING]
+        if workers >= 2 and len(missing) >= max(2, settings.SYLLABUS_PARALLEL_MIN_PAGES):
+            parallel = True
+        else:
+            parallel = False
+            for i, digest in enumerate(digests):
+                cached = parsed[i] is not MISSING
+                if not cached:
+                    parsed[i] = _parse_page_at(pdf, i)
+                    if digest:
+                        _page_cache.put((PARSER_VERSION, digest), parsed[i])
+                subject = _emit(i, parsed[i], cached)
+                if subject:
+                    yield subject
+    if parallel:
+        yield from _iter_parallel(file_content, parsed, digests, missing, workers)
+
+def parse_syllabus_with_pdfplumber(file_content: bytes, workers: int = None) -> dict:
     """
     Parse syllabus using pdfplumber for accurate table extraction.
     Extracts subject name from page header (first line) and experiments from table rows.
     Returns structured data with subjects and experiments.
+    Large PDFs are parsed in parallel (see iter_syllabus_subjects).
     """
-    subjects = []
-    
     try:
-        with pdfplumber.open(BytesIO(file_content)) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                text = page.extract_text()
-                if not text:
-                    continue
-                
-                # First line is the lab/subject name (largest heading)
-                lines = [l.strip() for l in text.split('\n') if l.strip()]
-                subject_name = lines[0] if lines else "Unknown Subject"
-                
-                # Clean up subject name
-                subject_name = subject_name.strip()
-                
-                # Extract subject code from table
-                subject_code = ""
-                tables = page.extract_tables()
-                for table in tables:
-                    if not table:
-                        continue
-                    for row in table:
-                        if row and row[0] and 'SUBJECT' in str(row[0]).upper() and 'CODE' in str(row[0]).upper():
-                            # Extract code like "2018506" or "2018507A" from "SUBJECT\nCODE:\n2018506"
-                            code_match = re.search(r'(\d{7}[A-Z]?)', str(row[0]))
-                            if code_match:
-                                subject_code = code_match.group(1)
-                
-                # Extract experiments from tables
-                experiments = []
-                exp_id = 1
-                for table in tables:
-                    if not table:
-                        continue
-                    for row in table:
-                        if not row or not row[0]:
-                            continue
-                        # Match UNIT – XX or UNIT - XX pattern
-                        unit_match = re.match(r'UNIT\s*[–\-]\s*(\d+)', str(row[0]), re.IGNORECASE)
-                        if unit_match and len(row) > 1 and row[1]:
-                            topic = str(row[1]).strip()
-                            # Clean up topic text
-                            topic = re.sub(r'\s+', ' ', topic)
-                            if topic and len(topic) > 5:
-                                experiments.append({
-                                    "id": exp_id,
-                                    "unit": int(unit_match.group(1)),
-                                    "topic": topic,
-                                    "description": f"Practical: {topic}",
-                                    "suggested_simulation": topic
-                                })
-                                exp_id += 1
-                
-                if experiments:
-                    subjects.append({
-                        "subject": subject_name,
-                        "subject_code": subject_code,
-                        "experiments": experiments
-                    })
-                    print(f"✅ Page {page_num+1}: {subject_name} ({subject_code}) - {len(experiments)} experiments")
-    
+        subjects = list(iter_syllabus_subjects(file_content, workers))
     except Exception as e:
         print(f"❌ pdfplumber parsing error: {e}")
         import traceback
@@ -333,66 +530,164 @@ def generate_syllabus_structure(text: str, use_ai: bool = False):
         print(f"Response text: {response.text if 'response' in locals() else 'No response'}")
         return []
 
-def get_simulation_links(simulation_name: str, subject_name: str = "") -> list:
+# ===== Programiz language URL map =====
+# Key: keyword to detect | Value: Programiz URL slug
+# Order matters: the first key found in the text wins.
+LANG_MAP = {
+    'c++':         {'slug': 'cpp-programming', 'label': 'C++'},
+    'cpp':         {'slug': 'cpp-programming', 'label': 'C++'},
+    'c#':          {'slug': 'csharp', 'label': 'C#'},
+    'c sharp':     {'slug': 'csharp', 'label': 'C#'},
+    '.net':        {'slug': 'csharp', 'label': 'C#'},
+    'java':        {'slug': 'java-programming', 'label': 'Java'},
+    'python':      {'slug': 'python-programming', 'label': 'Python'},
+    'javascript':  {'slug': 'javascript', 'label': 'JavaScript'},
+    'typescript':  {'slug': 'typescript', 'label': 'TypeScript'},
+    'html':        {'slug': 'html-css', 'label': 'HTML/CSS'},
+    'css':         {'slug': 'html-css', 'label': 'HTML/CSS'},
+    'php':         {'slug': 'php', 'label': 'PHP'},
+    'sql':         {'slug': 'sql', 'label': 'SQL'},
+    'r programming': {'slug': 'r-programming', 'label': 'R'},
+    'ruby':        {'slug': 'ruby', 'label': 'Ruby'},
+    'kotlin':      {'slug': 'kotlin', 'label': 'Kotlin'},
+    'swift':       {'slug': 'swift', 'label': 'Swift'},
+    'golang':      {'slug': 'golang', 'label': 'Go'},
+    'go lang':     {'slug': 'golang', 'label': 'Go'},
+    'rust':        {'slug': 'rust', 'label': 'Rust'},
+    'dart':        {'slug': 'dart', 'label': 'Dart'},
+    'scala':       {'slug': 'scala', 'label': 'Scala'},
+}
+
+# Also detect plain 'c ' as C language (avoid matching 'c++', 'c#' etc.)
+C_LANG_PHRASES = [
+    'c program', 'c language', 'programming in c ',
+    'basic c ', ' in c.', ' in c,', ' using c',
+    'through c ', 'with c ', 'c coding',
+]
+C_LANG = {'slug': 'c-programming', 'label': 'C'}
+
+# Compiled once; see utils.keywords.KeywordClassifier
+_lang_classifier = KeywordClassifier(LANG_MAP.items())
+_c_lang_classifier = KeywordClassifier((p, C_LANG) for p in C_LANG_PHRASES)
+
+# Search links offered for non-programming topics, in order; "{q}" is the topic
+GENERIC_LINKS = [
+    ("PhET Simulations", "https://phet.colorado.edu/en/simulations/filter?sort=relevance&q={q}",
+     "Interactive STEM simulations by University of Colorado"),
+    ("Virtual Labs India", "https://www.vlab.co.in/broad-area-computer-science-and-engineering",
+     "IIT virtual lab experiments"),
+    ("OLabs", "https://www.olabs.edu.in/?pg=search&q={q}",
+     "Virtual science labs for schools and colleges"),
+]
+
+# Subject name → detected language (None when the subject names none)
+_subject_languages = LRUCache(settings.VLABS_SUBJECT_CACHE_SIZE)
+# (links version, subject name, topic) → finished link list
+_links_cache = LRUCache(settings.VLABS_LINKS_CACHE_SIZE)
+
+def reset_after_fork() -> None:
+    """
+    Fresh language and link caches for a forked worker process: a lock held
+    by a parent thread at fork time would otherwise never be released there.
+    """
+    global _subject_languages, _links_cache
+    _subject_languages = LRUCache(_subject_languages.capacity)
+    _links_cache = LRUCache(_links_cache.capacity)
+
+# Bump when _build_simulation_links changes what it emits
+LINKS_FORMAT = 2
+
+def simulation_links_version() -> str:
+    """
+    Everything stored simulation_links depend on apart from topic and subject:
+    matcher rules, link format, alternatives setting and catalogue content
+    (shard contents too, when any are loaded).
+    """
+    version = (f"m{MATCHER_VERSION}.f{LINKS_FORMAT}"
+               f".a{max(1, settings.VLABS_MAX_ALTERNATIVES)}.c{catalogue_version()[:12]}")
+    shards = shard_versions()
+    if shards:
+        version += ".s" + hashlib.sha1("|".join(shards).encode("utf-8")).hexdigest()[:12]
+    return version
+
+def _detect_language(text: str):
+    """First LANG_MAP key found in text, else C if a C phrase is, else None."""
+    detected = _lang_classifier.classify(text)
+    if not detected and _c_lang_classifier.matches(text):
+        detected = C_LANG
+    return detected
+
+def _subject_language(subject_name: str):
+    # Trailing space as in the combined subject + topic text, so phrases
+    # like 'programming in c ' still match a subject ending in "C"
+    detected = _subject_languages.get(subject_name)
+    if detected is MISSING:
+        detected = _detect_language(f"{subject_name.lower()} ")
+        _subject_languages.put(subject_name, detected)
+    return detected
+
+def get_simulation_links(simulation_name: str, subject_name: str = "") -> tuple:
     """
     Generates relevant simulation/practice links based on the topic.
     Detects the programming language from the subject name first, then topic.
-    Includes IIT VLabs links when a match is found in the VLabs database.
+    Includes IIT VLabs links when a match is found in the VLabs database
+    (up to settings.VLABS_MAX_ALTERNATIVES of them, best first).
     Uses only Programiz for online compilers + YouTube for tutorials.
+    The result is shared with other callers, so it is read-only: a tuple
+    of FrozenDicts.
     """
-    # Combine subject name + topic for language detection (subject takes priority)
-    combined_text = f"{subject_name} {simulation_name}".lower()
-    links = []
-
-    # ===== IIT VLabs match (prepend if found) =====
-    vlabs_link = find_vlabs_link(simulation_name, subject_name)
-    if vlabs_link:
-        links.append(vlabs_link)
-
-    # ===== Programiz language URL map =====
-    # Key: keyword to detect | Value: Programiz URL slug
-    lang_map = {
-        'c++':         {'slug': 'cpp-programming', 'label': 'C++'},
-        'cpp':         {'slug': 'cpp-programming', 'label': 'C++'},
-        'c#':          {'slug': 'csharp', 'label': 'C#'},
-        'c sharp':     {'slug': 'csharp', 'label': 'C#'},
-        '.net':        {'slug': 'csharp', 'label': 'C#'},
-        'java':        {'slug': 'java-programming', 'label': 'Java'},
-        'python':      {'slug': 'python-programming', 'label': 'Python'},
-        'javascript':  {'slug': 'javascript', 'label': 'JavaScript'},
-        'typescript':  {'slug': 'typescript', 'label': 'TypeScript'},
-        'html':        {'slug': 'html-css', 'label': 'HTML/CSS'},
-        'css':         {'slug': 'html-css', 'label': 'HTML/CSS'},
-        'php':         {'slug': 'php', 'label': 'PHP'},
-        'sql':         {'slug': 'sql', 'label': 'SQL'},
-        'r programming': {'slug': 'r-programming', 'label': 'R'},
-        'ruby':        {'slug': 'ruby', 'label': 'Ruby'},
-        'kotlin':      {'slug': 'kotlin', 'label': 'Kotlin'},
-        'swift':       {'slug': 'swift', 'label': 'Swift'},
-        'golang':      {'slug': 'golang', 'label': 'Go'},
-        'go lang':     {'slug': 'golang', 'label': 'Go'},
-        'rust':        {'slug': 'rust', 'label': 'Rust'},
-        'dart':        {'slug': 'dart', 'label': 'Dart'},
-        'scala':       {'slug': 'scala', 'label': 'Scala'},
-    }
+    return get_simulation_links_batch([simulation_name], subject_name)[0]
+
+def get_simulation_links_batch(simulation_names: list, subject_name: str = "") -> list:
+    """
+    Batch form of get_simulation_links for topics of one subject.
+    Link lists are memoized per (subject, topic) under the current
+    simulation_links_version(), so a catalogue or settings change misses.
+    For the topics not cached, the VLabs discipline/lab resolution runs
+    once for the whole batch, as does the fan-out to the other catalogue
+    shards. Returns one read-only link list per simulation name, in input order.
+    """
+    version = simulation_links_version()
+    results = [_links_cache.get((version, subject_name, name)) for name in simulation_names]
+    missing = list(dict.fromkeys(
+        name for name, links in zip(simulation_names, results) if links is MISSING
+    ))
+    if not missing:
+        return results
 
-    # Also detect plain 'c ' as C language (avoid matching 'c++', 'c#' etc.)
-    is_c_lang = any(p in combined_text for p in [
-        'c program', 'c language', 'programming in c ',
-        'basic c ', ' in c.', ' in c,', ' using c',
-        'through c ', 'with c ', 'c coding',
-    ])
+    max_vlabs = settings.VLABS_MAX_ALTERNATIVES
+    if max_vlabs > 1:
+        vlabs_per_name = find_all_vlabs_links_batch(missing, subject_name, max_vlabs)
+    else:
+        vlabs_per_name = [
+            [link] if link else []
+            for link in find_vlabs_links_batch(missing, subject_name)
+        ]
+    source_per_name = find_source_links_batch(missing, subject_name)
+    computed = {}
+    for name, vlabs_links, source_links in zip(missing, vlabs_per_name, source_per_name):
+        links = tuple(FrozenDict(link) for link in
+                      _build_simulation_links(name, subject_name, vlabs_links, source_links))
+        _links_cache.put((version, subject_name, name), links)
+        computed[name] = links
+    return [computed[name] if links is MISSING else links
+            for name, links in zip(simulation_names, results)]
 
-    # Try to detect language from combined text
-    detected = None
-    for lang_key, lang_info in lang_map.items():
-        if lang_key in combined_text:
-            detected = lang_info
-            break
+def _build_simulation_links(simulation_name: str, subject_name: str, vlabs_links: list,
+                            source_links: list = ()) -> list:
+    """
+    Assemble the link list around already-resolved VLabs matches and the
+    best hit of each other catalogue shard. A source with a direct hit
+    doesn't also get its generic search link.
+    """
+    # ===== IIT VLabs matches, then other catalogues' matches (prepend if found) =====
+    links = list(vlabs_links) + list(source_links)
+    direct_sources = {link["source"] for link in source_links}
 
-    # Fallback to C if no specific match but C indicators found
-    if not detected and is_c_lang:
-        detected = {'slug': 'c-programming', 'label': 'C'}
+    # Language named by the subject wins; otherwise look at subject + topic
+    # together (first LANG_MAP key wins, then C if C indicators are found)
+    detected = (_subject_language(subject_name)
+                or _detect_language(f"{subject_name} {simulation_name}".lower()))
 
     # ===== Generate links =====
     if detected:
@@ -405,24 +700,11 @@ def get_simulation_links(simulation_name: str, subject_name: str = "") -> list:
     else:
         # Non-programming: science / engineering topics
         search_query = simulation_name.replace(' ', '+')
-
-        links.append({
-            "source": "PhET Simulations",
-            "url": f"https://phet.colorado.edu/en/simulations/filter?sort=relevance&q={search_query}",
-            "description": "Interactive STEM simulations by University of Colorado"
-        })
-
-        links.append({
-            "source": "Virtual Labs India",
-            "url": f"https://www.vlab.co.in/broad-area-computer-science-and-engineering",
-            "description": "IIT virtual lab experiments"
-        })
-
-        links.append({
-            "source": "OLabs",
-            "url": f"https://www.olabs.edu.in/?pg=search&q={search_query}",
-            "description": "Virtual science labs for schools and colleges"
-        })
+        links.extend(
+            {"source": source, "url": url.format(q=search_query), "description": description}
+            for source, url, description in GENERIC_LINKS
+            if source not in direct_sources
+        )
 
     # Always add YouTube search
     yt_query = simulation_name.replace(' ', '+')
@@ -0,0 +1,240 @@
+"""
+Streaming ingestion of VLabs catalogue exports into the matcher's data file.
+
+Reads either export the VLabs team publishes — the Google Sheets HTML table
+("iib vlabs table.html") or the CSV ("vlabs_experiments.csv") — one row at
+a time: the HTML is fed to the parser in fixed-size chunks and the CSV is
+read line by line, so only the current chunk's rows are held in memory.
+URLs are kept exactly as entered in the sheet, percent-escapes included:
+HTML link cells are read from their href, not their (decoded) text, and
+Google redirect links are unwrapped without decoding, so both exports give
+the same URLs. Every row is cleaned (whitespace collapsed, redirect links
+unwrapped), checked (experiment name present, experiment URL a syntactically
+valid http(s) URL) and de-duplicated on discipline, lab, experiment name and
+URL, case-insensitively; the de-duplication set keeps a 12-byte digest per
+entry rather than the entry.
+
+Accepted entries are streamed into vlabs_experiments.json in the same
+layout the hand-prepared file uses, written atomically. Optionally the
+matcher's compiled snapshot is rebuilt from it right away.
+
+Entry points: ingest() (used by ingest_vlabs.py), iter_rows(), clean_entry().
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Output fields, in the order the data file lists them
+FIELDS = ("discipline_name", "discipline_url", "lab_name", "lab_url", "pic",
+          "experiment_name", "experiment_url")
+_REQUIRED = ("discipline_name", "lab_name", "experiment_name", "experiment_url")
+
+# Characters of HTML read per parser feed
+_CHUNK = 64 * 1024
+
+
+def _column(header: str) -> str:
+    """'Discipline Name' → 'discipline_name'."""
+    return re.sub(r"[^a-z0-9]+", "_", header.strip().lower()).strip("_")
+
+
+def _collapse(text: str) -> str:
+    return " ".join(text.split())
+
+
+# ====== Readers ======
+
+class _TableParser(HTMLParser):
+    """
+    Collects <td> texts per <tr>; <th> cells (sheet row numbers) are skipped.
+    A cell showing a URL yields its link's href instead of the text: the
+    sheet renders link text percent-decoded (%23 → #), while the href
+    keeps the URL as it was entered.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[List[str]] = []
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+        self._href: Optional[str] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+            self._href = None
+        elif tag == "a" and self._cell is not None and self._href is None:
+            self._href = dict(attrs).get("href")
+        elif tag == "br" and self._cell is not None:
+            self._cell.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag == "td" and self._cell is not None:
+            text = "".join(self._cell)
+            if self._href and text.strip().lower().startswith(("http://", "https://")):
+                text = self._href
+            self._row.append(text)
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def _iter_html_cells(path: str) -> Iterator[List[str]]:
+    parser = _TableParser()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield from parser.rows
+            parser.rows.clear()
+    parser.close()
+    yield from parser.rows
+
+
+def _iter_csv_cells(path: str) -> Iterator[List[str]]:
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as f:
+        yield from csv.reader(f)
+
+
+def iter_rows(path: str, fmt: str = "auto") -> Iterator[Dict[str, str]]:
+    """
+    Stream an export's data rows as {column: text}, columns named after the
+    header row ('Experiment URL' → 'experiment_url'). Rows before the header
+    and blank rows (e.g. the sheet's freeze bar) are skipped.
+    fmt: "csv", "html" or "auto" (by file extension).
+    """
+    if fmt == "auto":
+        fmt = "csv" if path.lower().endswith(".csv") else "html"
+    if fmt not in ("csv", "html"):
+        raise ValueError(f"Unknown export format: {fmt}")
+    cells = _iter_csv_cells(path) if fmt == "csv" else _iter_html_cells(path)
+
+    header: Optional[List[str]] = None
+    for row in cells:
+        if not any(c.strip() for c in row):
+            continue
+        if header is None:
+            columns = [_column(c) for c in row]
+            if all(col in columns for col in _REQUIRED):
+                header = columns
+            continue
+        yield dict(zip(header, row))
+    if header is None:
+        raise ValueError(f"No header row with {', '.join(_REQUIRED)} found in {path}")
+
+
+# ====== Cleaning ======
+
+def _unwrap(url: str) -> str:
+    """
+    Target of a Google redirect link (https://www.google.com/url?q=…), else
+    url. The q value is taken as written, not percent-decoded: it is the URL
+    as entered in the sheet (what the CSV export holds), escapes included.
+    """
+    parts = urlsplit(url)
+    if parts.netloc.endswith("google.com") and parts.path == "/url":
+        for param in parts.query.split("&"):
+            if param.startswith("q=") and len(param) > 2:
+                return param[2:]
+    return url
+
+
+def valid_url(url: str) -> bool:
+    """Syntactic check only: http(s), a dotted host, no whitespace."""
+    if not url or any(c.isspace() for c in url):
+        return False
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+    except ValueError:
+        return False
+    return parts.scheme in ("http", "https") and "." in host and not host.startswith(".")
+
+
+def clean_entry(row: Dict[str, str]) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    """
+    (entry, None) for a usable row, or (None, reason) with reason one of
+    "missing_field" or "invalid_url". Invalid discipline / lab URLs are
+    blanked rather than rejected.
+    """
+    entry = {field: _collapse(row.get(field) or "") for field in FIELDS}
+    for field in ("discipline_url", "lab_url", "experiment_url"):
+        if entry[field]:
+            entry[field] = _unwrap(entry[field])
+    if not all(entry[field] for field in _REQUIRED):
+        return None, "missing_field"
+    if not valid_url(entry["experiment_url"]):
+        return None, "invalid_url"
+    for field in ("discipline_url", "lab_url"):
+        if entry[field] and not valid_url(entry[field]):
+            entry[field] = ""
+    return entry, None
+
+
+def _dedupe_key(entry: Dict[str, str]) -> bytes:
+    key = "\0".join(entry[f].casefold() for f in
+                    ("discipline_name", "lab_name", "experiment_name", "experiment_url"))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=12).digest()
+
+
+# ====== Writer ======
+
+def ingest(src: str, out: str, fmt: str = "auto",
+           snapshot_path: Optional[str] = None) -> Dict:
+    """
+    Stream src into the catalogue JSON at out (atomic replace), then, if
+    snapshot_path is given, compile the matcher snapshot from it.
+
+    Returns:
+        { rows, written, duplicates, rejected: {reason: n}, elapsed }
+    """
+    started = time.perf_counter()
+    stats = {"rows": 0, "written": 0, "duplicates": 0,
+             "rejected": {"missing_field": 0, "invalid_url": 0}}
+    seen = set()
+    tmp_path = f"{out}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for row in iter_rows(src, fmt):
+                stats["rows"] += 1
+                entry, reason = clean_entry(row)
+                if entry is None:
+                    stats["rejected"][reason] += 1
+                    continue
+                key = _dedupe_key(entry)
+                if key in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(key)
+                # Same layout as json.dumps(entries, indent=2, ensure_ascii=False)
+                body = json.dumps(entry, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+                f.write(("," if stats["written"] else "") + "\n  " + body)
+                stats["written"] += 1
+            f.write("\n]" if stats["written"] else "]")
+        os.replace(tmp_path, out)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if snapshot_path:
+        from services.vlabs_matcher import build_snapshot
+        build_snapshot(out, snapshot_path)
+    stats["elapsed"] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,113 @@
+"""
+MinHash / LSH candidate index for the VLabs matcher ("lsh" backend).
+
+Every catalogue experiment name becomes a set of shingles — its tokens
+plus the character trigrams of its token stream (stop words dropped, so
+"Write a program for bubble sort" and "Bubble Sort" shingle alike). A
+MinHash signature of `bands × rows` values summarises each set; names whose
+signatures agree on all rows of at least one band share a bucket. A query
+only looks at the names in its buckets, so Stage 3 cost depends on how
+many names are similar to the topic rather than on catalogue size.
+
+Two names with shingle Jaccard similarity J collide with probability
+1 - (1 - J^rows)^bands; the defaults (32 bands × 2 rows) find pairs with
+J ≥ 0.25 over 85% of the time. Candidates are re-ranked by the matcher's
+exact scorer, so the index can only lose matches, never invent them —
+benchmarks/bench_lsh.py reports that recall and the latency against the
+exhaustive scan.
+
+Short names are unreliable to hash (a one-token topic has three or four
+shingles), so names sharing a rare token with the query are added as
+candidates too; "rare" means the token's postings hold at most
+`rare_postings` names.
+
+numpy is optional; when present, bulk signature building is vectorised.
+"""
+
+import random
+import zlib
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+# Mersenne prime for the (a·x + b) mod p hash family; small enough that
+# a·x + b stays within 64 bits for 31-bit shingle hashes
+_PRIME = (1 << 31) - 1
+
+# Names per block when building signatures with numpy
+_CHUNK = 2048
+
+
+def shingles(words: Sequence[str]) -> Set[str]:
+    """
+    Tokens plus character trigrams of the (stop-word-free) token stream.
+    Never empty: a name without tokens is the single shingle "".
+    """
+    stream = " ".join(words)
+    grams = {stream[i:i + 3] for i in range(len(stream) - 2)} if len(stream) >= 3 else {stream}
+    return grams | {"#" + w for w in words}
+
+
+def _shingle_hashes(items: Iterable[str]) -> List[int]:
+    return [zlib.crc32(s.encode("utf-8")) % _PRIME for s in items]
+
+
+class LSHIndex:
+    """MinHash signatures with LSH banding over catalogue experiment names."""
+
+    def __init__(self, names: Sequence[str], words: Dict[str, Sequence[str]],
+                 postings: Dict[int, FrozenSet[str]],
+                 bands: int = 32, rows: int = 2, rare_postings: int = 64, seed: int = 1):
+        self.bands = max(1, bands)
+        self.rows = max(1, rows)
+        rnd = random.Random(seed)
+        perms = [(rnd.randrange(1, _PRIME), rnd.randrange(0, _PRIME))
+                 for _ in range(self.bands * self.rows)]
+        self._a = [a for a, _ in perms]
+        self._b = [b for _, b in perms]
+        self._rare = {t: names_ for t, names_ in postings.items() if len(names_) <= rare_postings}
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [{} for _ in range(self.bands)]
+
+        names = list(dict.fromkeys(names))
+        hashes = [_shingle_hashes(shingles(words.get(n, ()))) for n in names]
+        for name, sig in zip(names, self._signatures(hashes)):
+            for band, key in enumerate(self._band_keys(sig)):
+                self._buckets[band].setdefault(key, []).append(name)
+        self.size = len(names)
+
+    def _signature(self, hashes: List[int]) -> List[int]:
+        return [min([(a * h + b) % _PRIME for h in hashes]) for a, b in zip(self._a, self._b)]
+
+    def _signatures(self, hash_lists: List[List[int]]) -> List[List[int]]:
+        """Same values as _signature per list (shingle sets are never empty)."""
+        if not HAS_NUMPY:
+            return [self._signature(h) for h in hash_lists]
+        a = np.array(self._a, dtype=np.int64)[:, None]
+        b = np.array(self._b, dtype=np.int64)[:, None]
+        out: List[List[int]] = []
+        for start in range(0, len(hash_lists), _CHUNK):
+            block = hash_lists[start:start + _CHUNK]
+            flat = np.fromiter((h for hs in block for h in hs), dtype=np.int64)
+            offsets = np.cumsum([0] + [len(hs) for hs in block[:-1]])
+            mins = np.minimum.reduceat((a * flat[None, :] + b) % _PRIME, offsets, axis=1)
+            out.extend(mins.T.tolist())
+        return out
+
+    def _band_keys(self, sig: List[int]) -> Iterable[Tuple[int, ...]]:
+        r = self.rows
+        return (tuple(sig[i * r:(i + 1) * r]) for i in range(self.bands))
+
+    def candidates(self, words: Sequence[str], token_ids: FrozenSet[int]) -> Set[str]:
+        """Names sharing a bucket or a rare token with the query."""
+        found: Set[str] = set()
+        sig = self._signature(_shingle_hashes(shingles(words)))
+        for band, key in enumerate(self._band_keys(sig)):
+            found.update(self._buckets[band].get(key, ()))
+        for t in token_ids:
+            found.update(self._rare.get(t, ()))
+        return found
@@ -8,13 +8,46 @@ Matching pipeline (3 stages):
   Stage 3 — Experiment : experiment_topic → best matching experiment within that lab
 
 Falls through to a wider pool if a stage produces no confident candidates.
+Stages 1 and 2 depend only on the subject, so their outcome is cached per
+subject (and optionally persisted, see services.vlabs_subject_store).
+
+The catalogue index is built lazily on first use (or by warm_up(), which
+main.py runs in a background thread at startup), not at import time.
+reload_catalogue() picks up an edited data file without a restart: the new
+index is built beside the live one and swapped in atomically.
+
+Further catalogues (e.g. PhET, OLabs) can be dropped into data/catalogues/
+as {"source": ..., "experiments": [...]} files with the same fields. Each
+becomes its own index shard with the same three stages; find_source_links_batch
+fans a query out across the shards concurrently and returns the best hit
+per source.
+
+Stage 3 scoring backend is chosen by settings.VLABS_MATCHER_BACKEND:
+  "python" — postings-pruned scan (default)
+  "sparse" — vectorised upper bounds via services.vlabs_sparse (numpy/scipy)
+  "lsh"    — MinHash/LSH candidates via services.vlabs_lsh, re-ranked exactly
+"python" and "sparse" return the same picks; "lsh" is approximate and meant
+for catalogues too large to scan (see benchmarks/bench_lsh.py for its recall).
 """
 
+import hashlib
+import heapq
+import inspect
 import json
 import os
+import pickle
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
-from typing import Optional, Dict, List
+from glob import glob
+from typing import Callable, Optional, Dict, List, FrozenSet, Tuple
+
+from core.config import settings
+from utils.cache import LRUCache, MISSING
+from utils.keywords import KeywordClassifier
+from utils.metrics import COUNT_BUCKETS, LATENCY_MS_BUCKETS, MetricSet
 
 # ── Data path ────────────────────────────────────────────────────────
 
@@ -22,9 +55,69 @@ _DATA_PATH = os.path.join(
     os.path.dirname(os.path.dirname(__file__)), "data", "vlabs_experiments.json"
 )
 
-# ── Hierarchical index ───────────────────────────────────────────────
-# Structure: { discipline_name: { lab_name: [entry, ...] } }
-_index: Dict[str, Dict[str, List[Dict]]] = {}
+# Extra per-source catalogues, one shard per *.json file
+_CATALOGUE_DIR = settings.VLABS_CATALOGUE_DIR or os.path.join(
+    os.path.dirname(_DATA_PATH), "catalogues"
+)
+
+# Link source of the main catalogue (the file at _DATA_PATH)
+PRIMARY_SOURCE = "IIT VLabs"
+
+# Bump MATCHER_VERSION whenever scoring or candidate selection changes, so
+# links stored with the previous rules are recomputed (see simulation_links_version).
+MATCHER_VERSION = 1
+
+# Precompiled index snapshot (see build_snapshot / build_vlabs_snapshot.py).
+# Bump _SNAPSHOT_FORMAT whenever the index layout changes. Snapshots are also
+# stamped with MATCHER_VERSION and a digest of the text-processing code
+# (_SNAPSHOT_CODE), so an edit there can't be served a stale index.
+_SNAPSHOT_PATH = os.path.join(os.path.dirname(_DATA_PATH), "vlabs_index.pickle")
+_SNAPSHOT_FORMAT = 1
+
+# ── Scoring backend ──────────────────────────────────────────────────
+_backend = settings.VLABS_MATCHER_BACKEND.strip().lower()
+# The sparse scorer is built per catalogue on first use. numpy/scipy are
+# imported only then, so the default backend does not pay for them at startup.
+
+# ── Result cache ─────────────────────────────────────────────────────
+# (catalogue version, normalised topic, normalised subject or None,
+# max_results) → link dict or None when max_results is 0, else a tuple of
+# scored link dicts. Matching only ever sees the normalised forms, so this
+# key is exact; None marks an empty subject, which takes a different
+# Stage 1/2 path.
+# The version keeps results computed against a replaced catalogue from
+# being served after a reload, even if they are stored after the swap.
+_match_cache = LRUCache(settings.VLABS_MATCH_CACHE_SIZE)
+
+# (catalogue version, normalised subject or None) → (lab pool, resolution).
+# Stage 1 and 2 only see the subject name, so a lookup for a known subject
+# goes straight to Stage 3. The resolution — (discipline, lab) pairs in pool
+# order plus both fallback flags — is what vlabs_subject_store persists
+# when VLABS_SUBJECT_CACHE_PERSIST is on; _swap preloads it for the new
+# catalogue.
+_subject_cache = LRUCache(settings.VLABS_SUBJECT_CACHE_SIZE)
+_subject_persist = settings.VLABS_SUBJECT_CACHE_PERSIST
+
+# ── Funnel instrumentation ───────────────────────────────────────────
+# Recorded once per lookup that reaches the stages (i.e. has cache misses):
+# stage timings, exact score evaluations, fallbacks to the all-disciplines /
+# all-labs pool, and outcome. Stage 3 figures are per topic, so single and
+# batched lookups land in the same histograms. The tally counts normalised
+# subject names that caused a fallback.
+_metrics = MetricSet(
+    histograms={
+        "discipline_ms": LATENCY_MS_BUCKETS,
+        "lab_ms": LATENCY_MS_BUCKETS,
+        "experiment_ms": LATENCY_MS_BUCKETS,
+        "discipline_scored": COUNT_BUCKETS,
+        "lab_scored": COUNT_BUCKETS,
+        "experiment_scored": COUNT_BUCKETS,
+        "experiment_pool": COUNT_BUCKETS,
+    },
+    counters=("lookups", "topics", "cache_hits", "subject_cache_hits", "matched",
+              "unmatched", "discipline_fallback", "lab_fallback"),
+)
+_metrics_enabled = settings.VLABS_MATCHER_METRICS
 
 # ── Fast-path discipline hint keywords ──────────────────────────────
 # Maps lowercase keyword fragments → discipline name in the dataset
@@ -126,6 +219,11 @@ _STOP_WORDS = {
 }
 
 
+def _words(norm: str) -> List[str]:
+    """Meaningful tokens of an already normalised string, in order."""
+    return [t for t in norm.split() if len(t) >= 2 and t not in _STOP_WORDS]
+
+
 def _tokenize(text: str) -> set:
     """Return meaningful tokens (len ≥ 2, not stop-words)."""
     return {t for t in _normalize(text).split() if len(t) >= 2 and t not in _STOP_WORDS}
@@ -154,140 +252,1054 @@ def _score(topic: str, candidate: str, topic_tokens: set) -> float:
     return _overlap(topic_tokens, cand_tokens) * 0.65 + _seq_sim(topic, candidate) * 0.35
 
 
+# ── Prepared (index-side) scoring ────────────────────────────────────
+# A prepared query is (normalised_text, frozenset(known token_ids), n_tokens).
+# n_tokens counts every meaningful token, including ones that never occur
+# in the catalogue, so the Jaccard denominator matches _overlap exactly.
+
+def _name_features(name: str, token_ids: Dict[str, int]) -> Tuple[str, FrozenSet[int]]:
+    """Normalise and tokenise a catalogue name, interning new tokens into token_ids."""
+    ids = frozenset(token_ids.setdefault(t, len(token_ids)) for t in _tokenize(name))
+    return _normalize(name), ids
+
+
+def _intern_name(name: str, cat: "Optional[_Catalogue]" = None) -> Tuple[str, FrozenSet[int]]:
+    """
+    Precomputed features of a catalogue name. Names outside the catalogue
+    are featurised on the fly without touching it: their unknown tokens get
+    negative ids, which count towards the Jaccard union but never match.
+    """
+    cat = cat or _catalogue
+    feat = cat.features.get(name)
+    if feat is None:
+        token_ids = cat.token_ids
+        unknown = iter(range(-1, -1 - len(name), -1))
+        feat = _normalize(name), frozenset(
+            token_ids[t] if t in token_ids else next(unknown) for t in _tokenize(name)
+        )
+    return feat
+
+
+def _prepare_query(text: str, cat: "Optional[_Catalogue]" = None) -> Tuple[str, FrozenSet[int], int]:
+    """Normalise and tokenise the query side once per stage."""
+    token_ids = (cat or _catalogue).token_ids
+    tokens = _tokenize(text)
+    ids = frozenset(token_ids[t] for t in tokens if t in token_ids)
+    return _normalize(text), ids, len(tokens)
+
+
+def _score_prepared(query: Tuple[str, FrozenSet[int], int],
+                    feat: Tuple[str, FrozenSet[int]]) -> float:
+    """Same value as _score(), computed from precomputed features."""
+    q_norm, q_ids, q_len = query
+    c_norm, c_ids = feat
+    # Exact substring shortcut
+    if q_norm in c_norm or c_norm in q_norm:
+        return 0.95
+    overlap = 0.0
+    if q_len and c_ids:
+        inter = len(q_ids & c_ids)
+        overlap = inter / (q_len + len(c_ids) - inter)
+    return overlap * 0.65 + SequenceMatcher(None, q_norm, c_norm).ratio() * 0.35
+
+
+# ── Score upper bounds ───────────────────────────────────────────────
+# SequenceMatcher.ratio() dominates matching cost. The bounds below are
+# cheap and never smaller than the ratio (difflib's real_quick_ratio and
+# quick_ratio), so a candidate whose bounded score is below the score it
+# must reach can be skipped without changing the result.
+
+def _length_bound(a: str, b: str) -> float:
+    """Upper bound on SequenceMatcher(a, b).ratio() from lengths alone."""
+    la, lb = len(a), len(b)
+    return 2.0 * min(la, lb) / (la + lb) if la + lb else 1.0
+
+
+def _bounded_score(q_norm: str, c_norm: str, overlap: float, floor: float) -> float:
+    """
+    overlap * 0.65 + ratio * 0.35 for a non-shortcut pair, or -1.0 as soon
+    as an upper bound (length, then quick_ratio) shows it is below floor.
+    """
+    base = overlap * 0.65
+    if base + _length_bound(q_norm, c_norm) * 0.35 < floor:
+        return -1.0
+    matcher = SequenceMatcher(None, q_norm, c_norm)
+    if base + matcher.quick_ratio() * 0.35 < floor:
+        return -1.0
+    return base + matcher.ratio() * 0.35
+
+
 # ── Build hierarchical index ─────────────────────────────────────────
 
-def _load_data():
-    global _index
-    if _index:
-        return
+def _build_index(data: List[Dict]) -> Dict:
+    """
+    Build every catalogue-derived structure from the raw JSON entries:
+    hierarchy, token vocabulary, name features and Stage 3 postings.
+    """
+    index: Dict[str, Dict[str, List[Dict]]] = {}
+    token_ids: Dict[str, int] = {}
+    features: Dict[str, Tuple[str, FrozenSet[int]]] = {}
+    postings: Dict[int, set] = {}
+
+    def intern(name: str) -> Tuple[str, FrozenSet[int]]:
+        feat = features.get(name)
+        if feat is None:
+            feat = features[name] = _name_features(name, token_ids)
+        return feat
+
+    for entry in data:
+        disc = entry.get("discipline_name", "Unknown")
+        lab  = entry.get("lab_name", "Unknown")
+        index.setdefault(disc, {}).setdefault(lab, []).append(entry)
+        intern(disc)
+        intern(lab)
+        exp_name = entry.get("experiment_name", "")
+        for token_id in intern(exp_name)[1]:
+            postings.setdefault(token_id, set()).add(exp_name)
+
+    return {
+        "index": index,
+        "token_ids": token_ids,
+        "features": features,
+        "postings": {t: frozenset(names) for t, names in postings.items()},
+    }
+
+
+class _Catalogue:
+    """
+    One immutable build of the catalogue: hierarchy, name features, Stage 3
+    postings and the discipline-hint classifier, plus the sha256 of the data
+    file it came from (its version; "<source>:<sha256>" for shards), that
+    file's (mtime_ns, size) when read and the source name its links carry.
+    """
+
+    __slots__ = ("index", "token_ids", "features", "postings", "hints",
+                 "version", "stat", "sparse_scorer", "lsh_index", "source")
+
+    def __init__(self, built: Dict, version: str = "",
+                 stat: Optional[Tuple[int, int]] = None,
+                 source: str = PRIMARY_SOURCE):
+        self.index: Dict[str, Dict[str, List[Dict]]] = built["index"]
+        self.token_ids: Dict[str, int] = built["token_ids"]
+        self.features: Dict[str, Tuple[str, FrozenSet[int]]] = built["features"]
+        self.postings: Dict[int, FrozenSet[str]] = built["postings"]
+        self.hints = KeywordClassifier(
+            (keyword, disc) for keyword, disc in DISCIPLINE_HINTS.items() if disc in self.index
+        )
+        self.version = version
+        self.stat = stat
+        self.sparse_scorer = None
+        self.lsh_index = None
+        self.source = source
+
+    def experiment_count(self) -> int:
+        return sum(len(entries) for labs in self.index.values() for entries in labs.values())
+
+
+# ── Active catalogue ─────────────────────────────────────────────────
+# Replaced wholesale by _swap(), never mutated, so a match that read this
+# reference once keeps a consistent view even if a reload lands mid-way.
+_catalogue = _Catalogue(_build_index([]))
+
+
+def _swap(cat: _Catalogue) -> None:
+    """Make cat the active catalogue and drop results cached for the old one."""
+    global _catalogue
+    _catalogue = cat
+    _match_cache.clear()
+    _subject_cache.clear()
+    if _subject_persist and cat.index:
+        _preload_subjects(cat)
+
+
+def _set_shards(shards: Dict[str, _Catalogue]) -> None:
+    global _shards
+    _shards = shards
+
+
+# Everything whose code shapes the built index or what the scan expects of it
+_SNAPSHOT_CODE_PARTS = (_normalize, _words, _tokenize, _score, _name_features, _build_index)
+
+
+def _snapshot_code() -> str:
+    """MATCHER_VERSION plus a digest of the index-building code and stop-words."""
+    h = hashlib.sha256(repr(sorted(_STOP_WORDS)).encode("utf-8"))
+    for fn in _SNAPSHOT_CODE_PARTS:
+        try:
+            h.update(inspect.getsource(fn).encode("utf-8"))
+        except (OSError, TypeError):
+            h.update(fn.__code__.co_code)       # no source shipped: bytecode
+    return f"{MATCHER_VERSION}:{h.hexdigest()[:16]}"
+
+
+_SNAPSHOT_CODE = _snapshot_code()
+
+
+def _read_snapshot(source_digest: str) -> Optional[Dict]:
+    """Return the snapshot's built index if it matches this source, format and code."""
+    if not os.path.exists(_SNAPSHOT_PATH):
+        return None
+    try:
+        with open(_SNAPSHOT_PATH, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable VLabs snapshot: {e}")
+        return None
+    if (snapshot.get("format") != _SNAPSHOT_FORMAT
+            or snapshot.get("code") != _SNAPSHOT_CODE
+            or snapshot.get("source_sha256") != source_digest):
+        return None
+    return snapshot["built"]
+
+
+def _write_snapshot(digest: str, built: Dict, snapshot_path: str) -> None:
+    """Write built atomically, so running workers never see a partial file."""
+    snapshot = {
+        "format": _SNAPSHOT_FORMAT,
+        "code": _SNAPSHOT_CODE,
+        "source_sha256": digest,
+        "built": built,
+    }
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+
+
+def build_snapshot(data_path: str = _DATA_PATH, snapshot_path: str = _SNAPSHOT_PATH) -> str:
+    """
+    Compile the catalogue JSON into a binary snapshot of the ready-built
+    index, stamped with the JSON's sha256, _SNAPSHOT_FORMAT and
+    _SNAPSHOT_CODE. Returns the source digest.
+    """
+    with open(data_path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    _write_snapshot(digest, _build_index(json.loads(raw)), snapshot_path)
+    return digest
 
-    if not os.path.exists(_DATA_PATH):
+
+def _file_stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _source_stat() -> Optional[Tuple[int, int]]:
+    return _file_stat(_DATA_PATH)
+
+
+def _read_catalogue(current: Optional[_Catalogue] = None) -> Optional[_Catalogue]:
+    """
+    Build a catalogue from the data file, via the snapshot when it matches.
+    Returns None if the file is missing or unreadable, and `current` itself
+    (with its stat refreshed) if the file content has not changed.
+    """
+    stat = _source_stat()
+    if stat is None:
         print(f"⚠️  VLabs data file not found: {_DATA_PATH}")
-        return
+        return None
 
     try:
-        with open(_DATA_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(_DATA_PATH, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if current is not None and digest == current.version:
+            current.stat = stat
+            return current
+        built = _read_snapshot(digest)
+        source = "snapshot"
+        if built is None:
+            built = _build_index(json.loads(raw))
+            source = "json"
     except Exception as e:
         print(f"⚠️  Failed to load VLabs data: {e}")
+        return None
+
+    if source == "json":
+        # Later processes (restarts, spawned rematch workers) load this instead
+        try:
+            _write_snapshot(digest, built, _SNAPSHOT_PATH)
+        except OSError as e:
+            print(f"⚠️  Could not write VLabs snapshot: {e}")
+
+    cat = _Catalogue(built, digest, stat)
+    print(f"✅ VLabs matcher loaded ({source}): {cat.experiment_count()} experiments, "
+          f"{len(cat.index)} disciplines, "
+          f"{sum(len(d) for d in cat.index.values())} labs")
+    return cat
+
+
+# ── Catalogue shards ─────────────────────────────────────────────────
+# path → _Catalogue for every file in _CATALOGUE_DIR, in path order.
+# Replaced wholesale like _catalogue; shard versions include the source, so
+# shards never share result or subject cache entries with each other.
+_shards: Dict[str, _Catalogue] = {}
+
+
+def _read_shard(path: str, current: Optional[_Catalogue] = None) -> Optional[_Catalogue]:
+    """
+    Build a shard from a {"source": ..., "experiments": [...]} file. Returns
+    None on error and `current` (stat refreshed) if the content is unchanged.
+    """
+    stat = _file_stat(path)
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw)
+        source = str(data["source"]).strip()
+        if not source or source == PRIMARY_SOURCE:
+            raise ValueError(f"invalid source name {source!r}")
+        version = f"{source}:{hashlib.sha256(raw).hexdigest()}"
+        if current is not None and version == current.version:
+            current.stat = stat
+            return current
+        cat = _Catalogue(_build_index(data["experiments"]), version, stat, source)
+    except Exception as e:
+        print(f"⚠️  Failed to load catalogue {os.path.basename(path)}: {e}")
+        return None
+    print(f"✅ VLabs matcher loaded shard {source}: {cat.experiment_count()} experiments, "
+          f"{len(cat.index)} disciplines, "
+          f"{sum(len(d) for d in cat.index.values())} labs")
+    return cat
+
+
+def _read_shards(current: Dict[str, _Catalogue],
+                 force: bool = False) -> Tuple[Dict[str, _Catalogue], bool]:
+    """
+    (shards for the files now in _CATALOGUE_DIR, whether anything changed).
+    Unchanged files keep their shard; a file that fails to load keeps its
+    previous shard, if any.
+    """
+    shards: Dict[str, _Catalogue] = {}
+    changed = False
+    for path in sorted(glob(os.path.join(_CATALOGUE_DIR, "*.json"))):
+        cur = current.get(path)
+        if cur is not None and not force and cur.stat == _file_stat(path):
+            shards[path] = cur
+            continue
+        cat = _read_shard(path, None if force else cur)
+        if cat is None:
+            cat = cur
+        if cat is not None:
+            shards[path] = cat
+            changed = changed or cat is not cur
+    changed = changed or set(shards) != set(current)
+    return shards, changed
+
+
+# ── Lazy loading ─────────────────────────────────────────────────────
+# Importing this module is cheap; the index is built by the first caller.
+# Concurrent first callers block on _load_lock and share that one build.
+# Reloads take the same lock, so at most one build runs at a time.
+_load_lock = threading.Lock()
+_loaded = False
+
+
+def _ensure_loaded() -> None:
+    global _loaded
+    if _loaded:
         return
+    with _load_lock:
+        if not _loaded:
+            cat = _read_catalogue()
+            if cat is not None:
+                _swap(cat)
+            _set_shards(_read_shards({})[0])
+            _loaded = True
 
-    for entry in data:
-        disc = entry.get("discipline_name", "Unknown")
-        lab  = entry.get("lab_name", "Unknown")
-        _index.setdefault(disc, {}).setdefault(lab, []).append(entry)
 
-    total_exp = sum(len(e) for d in _index.values() for e in d.values())
-    print(f"✅ VLabs matcher loaded: {total_exp} experiments, "
-          f"{len(_index)} disciplines, "
-          f"{sum(len(d) for d in _index.values())} labs")
+def warm_up() -> None:
+    """Build the index now if it isn't built yet (blocking, thread-safe)."""
+    _ensure_loaded()
+    for cat in (_catalogue, *_shards.values()):
+        _get_lsh_index(cat)
 
 
-_load_data()
+def start_background_warm_up() -> threading.Thread:
+    """Build the index in a daemon thread so startup doesn't wait for it."""
+    thread = threading.Thread(target=warm_up, name="vlabs-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+# ── Hot reload ───────────────────────────────────────────────────────
+# A new catalogue is built next to the active one and swapped in with a
+# single reference assignment. Matches already running finish on the old
+# catalogue; the result cache is cleared and keyed by version.
+
+_reload_listeners: List[Callable[[Dict], None]] = []
+
+
+def add_reload_listener(listener: Callable[[Dict], None]) -> None:
+    """
+    Call listener(result) after every reload that swapped something in,
+    whoever triggered it (watcher, admin endpoint, script). Adding the same
+    listener again is a no-op.
+    """
+    if listener not in _reload_listeners:
+        _reload_listeners.append(listener)
+
+
+def reload_catalogue(force: bool = False) -> Dict:
+    """
+    Re-read the data file and the shard files if they changed since their
+    catalogues were built (mtime/size first, then content hash), or
+    unconditionally with force=True. Shard files may also appear or go
+    away. On a read or parse error the active catalogue stays. If anything
+    was swapped in, the reload listeners are called.
+
+    Returns:
+        { reloaded, version, experiments, shards: {source: experiments} }
+    """
+    _ensure_loaded()
+    with _load_lock:
+        current = _catalogue
+        reloaded = False
+        if force or current.stat is None or _source_stat() != current.stat:
+            cat = _read_catalogue(None if force else current)
+            if cat is not None and cat is not current:
+                _swap(cat)
+                reloaded = True
+        shards, changed = _read_shards(_shards, force)
+        if changed:
+            _set_shards(shards)
+            reloaded = True
+    result = {
+        "reloaded": reloaded,
+        "version": _catalogue.version,
+        "experiments": _catalogue.experiment_count(),
+        "shards": {cat.source: cat.experiment_count() for cat in _shards.values()},
+    }
+    if reloaded:
+        for listener in list(_reload_listeners):
+            try:
+                listener(result)
+            except Exception as e:
+                print(f"⚠️  VLabs reload listener failed: {e}")
+    return result
+
+
+def _watch_catalogue(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            reload_catalogue()
+        except Exception as e:
+            print(f"⚠️  VLabs catalogue reload failed: {e}")
+
+
+def start_catalogue_watcher(interval: float) -> threading.Thread:
+    """Poll the data file every `interval` seconds and reload it on change."""
+    thread = threading.Thread(target=_watch_catalogue, args=(interval,),
+                              name="vlabs-catalogue-watcher", daemon=True)
+    thread.start()
+    return thread
+
+
+def catalogue_version() -> str:
+    """sha256 of the data file behind the active catalogue ("" if none)."""
+    _ensure_loaded()
+    return _catalogue.version
+
+
+def shard_versions() -> List[str]:
+    """Versions ("<source>:<sha256>") of the loaded catalogue shards, in path order."""
+    _ensure_loaded()
+    return [cat.version for cat in _shards.values()]
 
 
 # ── Stage helpers ─────────────────────────────────────────────────────
 
-def _match_discipline(subject_name: str, fallback_threshold: float = 0.20) -> List[str]:
+def _match_discipline(subject_name: str, fallback_threshold: float = 0.20,
+                      cat: Optional[_Catalogue] = None,
+                      trace: Optional[Dict] = None) -> List[str]:
     """
     Stage 1: Return list of discipline names that best match subject_name.
     Uses fast-path keyword hints first, then fuzzy scoring.
     Always returns at least all disciplines as a fallback.
+    If trace is given, sets discipline_scored and discipline_fallback in it.
     """
-    if not subject_name or not _index:
-        return list(_index.keys())
+    _ensure_loaded()
+    cat = cat or _catalogue
+    index = cat.index
+    if trace is not None:
+        trace["discipline_scored"] = 0
+        trace["discipline_fallback"] = True
+    if not subject_name or not index:
+        return list(index.keys())
 
     subj_norm = _normalize(subject_name)
 
-    # Fast-path: keyword hint lookup
-    for keyword, disc_name in DISCIPLINE_HINTS.items():
-        if keyword in subj_norm and disc_name in _index:
-            return [disc_name]
+    # Fast-path: keyword hint lookup (first hint in table order wins)
+    disc_name = cat.hints.classify(subj_norm)
+    if disc_name:
+        if trace is not None:
+            trace["discipline_fallback"] = False
+        return [disc_name]
 
     # Fuzzy fallback: score all disciplines
-    subj_tokens = _tokenize(subject_name)
+    query = _prepare_query(subject_name, cat)
     scores = {}
-    for disc in _index:
-        s = _score(subject_name, disc, subj_tokens)
+    for disc in index:
+        s = _score_prepared(query, _intern_name(disc, cat))
         if s > 0:
             scores[disc] = s
+    if trace is not None:
+        trace["discipline_scored"] = len(index)
 
     if not scores:
-        return list(_index.keys())
+        return list(index.keys())
 
     best = max(scores.values())
     if best < fallback_threshold:
-        return list(_index.keys())          # no confident match → search all
+        return list(index.keys())           # no confident match → search all
+
+    if trace is not None:
+        trace["discipline_fallback"] = False
 
     # Return disciplines within 80% of best score
     return [d for d, s in scores.items() if s >= best * 0.8]
 
 
 def _match_labs(disciplines: List[str], subject_name: str,
-                fallback_threshold: float = 0.15) -> Dict[str, List[Dict]]:
+                fallback_threshold: float = 0.15,
+                cat: Optional[_Catalogue] = None,
+                trace: Optional[Dict] = None) -> Dict[str, List[Dict]]:
     """
     Stage 2: Within the given disciplines, return the labs that best match subject_name.
     Returns { lab_name: [entries] }.
+    If trace is given, sets lab_scored and lab_fallback in it.
     """
+    _ensure_loaded()
+    cat = cat or _catalogue
+    index = cat.index
+    if trace is not None:
+        trace["lab_scored"] = 0
+        trace["lab_fallback"] = True
     if not subject_name:
         # No subject context → return all labs in matched disciplines
         result: Dict[str, List[Dict]] = {}
         for disc in disciplines:
-            result.update(_index.get(disc, {}))
+            result.update(index.get(disc, {}))
         return result
 
-    subj_tokens = _tokenize(subject_name)
-    subj_norm   = _normalize(subject_name)
+    query = _prepare_query(subject_name, cat)
 
     lab_scores: Dict[str, float] = {}
     lab_entries: Dict[str, List[Dict]] = {}
 
+    scored = 0
     for disc in disciplines:
-        for lab, entries in _index.get(disc, {}).items():
-            s = _score(subject_name, lab, subj_tokens)
+        for lab, entries in index.get(disc, {}).items():
+            s = _score_prepared(query, _intern_name(lab, cat))
+            scored += 1
             if s > lab_scores.get(lab, 0):
                 lab_scores[lab] = s
                 lab_entries[lab] = entries
+    if trace is not None:
+        trace["lab_scored"] = scored
 
     if not lab_scores:
         # fallback: all labs in discipline pool
         for disc in disciplines:
-            lab_entries.update(_index.get(disc, {}))
+            lab_entries.update(index.get(disc, {}))
         return lab_entries
 
     best = max(lab_scores.values())
     if best < fallback_threshold:
         return lab_entries              # no confident match → all labs
 
+    if trace is not None:
+        trace["lab_fallback"] = False
     cutoff = best * 0.75
     return {lab: lab_entries[lab] for lab, s in lab_scores.items() if s >= cutoff}
 
 
+# ── Subject resolution cache ─────────────────────────────────────────
+
+def _resolution_version(cat: _Catalogue) -> str:
+    return f"{MATCHER_VERSION}:{cat.version}"
+
+
+def _lab_pairs(disciplines: List[str], labs: Dict[str, List[Dict]],
+               cat: _Catalogue) -> Tuple[Tuple[str, str], ...]:
+    """(discipline, lab) each pooled lab's entries came from, in pool order."""
+    return tuple(
+        (next(d for d in disciplines if cat.index.get(d, {}).get(lab) is entries), lab)
+        for lab, entries in labs.items()
+    )
+
+
+def _pool_from_pairs(pairs, cat: _Catalogue) -> Dict[str, List[Dict]]:
+    return {lab: cat.index[disc][lab] for disc, lab in pairs}
+
+
+def _preload_subjects(cat: _Catalogue) -> None:
+    """Fill the subject cache from vlab_subject_resolutions for cat."""
+    from services.vlabs_subject_store import load_resolutions
+    loaded = 0
+    for key, resolution in load_resolutions(_resolution_version(cat)).items():
+        try:
+            pool = _pool_from_pairs(resolution[0], cat)
+        except KeyError:
+            continue
+        _subject_cache.put((cat.version, key), (pool, resolution))
+        loaded += 1
+    if loaded:
+        print(f"✅ VLabs matcher: {loaded} subject resolutions preloaded")
+
+
+def _resolve_subject(subject_name: str, cat: _Catalogue,
+                     trace: Optional[Dict] = None) -> Dict[str, List[Dict]]:
+    """
+    Stage 1 + 2 for a subject: the lab pool Stage 3 searches, cached per
+    normalised subject. If trace is given it gets subject_cached and the
+    fallback flags, and on a miss also the stage trace fields and the stage
+    times (discipline_ms, lab_ms).
+    """
+    subject_key = _normalize(subject_name) if subject_name else None
+    key = (cat.version, subject_key)
+    cached = _subject_cache.get(key)
+    if cached is not MISSING:
+        pool, (_, discipline_fallback, lab_fallback) = cached
+        if trace is not None:
+            trace.update(subject_cached=True, discipline_fallback=discipline_fallback,
+                         lab_fallback=lab_fallback)
+        return pool
+
+    local = {} if trace is None else trace
+    clock = time.perf_counter
+    t0 = clock()
+    disciplines = _match_discipline(subject_name, cat=cat, trace=local)
+    t1 = clock()
+    pool = _match_labs(disciplines, subject_name, cat=cat, trace=local)
+    t2 = clock()
+    local.update(subject_cached=False, discipline_ms=(t1 - t0) * 1000,
+                 lab_ms=(t2 - t1) * 1000)
+    resolution = (_lab_pairs(disciplines, pool, cat),
+                  local["discipline_fallback"], local["lab_fallback"])
+    _subject_cache.put(key, (pool, resolution))
+    if _subject_persist and subject_key and cat.source == PRIMARY_SOURCE:
+        from services.vlabs_subject_store import save_resolution
+        save_resolution(subject_key, _resolution_version(cat), resolution)
+    return pool
+
+
+def _get_sparse_scorer(cat: Optional[_Catalogue] = None):
+    """Build (once per catalogue) the sparse scorer when that backend is selected and available."""
+    global _backend
+    cat = cat or _catalogue
+    if _backend != "sparse" or not cat.index:
+        return None
+    if cat.sparse_scorer is None:
+        from services.vlabs_sparse import HAS_SPARSE, SparseScorer
+        if not HAS_SPARSE:
+            print("⚠️  VLABS_MATCHER_BACKEND=sparse needs numpy/scipy — using python scorer")
+            _backend = "python"
+            return None
+        names = list(dict.fromkeys(
+            entry.get("experiment_name", "")
+            for labs in cat.index.values() for entries in labs.values() for entry in entries
+        ))
+        cat.sparse_scorer = SparseScorer(names, cat.features, len(cat.token_ids))
+    return cat.sparse_scorer
+
+
+def _get_lsh_index(cat: Optional[_Catalogue] = None):
+    """Build (once per catalogue) the MinHash/LSH index when that backend is selected."""
+    cat = cat or _catalogue
+    if _backend != "lsh" or not cat.index:
+        return None
+    if cat.lsh_index is None:
+        cat.lsh_index = _build_lsh_index(cat, settings.VLABS_LSH_BANDS, settings.VLABS_LSH_ROWS)
+    return cat.lsh_index
+
+
+def _build_lsh_index(cat: _Catalogue, bands: int, rows: int):
+    """
+    (LSHIndex over experiment names, name → [(lab, lab's entry list,
+    position in it)]) — the second part lets a query find its candidates'
+    entries in a pool without walking the pool.
+    """
+    from services.vlabs_lsh import LSHIndex
+    locations: Dict[str, List[Tuple[str, List[Dict], int]]] = {}
+    for labs in cat.index.values():
+        for lab, entries in labs.items():
+            for i, entry in enumerate(entries):
+                locations.setdefault(entry.get("experiment_name", ""), []).append((lab, entries, i))
+    index = LSHIndex(list(locations), {name: _words(cat.features[name][0]) for name in locations},
+                     cat.postings, bands=bands, rows=rows)
+    return index, locations
+
+
 def _match_experiment(labs: Dict[str, List[Dict]], experiment_topic: str,
-                      threshold: float = 0.30) -> Optional[Dict]:
+                      threshold: float = 0.30,
+                      cat: Optional[_Catalogue] = None) -> Optional[Dict]:
     """
     Stage 3: Within the given lab entries, find the best matching experiment.
     Returns the best entry dict or None.
     """
-    topic_tokens = _tokenize(experiment_topic)
-    best_score   = 0.0
-    best_entry   = None
+    return _match_experiments(labs, [experiment_topic], threshold, cat)[0]
+
+
+def _match_experiments(labs: Dict[str, List[Dict]], topics: List[str],
+                       threshold: float = 0.30,
+                       cat: Optional[_Catalogue] = None,
+                       trace: Optional[Dict] = None) -> List[Optional[Dict]]:
+    """
+    Stage 3 for several topics against the same lab pool.
+    If trace is given, adds exact score evaluations to trace["experiment_scored"].
+    """
+    _ensure_loaded()
+    cat = cat or _catalogue
+    scorer = _get_sparse_scorer(cat)
+    if scorer is not None:
+        return _match_experiments_sparse(scorer, labs, topics, threshold, cat, trace)
+    lsh = _get_lsh_index(cat)
+    if lsh is not None:
+        return [_lsh_experiment(lsh, labs, topic, threshold, cat, trace) for topic in topics]
+    return [_scan_experiment(labs, topic, threshold, cat, trace) for topic in topics]
 
+
+def _scan_experiment(labs: Dict[str, List[Dict]], experiment_topic: str,
+                     threshold: float,
+                     cat: Optional[_Catalogue] = None,
+                     trace: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Python Stage 3 backend (branch-and-bound).
+
+    Substring-shortcut entries score 0.95 outright. Every other entry gets
+    a cheap upper bound: its exact Jaccard term (zero unless the postings say
+    it shares a token) plus a length-only bound on the sequence ratio.
+    Entries are then visited in descending bound order. They are dropped
+    once the bound falls below the stage threshold or the running best.
+    The pick is identical to a full scan, ties included.
+    """
+    cat        = cat or _catalogue
+    query      = _prepare_query(experiment_topic, cat)
+    q_norm, q_ids, q_len = query
+    hits       = set().union(*(cat.postings.get(t, ()) for t in q_ids))
+    best_score = 0.0
+    best_entry = None
+    best_pos   = -1
+    candidates = []
+
+    pos = 0
     for entries in labs.values():
         for entry in entries:
             exp_name = entry.get("experiment_name", "")
-            s = _score(experiment_topic, exp_name, topic_tokens)
-            if s > best_score:
-                best_score = s
-                best_entry = entry
+            c_norm, c_ids = _intern_name(exp_name, cat)
+            if q_norm in c_norm or c_norm in q_norm:
+                if best_entry is None:          # first shortcut hit wins ties
+                    best_score, best_entry, best_pos = 0.95, entry, pos
+            else:
+                overlap = 0.0
+                if exp_name in hits:
+                    inter = len(q_ids & c_ids)
+                    overlap = inter / (q_len + len(c_ids) - inter)
+                bound = overlap * 0.65 + _length_bound(q_norm, c_norm) * 0.35
+                candidates.append((-bound, pos, entry, c_norm, overlap))
+            pos += 1
+
+    candidates.sort(key=lambda c: (c[0], c[1]))
+    scored = 0
+    for neg_bound, pos, entry, c_norm, overlap in candidates:
+        floor = max(best_score, threshold)
+        if -neg_bound < floor:
+            break
+        s = _bounded_score(q_norm, c_norm, overlap, floor)
+        scored += 1
+        if s > best_score or (s == best_score and pos < best_pos):
+            best_score, best_entry, best_pos = s, entry, pos
+    if trace is not None:
+        trace["experiment_scored"] = trace.get("experiment_scored", 0) + scored
 
     if best_entry and best_score >= threshold:
         return best_entry
     return None
 
 
+def _lsh_experiment(lsh, labs: Dict[str, List[Dict]], experiment_topic: str,
+                    threshold: float,
+                    cat: Optional[_Catalogue] = None,
+                    trace: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    LSH Stage 3 backend (approximate).
+
+    The pool is cut down to the entries whose name the index returns as a
+    candidate — found through the name → location map, so the cost follows
+    the candidate count, not the pool size — keeping pool order, and handed
+    to the branch-and-bound scan. The pick is the scan's pick whenever the
+    index returns the winning name.
+    """
+    cat = cat or _catalogue
+    index, locations = lsh
+    q_norm, q_ids, _ = _prepare_query(experiment_topic, cat)
+    if not q_norm:
+        # Every name contains "", so the scan's substring shortcut decides
+        return _scan_experiment(labs, experiment_topic, threshold, cat, trace)
+    cands = index.candidates(_words(q_norm), q_ids)
+    if not cands:
+        return None
+    lab_pos = {lab: i for i, lab in enumerate(labs)}
+    kept = sorted(
+        (lab_pos[lab], i, lab, entries[i])
+        for name in cands for lab, entries, i in locations.get(name, ())
+        if labs.get(lab) is entries
+    )
+    pool: Dict[str, List[Dict]] = {}
+    for _, _, lab, entry in kept:
+        pool.setdefault(lab, []).append(entry)
+    return _scan_experiment(pool, experiment_topic, threshold, cat, trace)
+
+
+def _match_experiments_sparse(scorer, labs: Dict[str, List[Dict]],
+                              topics: List[str], threshold: float,
+                              cat: Optional[_Catalogue] = None,
+                              trace: Optional[Dict] = None) -> List[Optional[Dict]]:
+    """
+    Sparse Stage 3 backend.
+
+    One call to scorer.ranked_pool() bounds every (topic, pool entry) score,
+    computed over the pool's columns only.
+    Per topic, entries are visited in descending bound order and scored
+    exactly until the bound drops below the best score, so ties still go
+    to the earliest entry, as in the scan.
+    """
+    cat = cat or _catalogue
+    pool = [
+        (entry, _intern_name(entry.get("experiment_name", ""), cat))
+        for entries in labs.values() for entry in entries
+    ]
+    if not pool:
+        return [None] * len(topics)
+
+    queries = [_prepare_query(t, cat) for t in topics]
+    ranked = scorer.ranked_pool(queries, [e.get("experiment_name", "") for e, _ in pool])
+
+    results: List[Optional[Dict]] = []
+    scored = 0
+    for query, order in zip(queries, ranked):
+        q_norm = query[0]
+        best_score, best_entry, best_pos = 0.0, None, -1
+        shortcut = set()
+        for pos, (entry, feat) in enumerate(pool):
+            if q_norm in feat[0] or feat[0] in q_norm:
+                shortcut.add(pos)
+                if best_entry is None:
+                    best_score, best_entry, best_pos = 0.95, entry, pos
+
+        for pos, bound in order:
+            if bound < best_score or bound < threshold:
+                break
+            if pos in shortcut:
+                continue
+            s = _score_prepared(query, pool[pos][1])
+            scored += 1
+            if s > best_score or (s == best_score and pos < best_pos):
+                best_score, best_entry, best_pos = s, pool[pos][0], pos
+
+        results.append(best_entry if best_entry and best_score >= threshold else None)
+    if trace is not None:
+        trace["experiment_scored"] = trace.get("experiment_scored", 0) + scored
+    return results
+
+
+def _scan_top_k(labs: Dict[str, List[Dict]], experiment_topic: str, k: int,
+                threshold: float = 0.30,
+                cat: Optional[_Catalogue] = None,
+                trace: Optional[Dict] = None) -> List[Tuple[Dict, float]]:
+    """
+    Stage 3 top-k: the k best-scoring experiments with distinct URLs, as
+    [(entry, score), ...] by descending score, ties to the earlier entry.
+
+    Same bounds as _scan_experiment, but candidates are heapified rather
+    than sorted and popped only while their bound can still beat the
+    weakest of the k results kept in a min-heap. The first result is the
+    _scan_experiment pick.
+    """
+    cat        = cat or _catalogue
+    query      = _prepare_query(experiment_topic, cat)
+    q_norm, q_ids, q_len = query
+    hits       = set().union(*(cat.postings.get(t, ()) for t in q_ids))
+
+    # (-bound, pos, entry, c_norm, overlap); overlap None marks a shortcut hit
+    candidates = []
+    pos = 0
+    for entries in labs.values():
+        for entry in entries:
+            if entry.get("experiment_url"):
+                exp_name = entry.get("experiment_name", "")
+                c_norm, c_ids = _intern_name(exp_name, cat)
+                if q_norm in c_norm or c_norm in q_norm:
+                    candidates.append((-0.95, pos, entry, c_norm, None))
+                else:
+                    overlap = 0.0
+                    if exp_name in hits:
+                        inter = len(q_ids & c_ids)
+                        overlap = inter / (q_len + len(c_ids) - inter)
+                    bound = overlap * 0.65 + _length_bound(q_norm, c_norm) * 0.35
+                    candidates.append((-bound, pos, entry, c_norm, overlap))
+            pos += 1
+    heapq.heapify(candidates)
+
+    # Min-heap of (score, -pos, url, entry): top is the weakest kept result
+    kept: List[Tuple[float, int, str, Dict]] = []
+    scored = 0
+    while candidates:
+        neg_bound, pos, entry, c_norm, overlap = heapq.heappop(candidates)
+        floor = max(kept[0][0], threshold) if len(kept) == k else threshold
+        if -neg_bound < floor:
+            break
+        s = 0.95 if overlap is None else _bounded_score(q_norm, c_norm, overlap, floor)
+        scored += overlap is not None
+        if s < floor:
+            continue
+        item = (s, -pos, entry["experiment_url"], entry)
+        same_url = next((i for i, kept_item in enumerate(kept) if kept_item[2] == item[2]), None)
+        if same_url is not None:
+            if item[:2] > kept[same_url][:2]:
+                kept[same_url] = item
+                heapq.heapify(kept)
+        elif len(kept) < k:
+            heapq.heappush(kept, item)
+        elif item[:2] > kept[0][:2]:
+            heapq.heapreplace(kept, item)
+
+    if trace is not None:
+        trace["experiment_scored"] = trace.get("experiment_scored", 0) + scored
+
+    kept.sort(key=lambda item: item[:2], reverse=True)
+    return [(entry, s) for s, _, _, entry in kept]
+
+
+def _match_experiments_top_k(labs: Dict[str, List[Dict]], topics: List[str], k: int,
+                             threshold: float = 0.30,
+                             cat: Optional[_Catalogue] = None,
+                             trace: Optional[Dict] = None) -> List[List[Tuple[Dict, float]]]:
+    """Stage 3 top-k for several topics against the same lab pool."""
+    _ensure_loaded()
+    return [_scan_top_k(labs, topic, k, threshold, cat, trace) for topic in topics]
+
+
 # ── Public API ───────────────────────────────────────────────────────
 
+def _to_link(entry: Optional[Dict], score: Optional[float] = None,
+             source: str = PRIMARY_SOURCE) -> Optional[Dict]:
+    """Shape a catalogue entry as a simulation link dict (None if no URL)."""
+    if entry:
+        url = entry.get("experiment_url", "")
+        if url:
+            kind = "Virtual Lab" if source == PRIMARY_SOURCE else "Simulation"
+            link = {
+                "source": source,
+                "url": url,
+                "description": (
+                    f"{kind}: {entry.get('experiment_name', '')} "
+                    f"({entry.get('lab_name', '')})"
+                ),
+            }
+            if score is not None:
+                link["score"] = round(score, 4)
+            return link
+    return None
+
+
+def _lookup_batch(topics: List[str], subject_name: str, max_results: int,
+                  cat: Optional[_Catalogue] = None) -> List:
+    """
+    Shared body of the batch lookups. max_results=0 asks for the single best
+    link (or None) per topic; max_results=k for up to k scored links per topic.
+    Results are copied out of the cache, so callers may mutate them.
+    cat selects a shard; funnel metrics are only recorded for the main
+    catalogue.
+    """
+    _ensure_loaded()
+    cat = cat or _catalogue         # one catalogue for the whole call
+    record = _metrics_enabled and cat.source == PRIMARY_SOURCE
+    results: List = [[] if max_results else None for _ in topics]
+    wanted = [i for i, t in enumerate(topics) if t and t.strip()]
+    if not cat.index or not wanted:
+        return results
+
+    subject_key = _normalize(subject_name) if subject_name else None
+    pending = []
+    for i in wanted:
+        key = (cat.version, _normalize(topics[i]), subject_key, max_results)
+        cached = _match_cache.get(key)
+        if cached is MISSING:
+            pending.append((i, key))
+        else:
+            results[i] = _copy_result(cached)
+    if not pending:
+        if record:
+            _metrics.record({"lookups": 1, "topics": len(wanted), "cache_hits": len(wanted)})
+        return results
+
+    trace = {} if record else None
+
+    # Stage 1 + 2: Discipline and lab, resolved once per subject
+    labs = _resolve_subject(subject_name, cat, trace)
+
+    clock = time.perf_counter
+    t2 = clock()
+
+    # Stage 3: Experiment
+    pending_topics = [topics[i] for i, _ in pending]
+    if max_results:
+        found = [
+            tuple(_to_link(entry, score, cat.source) for entry, score in picks)
+            for picks in _match_experiments_top_k(labs, pending_topics, max_results,
+                                                  cat=cat, trace=trace)
+        ]
+    else:
+        found = [_to_link(entry, source=cat.source) for entry in
+                 _match_experiments(labs, pending_topics, cat=cat, trace=trace)]
+    t3 = clock()
+
+    for (i, key), value in zip(pending, found):
+        _match_cache.put(key, value)
+        results[i] = _copy_result(value)
+
+    if trace is not None:
+        n = len(pending)
+        matched = sum(1 for value in found if value)
+        fell_back = trace["discipline_fallback"] or trace["lab_fallback"]
+        observations = {
+            "experiment_ms": (t3 - t2) * 1000 / n,
+            "experiment_scored": trace.get("experiment_scored", 0) / n,
+            "experiment_pool": sum(len(entries) for entries in labs.values()),
+        }
+        if not trace["subject_cached"]:
+            # Stage 1/2 figures only describe lookups that actually ran them
+            observations.update({name: trace[name] for name in (
+                "discipline_ms", "lab_ms", "discipline_scored", "lab_scored")})
+        _metrics.record(
+            {
+                "lookups": 1,
+                "topics": len(wanted),
+                "cache_hits": len(wanted) - n,
+                "subject_cache_hits": int(trace["subject_cached"]),
+                "matched": matched,
+                "unmatched": n - matched,
+                "discipline_fallback": int(trace["discipline_fallback"]),
+                "lab_fallback": int(trace["lab_fallback"]),
+            },
+            observations,
+            tally=(subject_key or "") if fell_back else None,
+        )
+    return results
+
+
+def _copy_result(value):
+    if isinstance(value, tuple):
+        return [dict(link) for link in value]
+    return dict(value) if value else None
+
+
 def find_vlabs_link(
     experiment_topic: str,
     subject_name: str = "",
@@ -301,31 +1313,22 @@ def find_vlabs_link(
     Returns:
         { source, url, description } or None if no confident match.
     """
-    if not _index or not experiment_topic or not experiment_topic.strip():
-        return None
-
-    # Stage 1: Discipline
-    disciplines = _match_discipline(subject_name)
-
-    # Stage 2: Lab
-    labs = _match_labs(disciplines, subject_name)
+    return find_vlabs_links_batch([experiment_topic], subject_name)[0]
 
-    # Stage 3: Experiment
-    entry = _match_experiment(labs, experiment_topic)
 
-    if entry:
-        url = entry.get("experiment_url", "")
-        if url:
-            return {
-                "source": "IIT VLabs",
-                "url": url,
-                "description": (
-                    f"Virtual Lab: {entry.get('experiment_name', '')} "
-                    f"({entry.get('lab_name', '')})"
-                ),
-            }
+def find_vlabs_links_batch(
+    topics: List[str],
+    subject_name: str = "",
+) -> List[Optional[Dict]]:
+    """
+    Batch form of find_vlabs_link for topics that share one subject.
+    Stage 1 and Stage 2 run at most once (not at all for a cached subject);
+    Stage 3 runs for every topic against the resolved lab pool.
 
-    return None
+    Returns:
+        One { source, url, description } or None per topic, in input order.
+    """
+    return _lookup_batch(topics, subject_name, 0)
 
 
 def find_all_vlabs_links(
@@ -333,6 +1336,113 @@ def find_all_vlabs_links(
     subject_name: str = "",
     max_results: int = 1,
 ) -> List[Dict]:
-    """Convenience wrapper — returns a list (for future multi-result support)."""
-    result = find_vlabs_link(experiment_topic, subject_name)
-    return [result] if result else []
+    """
+    Up to max_results VLabs experiments for a topic, best first, each with
+    its match score. Experiments sharing a URL are offered once.
+
+    Returns:
+        [{ source, url, description, score }, ...] (empty if no confident match).
+    """
+    return find_all_vlabs_links_batch([experiment_topic], subject_name, max_results)[0]
+
+
+def find_all_vlabs_links_batch(
+    topics: List[str],
+    subject_name: str = "",
+    max_results: int = 1,
+) -> List[List[Dict]]:
+    """Batch form of find_all_vlabs_links; Stage 1 and Stage 2 run once."""
+    if max_results < 1:
+        return [[] for _ in topics]
+    return _lookup_batch(topics, subject_name, max_results)
+
+
+# ── Shard fan-out ────────────────────────────────────────────────────
+# With the "sparse" backend, one lookup per shard runs on a shared thread
+# pool: its numpy/scipy kernels release the GIL, so a query waits for the
+# slowest shard rather than for all of them in turn. The "python" and
+# "lsh" scans hold the GIL throughout, so threads would only add hand-off
+# overhead; shards are then queried in turn unless VLABS_SHARD_WORKERS
+# says otherwise. The pool is created on first use; forked rematch
+# workers start without one.
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+_fanout_lock = threading.Lock()
+
+# Fan-out threads with the sparse backend when VLABS_SHARD_WORKERS is 0 (auto)
+_SPARSE_SHARD_WORKERS = 4
+
+
+def _shard_workers() -> int:
+    """Configured fan-out threads, or for 0 (auto): 4 with the sparse backend, else 1."""
+    if settings.VLABS_SHARD_WORKERS > 0:
+        return settings.VLABS_SHARD_WORKERS
+    return _SPARSE_SHARD_WORKERS if _backend == "sparse" else 1
+
+
+def _get_fanout_pool() -> ThreadPoolExecutor:
+    global _fanout_pool
+    with _fanout_lock:
+        if _fanout_pool is None:
+            _fanout_pool = ThreadPoolExecutor(max_workers=_shard_workers(),
+                                              thread_name_prefix="vlabs-shard")
+        return _fanout_pool
+
+
+def find_source_links_batch(topics: List[str], subject_name: str = "") -> List[List[Dict]]:
+    """
+    Best link from every catalogue shard for each topic, matched with the
+    same three stages as the main catalogue. Shards are queried
+    concurrently when _shard_workers() allows more than one thread (by
+    default only with the sparse backend), otherwise in turn.
+
+    Returns:
+        One list per topic, in input order, of { source, url, description }
+        — at most one per source, in shard order; sources with no
+        confident match are left out.
+    """
+    _ensure_loaded()
+    shards = list(_shards.values())
+    if not shards:
+        return [[] for _ in topics]
+    if len(shards) == 1 or _shard_workers() <= 1:
+        per_shard = [_lookup_batch(topics, subject_name, 0, cat) for cat in shards]
+    else:
+        pool = _get_fanout_pool()
+        futures = [pool.submit(_lookup_batch, topics, subject_name, 0, cat) for cat in shards]
+        per_shard = [future.result() for future in futures]
+    return [[found[i] for found in per_shard if found[i]] for i in range(len(topics))]
+
+
+def match_cache_stats() -> Dict[str, int]:
+    """Hit / miss / eviction counters and size of the result cache."""
+    return _match_cache.stats()
+
+
+def clear_match_cache() -> None:
+    """Drop cached results and subject resolutions (reload_catalogue does this itself)."""
+    _match_cache.clear()
+    _subject_cache.clear()
+
+
+def matcher_stats(top_subjects: int = 20) -> Dict:
+    """
+    Funnel counters and per-stage histograms since start (or the last
+    reset), the result and subject cache stats, and the subject names that
+    most often fell through to a full-catalogue pool ("" is the empty subject).
+    """
+    snapshot = _metrics.snapshot(top=top_subjects)
+    return {
+        "enabled": _metrics_enabled,
+        "counters": snapshot["counters"],
+        "histograms": snapshot["histograms"],
+        "fallback_subjects": [
+            {"subject": item["key"], "count": item["count"]} for item in snapshot["tally"]
+        ],
+        "cache": match_cache_stats(),
+        "subject_cache": _subject_cache.stats(),
+    }
+
+
+def reset_matcher_stats() -> None:
+    """Zero the funnel counters and histograms (cache counters are kept)."""
+    _metrics.reset()
@@ -0,0 +1,342 @@
+"""
+Stored simulation links for VLab experiments.
+
+Each VLabExperiment row keeps its computed simulation_links plus a
+links_stamp: the simulation_links_version() they were computed under and a
+hash of the subject name and topic text they were computed for. A row whose
+stamp no longer matches is stale and gets recomputed — lazily by
+refresh_stale_links() when it is read, or in bulk by rematch_all(). Rows
+stamped "manual" hold hand-edited links and are never recomputed.
+
+Bulk re-matching recomputes every stale row, e.g. after the VLabs catalogue
+changed.
+
+Rows are streamed from the DB in id-ordered chunks (keyset pagination, so
+memory stays flat however many colleges there are). Chunks are matched in
+a process pool; on platforms with fork() the workers inherit the parent's
+already-built matcher index copy-on-write instead of each loading it.
+Recomputed links and stamps are written back with one batched UPDATE per
+chunk.
+
+Entry points: rematch_all() (used by rematch_vlabs.py), start_rematch_job()
+/ rematch_job_status() (used by the admin endpoint) and on_catalogue_reload()
+(a catalogue reload listener, so every reload starts a job).
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, update
+
+from database import SessionLocal, engine
+from models import VLabExperiment, VLabSubject
+from services import syllabus_service, vlabs_matcher
+from utils.cache import LRUCache
+
+# (experiment id, subject name, text to match)
+Row = Tuple[int, str, str]
+
+MANUAL_STAMP = "manual"
+
+
+def experiment_match_text(topic: Optional[str], suggested_simulation: Optional[str]) -> str:
+    """The text an experiment's links are matched on."""
+    return topic or suggested_simulation or ""
+
+
+def links_stamp(subject_name: str, text: str, version: str) -> str:
+    """Stamp for links computed under `version` for this subject and text."""
+    digest = hashlib.sha1(f"{subject_name}\0{text}".encode("utf-8")).hexdigest()[:16]
+    return f"{version}:{digest}"
+
+
+# ====== Lazy refresh (request path) ======
+
+def refresh_stale_links(experiments: List[VLabExperiment], version: Optional[str] = None) -> int:
+    """
+    Recompute links of the given rows whose stamp is stale, in place, one
+    matcher batch per subject. The caller commits. Returns rows refreshed.
+    """
+    version = version or syllabus_service.simulation_links_version()
+    stale: Dict[str, List[Tuple[VLabExperiment, str, str]]] = {}
+    for exp in experiments:
+        if exp.links_stamp == MANUAL_STAMP:
+            continue
+        subject_name = (exp.subject.name if exp.subject else "") or ""
+        text = experiment_match_text(exp.topic, exp.suggested_simulation)
+        stamp = links_stamp(subject_name, text, version)
+        if exp.links_stamp != stamp or exp.simulation_links is None:
+            stale.setdefault(subject_name, []).append((exp, text, stamp))
+
+    for subject_name, items in stale.items():
+        links_per_exp = syllabus_service.get_simulation_links_batch(
+            [text for _, text, _ in items], subject_name=subject_name
+        )
+        for (exp, _, stamp), links in zip(items, links_per_exp):
+            exp.simulation_links = json.dumps(links)
+            exp.links_stamp = stamp
+    return sum(len(items) for items in stale.values())
+
+
+# ====== Matching (runs in workers) ======
+
+def _init_worker() -> None:
+    """
+    Pool initializer. A forked child may inherit locks held by parent threads
+    at fork time, so it gets fresh matcher result and subject caches, fresh
+    syllabus_service language and link caches, no funnel metrics, no subject
+    persistence and no inherited shard thread pool, and it drops (without
+    closing) the parent's pooled DB connections. With spawn there is no
+    inherited index, so build it here once per worker.
+    """
+    engine.dispose(close=False)
+    vlabs_matcher._match_cache = LRUCache(vlabs_matcher._match_cache.capacity)
+    vlabs_matcher._subject_cache = LRUCache(vlabs_matcher._subject_cache.capacity)
+    vlabs_matcher._subject_persist = False
+    vlabs_matcher._fanout_pool = None
+    vlabs_matcher._fanout_lock = threading.Lock()
+    vlabs_matcher._metrics_enabled = False
+    syllabus_service.reset_after_fork()
+    vlabs_matcher.warm_up()
+
+
+def match_rows(rows: List[Row]) -> List[Tuple[int, str]]:
+    """Links JSON for each row, with one Stage 1/2 resolution per subject."""
+    by_subject: Dict[str, List[Row]] = {}
+    for row in rows:
+        by_subject.setdefault(row[1], []).append(row)
+    out = []
+    for subject_name, subject_rows in by_subject.items():
+        links_per_row = syllabus_service.get_simulation_links_batch(
+            [text for _, _, text in subject_rows], subject_name=subject_name
+        )
+        for (exp_id, _, _), links in zip(subject_rows, links_per_row):
+            out.append((exp_id, json.dumps(links)))
+    return out
+
+
+# ====== DB streaming / write-back ======
+
+def _iter_chunks(chunk_size: int, version: str, force: bool
+                 ) -> Iterator[Tuple[int, List[Row], Dict[int, Tuple[Optional[str], Optional[str], str]]]]:
+    """
+    Yield (rows read, stale rows, {id: (current links, current stamp, new
+    stamp)}) per chunk in id order, one short session each. Fresh and manual
+    rows are skipped unless force is set (manual rows are always skipped).
+    """
+    last_id = 0
+    while True:
+        db = SessionLocal()
+        try:
+            batch = (
+                db.query(VLabExperiment.id, VLabSubject.name, VLabExperiment.topic,
+                         VLabExperiment.suggested_simulation, VLabExperiment.simulation_links,
+                         VLabExperiment.links_stamp)
+                .join(VLabSubject, VLabExperiment.subject_id == VLabSubject.id)
+                .filter(VLabExperiment.id > last_id)
+                .order_by(VLabExperiment.id)
+                .limit(chunk_size)
+                .all()
+            )
+        finally:
+            db.close()
+        if not batch:
+            return
+        last_id = batch[-1][0]
+        rows, current = [], {}
+        for exp_id, subject, topic, suggested, links, stamp in batch:
+            if stamp == MANUAL_STAMP:
+                continue
+            subject = subject or ""
+            text = experiment_match_text(topic, suggested)
+            new_stamp = links_stamp(subject, text, version)
+            if force or stamp != new_stamp or links is None:
+                rows.append((exp_id, subject, text))
+                current[exp_id] = (links, stamp, new_stamp)
+        yield len(batch), rows, current
+
+
+_update_if_unchanged = (
+    update(VLabExperiment)
+    .where(VLabExperiment.id == bindparam("exp_id"),
+           VLabExperiment.links_stamp.is_not_distinct_from(bindparam("old_stamp")))
+    .values(simulation_links=bindparam("links"), links_stamp=bindparam("new_stamp"))
+)
+
+
+def _write_back(results: List[Tuple[int, str]],
+                current: Dict[int, Tuple[Optional[str], Optional[str], str]]) -> Tuple[int, int]:
+    """
+    Write links and stamps, one chunk per transaction. Each UPDATE only
+    applies while the row still has the stamp it was read with, so a row
+    hand-edited (stamped "manual") or re-matched on read since then is left
+    alone. Returns (rows written, rows whose links changed); rows whose
+    links came out the same only get their stamp refreshed.
+    """
+    written = changed = 0
+    if results:
+        db = SessionLocal()
+        try:
+            for exp_id, links in results:
+                old_links, old_stamp, new_stamp = current[exp_id]
+                result = db.execute(_update_if_unchanged, {
+                    "exp_id": exp_id, "old_stamp": old_stamp,
+                    "links": links, "new_stamp": new_stamp,
+                })
+                if result.rowcount:
+                    written += 1
+                    changed += old_links != links
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    return written, changed
+
+
+def _count_rows() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(VLabExperiment).join(VLabSubject).count()
+    finally:
+        db.close()
+
+
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else None)
+
+
+def rematch_all(workers: Optional[int] = None, chunk_size: int = 500,
+                progress: Optional[Callable[[Dict], None]] = None,
+                force: bool = False) -> Dict:
+    """
+    Recompute simulation_links for every stored experiment whose stamp is
+    stale (every non-manual one with force=True).
+
+    workers: process count (default: CPU count); 1, or a job that fits in
+    one chunk, runs in-process. progress is called after every chunk with
+    { processed, total, recomputed, updated, skipped, elapsed, rows_per_sec },
+    where processed counts rows read, recomputed the rows written back,
+    updated those whose links changed and skipped the rows edited (or
+    re-matched on read) while their chunk was being matched.
+
+    Returns the final progress dict plus workers and links_version.
+    """
+    vlabs_matcher.warm_up()          # build once in the parent; forked workers share it
+    version = syllabus_service.simulation_links_version()
+    total = _count_rows()
+    workers = max(1, workers or os.cpu_count() or 1)
+    if total <= chunk_size:
+        workers = 1
+
+    state = {"processed": 0, "total": total, "recomputed": 0, "updated": 0, "skipped": 0,
+             "elapsed": 0.0, "rows_per_sec": 0.0}
+    started = time.perf_counter()
+
+    def done(n_read, results, current):
+        written, changed = _write_back(results, current)
+        state["processed"] += n_read
+        state["recomputed"] += written
+        state["updated"] += changed
+        state["skipped"] += len(results) - written
+        state["elapsed"] = round(time.perf_counter() - started, 3)
+        state["rows_per_sec"] = round(state["processed"] / max(state["elapsed"], 1e-9), 1)
+        if progress:
+            progress(dict(state))
+
+    chunks = _iter_chunks(chunk_size, version, force)
+    if workers == 1:
+        for n_read, rows, current in chunks:
+            done(n_read, match_rows(rows), current)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                                 initializer=_init_worker) as pool:
+            in_flight = {}
+            for n_read, rows, current in chunks:
+                in_flight[pool.submit(match_rows, rows)] = (n_read, current)
+                # Keep at most two chunks per worker queued so reading
+                # from the DB doesn't run far ahead of matching
+                while len(in_flight) >= workers * 2:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        done(in_flight[future][0], future.result(), in_flight.pop(future)[1])
+            for future in list(in_flight):
+                done(in_flight[future][0], future.result(), in_flight.pop(future)[1])
+
+    return {**state, "workers": workers, "links_version": version}
+
+
+# ====== Background job (admin endpoint) ======
+
+_job_lock = threading.Lock()
+_job: Dict = {"status": "idle"}
+_job_rerun = False      # a reload landed while the job was running
+
+
+def rematch_job_status() -> Dict:
+    with _job_lock:
+        return dict(_job)
+
+
+def start_rematch_job(workers: Optional[int] = None, chunk_size: int = 500,
+                      force: bool = False) -> bool:
+    """Run rematch_all in a daemon thread; False if a job is already running."""
+    global _job, _job_rerun
+    with _job_lock:
+        if _job.get("status") == "running":
+            return False
+        _job = {"status": "running", "started_at": datetime.utcnow().isoformat()}
+        _job_rerun = False
+
+    def report(state: Dict) -> None:
+        with _job_lock:
+            _job.update(state)
+
+    def run() -> None:
+        global _job_rerun
+        while True:
+            try:
+                summary = rematch_all(workers=workers, chunk_size=chunk_size,
+                                      progress=report, force=force)
+                print(f"✅ VLabs re-match: {summary['processed']} rows, "
+                      f"{summary['recomputed']} recomputed, {summary['updated']} updated, "
+                      f"{summary['rows_per_sec']} rows/s")
+                final = {**summary, "status": "done"}
+            except Exception as e:
+                print(f"⚠️  VLabs re-match failed: {e}")
+                final = {"status": "failed", "error": str(e)}
+            with _job_lock:
+                # Rows done before a mid-job reload are stale again: go round once more
+                if _job_rerun:
+                    _job_rerun = False
+                    continue
+                _job.update(final, finished_at=datetime.utcnow().isoformat())
+                return
+
+    threading.Thread(target=run, name="vlabs-rematch", daemon=True).start()
+    return True
+
+
+def on_catalogue_reload(result: Dict) -> None:
+    """
+    Catalogue reload listener (registered at server startup): every swap makes
+    the stored stamps stale, so refresh them in the background ahead of reads.
+    A job already running goes round once more when it finishes.
+    """
+    global _job_rerun
+    while True:
+        with _job_lock:
+            if _job.get("status") == "running":
+                _job_rerun = True
+                return
+        if start_rematch_job():
+            return
@@ -0,0 +1,124 @@
+"""
+Sparse-matrix scoring backend for the VLabs matcher.
+
+Every catalogue experiment name becomes
+  * a binary token row  (interned token ids → CSR matrix), and
+  * a character-count row over the normalised alphabet [a-z0-9 ].
+
+For a batch of topics one sparse matrix multiply yields the token
+intersections (hence the exact Jaccard term of _score), and a vectorised
+min-sum over character counts yields SequenceMatcher.quick_ratio(), which
+is never below ratio(). Together they give an upper bound on
+the combined score for every (topic, experiment) pair, so the matcher only
+has to run the exact scorer on the few candidates that can still win.
+
+numpy / scipy are optional — HAS_SPARSE is False when they are missing and
+the matcher keeps using the pure-Python scorer.
+"""
+
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+    HAS_SPARSE = True
+except ImportError:
+    HAS_SPARSE = False
+    np = None
+    sparse = None
+
+# Normalised names only contain these characters (see vlabs_matcher._normalize)
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+_CHAR_COL = {c: i for i, c in enumerate(_ALPHABET)}
+
+# Topics per block when materialising the dense topic × experiment bounds
+_CHUNK = 128
+
+
+def _char_counts(texts: Sequence[str]):
+    counts = np.zeros((len(texts), len(_ALPHABET)), dtype=np.int32)
+    for row, text in enumerate(texts):
+        for ch in text:
+            col = _CHAR_COL.get(ch)
+            if col is not None:
+                counts[row, col] += 1
+    return counts
+
+
+def _token_matrix(id_sets: Sequence[FrozenSet[int]], vocab_size: int):
+    indptr = [0]
+    indices: List[int] = []
+    for ids in id_sets:
+        indices.extend(i for i in ids if i < vocab_size)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float64)
+    return sparse.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+        shape=(len(id_sets), vocab_size),
+    )
+
+
+class SparseScorer:
+    """Catalogue-side matrices for upper-bounding _score over many topics."""
+
+    def __init__(self, names: List[str],
+                 features: Dict[str, Tuple[str, FrozenSet[int]]],
+                 vocab_size: int):
+        if not HAS_SPARSE:
+            raise RuntimeError("numpy/scipy are required for the sparse matcher backend")
+        self.names = names
+        self.column = {name: i for i, name in enumerate(names)}
+        self.vocab_size = vocab_size
+        norms = [features[n][0] for n in names]
+        ids = [features[n][1] for n in names]
+        self._tokens_t = _token_matrix(ids, vocab_size).T.tocsr()
+        self._tok_len = np.array([len(i) for i in ids], dtype=np.float64)
+        self._chars = _char_counts(norms)
+        self._str_len = np.array([len(n) for n in norms], dtype=np.float64)
+
+    def upper_bounds(self, queries: Sequence[Tuple[str, FrozenSet[int], int]], cols):
+        """
+        Return a (len(queries) × len(cols)) array where cell [t, j] is
+        >= _score_prepared(queries[t], features[names[cols[j]]]) for every
+        pair that does not take the substring shortcut. Only the cols
+        columns are touched, so the cost follows the pool, not the catalogue.
+        """
+        tokens_t = self._tokens_t[:, cols]
+        tok_len = self._tok_len[cols][None, :]
+        chars = self._chars[cols]
+        str_len = self._str_len[cols][None, :]
+        out = np.empty((len(queries), len(cols)), dtype=np.float64)
+        for start in range(0, len(queries), _CHUNK):
+            block = queries[start:start + _CHUNK]
+            q_tokens = _token_matrix([q[1] for q in block], self.vocab_size)
+            q_len = np.array([q[2] for q in block], dtype=np.float64)[:, None]
+
+            inter = (q_tokens @ tokens_t).toarray()
+            union = q_len + tok_len - inter
+            has_tokens = (q_len > 0) & (tok_len > 0)
+            jaccard = np.divide(inter, union, out=np.zeros_like(inter), where=has_tokens)
+
+            q_chars = _char_counts([q[0] for q in block])
+            matches = np.minimum(q_chars[:, None, :], chars[None, :, :]).sum(axis=2)
+            length = np.array([len(q[0]) for q in block], dtype=np.float64)[:, None] + str_len
+            quick = np.divide(2.0 * matches, length,
+                              out=np.ones_like(length), where=length > 0)
+
+            out[start:start + len(block)] = jaccard * 0.65 + quick * 0.35
+        return out
+
+    def ranked_pool(self, queries: Sequence[Tuple[str, FrozenSet[int], int]],
+                    pool_names: Sequence[str]) -> List[List[Tuple[int, float]]]:
+        """
+        For each query, return [(pool_position, bound), ...] over pool_names
+        sorted by descending bound, ties broken by pool position.
+        """
+        cols = np.fromiter((self.column[n] for n in pool_names),
+                           dtype=np.int64, count=len(pool_names))
+        positions = np.arange(len(pool_names))
+        bounds = self.upper_bounds(queries, cols)
+        ranked = []
+        for row in bounds:
+            order = np.lexsort((positions, -row))
+            ranked.append(list(zip(order.tolist(), row[order].tolist())))
+        return ranked
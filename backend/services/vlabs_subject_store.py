@@ -0,0 +1,66 @@
+"""
+Persisted subject resolutions for the VLabs matcher.
+
+The matcher caches, per normalised subject name, the lab pool Stage 1 and
+Stage 2 resolved to. With VLABS_SUBJECT_CACHE_PERSIST on, those
+resolutions are also written to vlab_subject_resolutions so a restart
+starts with every known subject already resolved. Rows carry the version
+they were resolved under; rows of any other version are dropped when a
+catalogue is loaded.
+
+Failures are reported and ignored: the table is only ever a cache.
+"""
+
+import json
+from typing import Dict, Tuple
+
+from database import SessionLocal
+from models import VLabSubjectResolution
+
+# (discipline, lab) pairs in pool order, discipline fallback, lab fallback
+Resolution = Tuple[Tuple[Tuple[str, str], ...], bool, bool]
+
+
+def load_resolutions(version: str) -> Dict[str, Resolution]:
+    """All stored resolutions of `version`; rows of other versions are deleted."""
+    db = SessionLocal()
+    try:
+        db.query(VLabSubjectResolution).filter(
+            VLabSubjectResolution.version != version
+        ).delete(synchronize_session=False)
+        db.commit()
+        rows = db.query(VLabSubjectResolution).all()
+        return {
+            row.subject_key: (
+                tuple(tuple(pair) for pair in json.loads(row.labs or "[]")),
+                bool(row.discipline_fallback),
+                bool(row.lab_fallback),
+            )
+            for row in rows
+        }
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️  Could not load VLabs subject resolutions: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def save_resolution(subject_key: str, version: str, resolution: Resolution) -> None:
+    """Insert or replace one subject's resolution."""
+    pairs, discipline_fallback, lab_fallback = resolution
+    db = SessionLocal()
+    try:
+        db.merge(VLabSubjectResolution(
+            subject_key=subject_key,
+            version=version,
+            labs=json.dumps([list(pair) for pair in pairs]),
+            discipline_fallback=discipline_fallback,
+            lab_fallback=lab_fallback,
+        ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️  Could not save VLabs subject resolution: {e}")
+    finally:
+        db.close()
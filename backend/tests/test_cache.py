@@ -0,0 +1,70 @@
+"""
+Unit tests for the LRU cache utility
+"""
+import copy
+import json
+import pickle
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache import LRUCache, MISSING, FrozenDict
+
+
+class TestLRUCache:
+
+    def test_get_put(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("b") is MISSING
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")            # "b" is now least recently used
+        cache.put("c", 3)
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_none_values_are_cached(self):
+        cache = LRUCache(1)
+        cache.put("a", None)
+        assert cache.get("a") is None
+
+    def test_zero_capacity_disables(self):
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        assert cache.get("a") is MISSING
+        assert len(cache) == 0
+
+    def test_resize_evicts(self):
+        cache = LRUCache(3)
+        for k in "abc":
+            cache.put(k, k)
+        cache.resize(1)
+        assert len(cache) == 1
+        assert cache.get("c") == "c"
+
+
+class TestFrozenDict:
+
+    def test_rejects_mutation(self):
+        d = FrozenDict(a=1)
+        for mutate in (lambda: d.__setitem__("a", 2), lambda: d.pop("a"),
+                       lambda: d.update(b=2), lambda: d.setdefault("b", 2), d.clear):
+            with pytest.raises(TypeError):
+                mutate()
+        assert d == {"a": 1}
+
+    def test_copies_and_serialises(self):
+        d = FrozenDict(a=[1])
+        assert json.dumps(d) == '{"a": [1]}'
+        assert pickle.loads(pickle.dumps(d)) == d
+        assert copy.deepcopy(d) == d and type(copy.copy(d)) is FrozenDict
+        assert dict(d) == {"a": [1]}
@@ -0,0 +1,45 @@
+"""
+Unit tests for the bounded executor utility
+"""
+import sys
+import os
+import threading
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.executor import BoundedExecutor, QueueFull
+
+
+class TestBoundedExecutor:
+
+    def test_runs_tasks_and_records_metrics(self):
+        executor = BoundedExecutor(workers=2, max_queue=2)
+        assert [executor.submit(pow, 2, n).result() for n in range(3)] == [1, 2, 4]
+        stats = executor.stats()
+        assert stats["counters"]["submitted"] == 3
+        assert stats["counters"]["completed"] == 3
+        assert stats["histograms"]["wait_ms"]["count"] == 3
+        assert stats["running"] == 0 and stats["queued"] == 0
+
+    def test_rejects_beyond_queue_limit(self):
+        executor = BoundedExecutor(workers=1, max_queue=1)
+        release = threading.Event()
+        running = executor.submit(release.wait)
+        queued = executor.submit(release.wait)
+        with pytest.raises(QueueFull) as exc:
+            executor.submit(release.wait)
+        assert 1 <= exc.value.retry_after <= 60
+        stats = executor.stats()
+        assert stats["running"] + stats["queued"] == 2
+        assert stats["counters"]["rejected"] == 1
+        release.set()
+        running.result(), queued.result()
+        executor.submit(int).result()         # room again once drained
+        assert executor.stats()["histograms"]["queue_depth"]["count"] == 3
+
+    def test_failures_are_counted(self):
+        executor = BoundedExecutor(workers=1, max_queue=0)
+        with pytest.raises(ZeroDivisionError):
+            executor.submit(lambda: 1 / 0).result()
+        assert executor.stats()["counters"]["failed"] == 1
+        executor.submit(int).result()
@@ -0,0 +1,61 @@
+"""
+Unit tests for the compiled keyword classifier
+"""
+import random
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.keywords import KeywordClassifier
+from services.vlabs_matcher import DISCIPLINE_HINTS
+
+
+def _loop_classify(table, text):
+    for keyword, label in table:
+        if keyword in text:
+            return label
+    return None
+
+
+class TestKeywordClassifier:
+
+    def test_table_order_beats_text_position(self):
+        clf = KeywordClassifier([("computer", "CS"), ("digital", "EC")])
+        # "digital" appears first in the text but "computer" is first in the table
+        assert clf.classify("digital computer organisation") == "CS"
+
+    def test_overlapping_prefix_keywords(self):
+        clf = KeywordClassifier([("machine learning", "CS"), ("machine", "EE")])
+        assert clf.classify("electrical machine lab") == "EE"
+        assert clf.classify("machine learning lab") == "CS"
+
+    def test_shorter_prefix_with_higher_priority(self):
+        clf = KeywordClassifier([("c", "C"), ("c++", "CPP")])
+        assert clf.classify("c++ programming") == "C"
+
+    def test_special_characters_are_literal(self):
+        clf = KeywordClassifier([("c++", "C++"), (".net", "C#"), (" in c.", "C")])
+        assert clf.classify("asp.net lab") == "C#"
+        assert clf.classify("programs in c++") == "C++"
+        assert clf.classify("arrays in c.") == "C"
+        assert clf.classify("arrays in cx") is None
+
+    def test_no_match_and_default(self):
+        clf = KeywordClassifier(DISCIPLINE_HINTS.items())
+        assert clf.classify("xyzzy gibberish") is None
+        assert clf.classify("xyzzy gibberish", default="all") == "all"
+        assert not clf.matches("xyzzy gibberish")
+
+    def test_empty_table(self):
+        clf = KeywordClassifier([])
+        assert clf.classify("anything") is None
+        assert not clf.matches("anything")
+
+    def test_agrees_with_loop_on_discipline_hints(self):
+        table = list(DISCIPLINE_HINTS.items())
+        words = [k for k, _ in table] + ["lab", "practice", "of", "and", "xyz", "chem"]
+        rnd = random.Random(0)
+        clf = KeywordClassifier(table)
+        for _ in range(500):
+            text = " ".join(rnd.choice(words) for _ in range(rnd.randint(1, 5)))
+            assert clf.classify(text) == _loop_classify(table, text), text
@@ -0,0 +1,45 @@
+"""
+Unit tests for the counter / histogram utilities
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import Histogram, MetricSet
+
+
+class TestHistogram:
+    """Tests for fixed-bucket histograms."""
+
+    def test_buckets_and_summary(self):
+        h = Histogram((1, 10, 100))
+        for v in (0.5, 1, 5, 50, 500):
+            h.observe(v)
+        snap = h.snapshot()
+        assert snap["count"] == 5
+        assert snap["buckets"] == {"1": 2, "10": 1, "100": 1, "+inf": 1}
+        assert snap["max"] == 500
+        assert snap["p50"] == 10
+
+    def test_empty(self):
+        snap = Histogram((1,)).snapshot()
+        assert snap["count"] == 0 and snap["p95"] == 0.0
+
+
+class TestMetricSet:
+    """Tests for the locked metric registry."""
+
+    def test_record_and_reset(self):
+        metrics = MetricSet({"ms": (1, 10)}, counters=("calls",))
+        metrics.record({"calls": 2}, {"ms": 3})
+        snap = metrics.snapshot()
+        assert snap["counters"] == {"calls": 2}
+        assert snap["histograms"]["ms"]["count"] == 1
+        metrics.reset()
+        assert metrics.snapshot()["counters"] == {"calls": 0}
+
+    def test_tally_is_bounded(self):
+        metrics = MetricSet({}, tally_capacity=2)
+        for key in ("a", "b", "c", "a"):
+            metrics.record(tally=key)
+        assert metrics.snapshot()["tally"] == [{"key": "a", "count": 2}, {"key": "b", "count": 1}]
@@ -0,0 +1,71 @@
+"""
+Unit tests for the parsed-syllabus result cache
+"""
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import settings
+from services import syllabus_cache, syllabus_service
+
+_PAYLOADS = [{"branch": "", "page": 1, "subject": "Physics Lab", "subject_code": "2018506",
+              "experiments": [{"id": 1, "topic": "Ohm's law", "simulation_links": ()}]}]
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SYLLABUS_CACHE_DIR", str(tmp_path))
+    syllabus_cache.clear()
+    yield tmp_path
+    syllabus_cache.clear()
+
+
+class TestSyllabusCache:
+
+    def test_memory_then_disk(self):
+        before = syllabus_cache.stats()["counters"]
+        key = syllabus_cache.cache_key(b"%PDF-1.4 one")
+        assert syllabus_cache.get(key) is None
+        syllabus_cache.put(key, _PAYLOADS)
+        assert syllabus_cache.get(key)[0]["experiments"][0]["simulation_links"] == []
+        syllabus_cache._memory.clear()
+        assert syllabus_cache.get(key)[0]["subject"] == "Physics Lab"
+        counters = syllabus_cache.stats()["counters"]
+        assert [counters[c] - before[c] for c in ("misses", "memory_hits", "disk_hits")] == [1, 1, 1]
+
+    def test_key_depends_on_content_and_versions(self, monkeypatch):
+        key = syllabus_cache.cache_key(b"%PDF-1.4 one")
+        assert syllabus_cache.cache_key(b"%PDF-1.4 one") == key
+        assert syllabus_cache.cache_key(b"%PDF-1.4 two") != key
+        monkeypatch.setattr(syllabus_service, "PARSER_VERSION", syllabus_service.PARSER_VERSION + 1)
+        assert syllabus_cache.cache_key(b"%PDF-1.4 one") != key
+        monkeypatch.setattr(syllabus_service, "LINKS_FORMAT", syllabus_service.LINKS_FORMAT + 1)
+        assert syllabus_cache.cache_key(b"%PDF-1.4 one") != key
+
+    def test_disk_size_eviction_drops_oldest(self, cache_dir, monkeypatch):
+        big = [{**_PAYLOADS[0], "subject": os.urandom(400_000).hex()}]   # ~0.8 MB gzipped
+        monkeypatch.setattr(settings, "SYLLABUS_CACHE_MAX_MB", 1)
+        keys = [syllabus_cache.cache_key(bytes([i])) for i in range(3)]
+        for i, key in enumerate(keys):
+            syllabus_cache.put(key, big)
+            os.utime(syllabus_cache._path(key), (1000 + i, 1000 + i))
+        syllabus_cache._memory.clear()
+        assert syllabus_cache.get(keys[0]) is None
+        assert syllabus_cache.get(keys[2]) is not None
+        assert syllabus_cache.stats()["disk"]["bytes"] <= 1024 * 1024
+
+    def test_corrupt_entry_is_a_miss(self, cache_dir):
+        key = syllabus_cache.cache_key(b"%PDF-1.4 one")
+        syllabus_cache.put(key, _PAYLOADS)
+        syllabus_cache._memory.clear()
+        with open(syllabus_cache._path(key), "wb") as f:
+            f.write(b"not gzip")
+        assert syllabus_cache.get(key) is None
+        assert not os.path.exists(syllabus_cache._path(key))
+
+    def test_disk_tier_disabled(self, cache_dir, monkeypatch):
+        monkeypatch.setattr(settings, "SYLLABUS_CACHE_MAX_MB", 0)
+        syllabus_cache.put("k", _PAYLOADS)
+        assert os.listdir(cache_dir) == []
+        assert syllabus_cache.get("k") is not None      # memory tier still works
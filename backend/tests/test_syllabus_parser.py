@@ -1,14 +1,18 @@
 """
 Unit tests for Syllabus Parser (pdfplumber-based)
 """
+import json
 import pytest
 import os
 import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.services.syllabus_service import parse_syllabus_with_pdfplumber
+from backend.services import syllabus_service
+from backend.services.syllabus_service import parse_syllabus_with_pdfplumber, iter_syllabus_subjects
+from benchmarks.syllabus_pdf import build_pdf, make_syllabus_pdf, syllabus_pages
 
 
 class TestPdfPlumberParser:
@@ -87,5 +91,300 @@ class TestPdfPlumberParser:
                 assert len(exp["topic"]) > 5
 
 
+@pytest.fixture(scope="module")
+def pdf():
+    return make_syllabus_pdf(3, experiments_per_page=4)
+
+
+@pytest.fixture(scope="module")
+def client():
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def admin_headers(client):
+    from backend.database import Base, engine, SessionLocal
+    from routers.auth import create_default_admin
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        create_default_admin(db)
+    finally:
+        db.close()
+    token = client.post("/auth/login", json={
+        "email": "admin@labsynk.com", "password": "LABSYNkT3ST!"
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestStreamingParse:
+    """Tests for page-by-page parsing and the streaming upload mode"""
+
+    @pytest.fixture(autouse=True)
+    def result_cache(self, tmp_path, monkeypatch):
+        from core.config import settings
+        from services import syllabus_cache
+        monkeypatch.setattr(settings, "SYLLABUS_CACHE_DIR", str(tmp_path))
+        syllabus_cache.clear()
+        yield syllabus_cache
+        syllabus_cache.clear()
+
+    def _upload(self, client, pdf, **params):
+        return client.post("/syllabus/upload", params=params,
+                           files={"file": ("labs.pdf", pdf, "application/pdf")})
+
+    def test_generator_yields_subjects_per_page(self, pdf):
+        subjects = iter_syllabus_subjects(pdf)
+        first = next(subjects)
+        assert first["page"] == 1 and first["subject"] == "Data Structures Lab"
+        assert len(first["subject_code"]) == 7 and first["experiments"]
+        rest = list(subjects)
+        assert [s["page"] for s in rest] == [2, 3]
+        assert parse_syllabus_with_pdfplumber(pdf)["subjects"] == [first] + rest
+
+    def test_ndjson_stream_matches_buffered_upload(self, client, pdf):
+        response = self._upload(client, pdf, stream="ndjson")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert [e["event"] for e in events] == ["subject"] * 3 + ["done"]
+        streamed = [exp for e in events[:-1] for exp in e["experiments"]]
+        assert [exp["id"] for exp in streamed] == list(range(1, len(streamed) + 1))
+        assert events[-1] == {"event": "done", "subjects": 3, "experiments": len(streamed)}
+
+        buffered = self._upload(client, pdf).json()["experiments"]
+        assert streamed == buffered
+
+    def test_sse_stream(self, client, pdf):
+        response = self._upload(client, pdf, stream="sse")
+        assert response.headers["content-type"].startswith("text/event-stream")
+        blocks = [b for b in response.text.split("\n\n") if b]
+        assert blocks[0].startswith("event: subject\ndata: {")
+        assert blocks[-1].startswith("event: done\n")
+
+    def test_stream_reports_empty_pdf_as_error(self, client):
+        response = self._upload(client, b"not a pdf", stream="ndjson")
+        event = json.loads(response.text.splitlines()[-1])
+        assert event["event"] == "error"
+
+    def test_unknown_stream_mode(self, client, pdf):
+        assert self._upload(client, pdf, stream="xml").status_code == 400
+
+    def test_full_queue_returns_503(self, client, admin_headers, pdf, monkeypatch):
+        import threading
+        from routers import syllabus as syllabus_router
+        from utils.executor import BoundedExecutor
+        busy = BoundedExecutor(workers=1, max_queue=0)
+        monkeypatch.setattr(syllabus_router, "upload_executor", busy)
+        release = threading.Event()
+        busy.submit(release.wait)
+        try:
+            for params in ({}, {"stream": "ndjson"}):
+                response = self._upload(client, pdf, **params)
+                assert response.status_code == 503
+                assert int(response.headers["Retry-After"]) >= 1
+        finally:
+            release.set()
+        assert self._upload(client, pdf).status_code == 200
+        assert client.get("/syllabus/upload/stats").status_code == 401
+        stats = client.get("/syllabus/upload/stats", headers=admin_headers).json()
+        assert stats["counters"]["rejected"] == 2
+        assert stats["histograms"]["wait_ms"]["count"] == 2
+
+    def test_repeat_upload_served_from_cache(self, client, pdf, monkeypatch, result_cache):
+        import threading
+        from routers import syllabus as syllabus_router
+        from utils.executor import BoundedExecutor
+        before = result_cache.stats()["counters"]
+        first = self._upload(client, pdf).json()
+        streamed = self._upload(client, pdf, stream="ndjson").text
+
+        # A full queue doesn't matter: hits never take a worker slot
+        busy = BoundedExecutor(workers=1, max_queue=0)
+        monkeypatch.setattr(syllabus_router, "upload_executor", busy)
+        release = threading.Event()
+        busy.submit(release.wait)
+        try:
+            assert self._upload(client, pdf).json() == first
+            assert self._upload(client, pdf, stream="ndjson").text == streamed
+            result_cache._memory.clear()
+            assert self._upload(client, pdf).json() == first      # from disk
+        finally:
+            release.set()
+        counters = result_cache.stats()["counters"]
+        assert counters["memory_hits"] - before["memory_hits"] == 3
+        assert counters["disk_hits"] - before["disk_hits"] == 1
+
+
+class TestPageCache:
+    """Tests for page-level incremental re-parsing"""
+
+    @pytest.fixture(autouse=True)
+    def fresh(self):
+        syllabus_service._page_cache.clear()
+        yield
+        syllabus_service._page_cache.clear()
+
+    def _count_parses(self, monkeypatch):
+        calls = []
+        real = syllabus_service._parse_pdf_page
+        monkeypatch.setattr(syllabus_service, "_parse_pdf_page",
+                            lambda page: calls.append(page.page_number) or real(page))
+        return calls
+
+    def test_revised_pdf_reparses_changed_pages_only(self, monkeypatch):
+        pages = syllabus_pages(6, experiments_per_page=3)
+        first = parse_syllabus_with_pdfplumber(build_pdf(pages), workers=1)
+        revised = list(pages)
+        revised[3] = (pages[3][0], pages[3][1], pages[3][2] + ["Verify Kirchhoff's laws"])
+        calls = self._count_parses(monkeypatch)
+        result = parse_syllabus_with_pdfplumber(build_pdf(revised), workers=1)
+        assert calls == [4]
+        assert [s["page"] for s in result["subjects"]] == list(range(1, 7))
+        assert result["subjects"][3]["experiments"][-1]["topic"] == "Verify Kirchhoff's laws"
+        assert result["subjects"][:3] == first["subjects"][:3]
+        assert result["subjects"][4:] == first["subjects"][4:]
+
+    def test_reused_pages_are_copies(self):
+        pdf = make_syllabus_pdf(2, experiments_per_page=2)
+        first = parse_syllabus_with_pdfplumber(pdf, workers=1)
+        first["subjects"][0]["experiments"][0]["topic"] = "changed"
+        again = parse_syllabus_with_pdfplumber(pdf, workers=1)
+        assert again["subjects"][0]["experiments"][0]["topic"] != "changed"
+
+    @staticmethod
+    def _nested_form_pdf(heading):
+        """One syllabus page whose heading is drawn by a Form XObject nested three deep."""
+        from benchmarks.syllabus_pdf import _page_stream, _text
+        subject, code, topics = syllabus_pages(1, experiments_per_page=2)[0]
+        table = _page_stream("", code, topics)
+        inner = _text(50, 782, 14, heading).encode("latin-1") + b"\n"
+
+        def form(body, resources):
+            return (f"<< /Type /XObject /Subtype /Form /BBox [0 0 595 842] /Resources {resources} "
+                    f"/Length {len(body)} >>\nstream\n").encode() + body + b"\nendstream"
+
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> /XObject << /X1 6 0 R >> >> /Contents 5 0 R >>",
+            f"<< /Length {len(table) + 7} >>\nstream\n/X1 Do\n".encode() + table + b"\nendstream",
+            form(b"/X2 Do\n", "<< /XObject << /X2 7 0 R >> >>"),
+            form(b"/X3 Do\n", "<< /XObject << /X3 8 0 R >> >>"),
+            form(inner, "<< /Font << /F1 3 0 R >> >>"),
+        ]
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for num, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        out += "".join(f"{off:010d} 00000 n \n" for off in offsets).encode()
+        out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return bytes(out)
+
+    def test_edit_inside_nested_form_is_reparsed(self):
+        first = parse_syllabus_with_pdfplumber(self._nested_form_pdf("Physics Lab"), workers=1)
+        assert first["subjects"][0]["subject"] == "Physics Lab"
+        again = parse_syllabus_with_pdfplumber(self._nested_form_pdf("Optics Lab"), workers=1)
+        assert again["subjects"][0]["subject"] == "Optics Lab"
+
+    def test_too_deep_to_digest_is_always_parsed(self, monkeypatch):
+        monkeypatch.setattr(syllabus_service, "_DIGEST_MAX_DEPTH", 4)
+        pdf = self._nested_form_pdf("Physics Lab")
+        with syllabus_service.pdfplumber.open(syllabus_service.BytesIO(pdf)) as doc:
+            assert syllabus_service._page_digest(doc.pages[0]) is None
+        calls = self._count_parses(monkeypatch)
+        parse_syllabus_with_pdfplumber(pdf, workers=1)
+        parse_syllabus_with_pdfplumber(pdf, workers=1)
+        assert calls == [1, 1]
+
+    def test_parser_version_bump_misses(self, monkeypatch):
+        pdf = make_syllabus_pdf(2, experiments_per_page=2)
+        parse_syllabus_with_pdfplumber(pdf, workers=1)
+        monkeypatch.setattr(syllabus_service, "PARSER_VERSION", syllabus_service.PARSER_VERSION + 1)
+        calls = self._count_parses(monkeypatch)
+        parse_syllabus_with_pdfplumber(pdf, workers=1)
+        assert calls == [1, 2]
+
+
+class TestParallelParse:
+    """Tests for process-pool page parsing"""
+
+    @pytest.fixture(autouse=True)
+    def pool(self, monkeypatch):
+        # A pool of its own for each test, sized from the setting
+        monkeypatch.setattr(syllabus_service.settings, "SYLLABUS_PARSE_WORKERS", 3)
+        monkeypatch.setattr(syllabus_service, "_parse_pool", None)
+        monkeypatch.setattr(syllabus_service, "_parse_pool_workers", 0)
+        yield
+        if syllabus_service._parse_pool is not None:
+            syllabus_service._parse_pool.shutdown()
+
+    def test_parallel_matches_serial(self, monkeypatch):
+        monkeypatch.setattr(syllabus_service.settings, "SYLLABUS_PARALLEL_MIN_PAGES", 4)
+        pdf = make_syllabus_pdf(9, experiments_per_page=3)
+        syllabus_service._page_cache.clear()
+        serial = parse_syllabus_with_pdfplumber(pdf, workers=1)
+        syllabus_service._page_cache.clear()
+        parallel = parse_syllabus_with_pdfplumber(pdf, workers=2)
+        assert [s["page"] for s in parallel["subjects"]] == list(range(1, 10))
+        assert parallel == serial
+        assert syllabus_service._parse_pool_workers == 3
+
+    def test_concurrent_parses_share_the_pool(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        monkeypatch.setattr(syllabus_service.settings, "SYLLABUS_PARALLEL_MIN_PAGES", 4)
+        pdfs = {10: make_syllabus_pdf(10, experiments_per_page=2),
+                12: make_syllabus_pdf(12, experiments_per_page=2, seed=7)}
+        syllabus_service._page_cache.clear()
+        serial = {n: parse_syllabus_with_pdfplumber(pdf, workers=1) for n, pdf in pdfs.items()}
+
+        def parse(n, workers):
+            syllabus_service._page_cache.clear()
+            return n, list(iter_syllabus_subjects(pdfs[n], workers=workers))
+
+        jobs = [(10, 2), (12, 3), (10, 16), (12, 2)] * 2
+        with ThreadPoolExecutor(max_workers=4) as threads:
+            results = list(threads.map(lambda job: parse(*job), jobs))
+        pool = syllabus_service._parse_pool
+        for n, subjects in results:
+            assert subjects == serial[n]["subjects"]
+        assert syllabus_service._get_parse_pool() is pool
+        assert syllabus_service._parse_pool_workers == 3
+
+    def test_parallel_parses_only_changed_pages(self, monkeypatch):
+        monkeypatch.setattr(syllabus_service.settings, "SYLLABUS_PARALLEL_MIN_PAGES", 2)
+        pages = syllabus_pages(9, experiments_per_page=3)
+        syllabus_service._page_cache.clear()
+        parse_syllabus_with_pdfplumber(build_pdf(pages), workers=2)
+        revised = pages[:2] + [(pages[2][0], pages[2][1], ["Verify Ohm's law"])] + pages[3:5] + \
+            [(pages[5][0], "2018999", pages[5][2])] + pages[6:]
+        misses = syllabus_service._page_cache.stats()["misses"]
+        result = parse_syllabus_with_pdfplumber(build_pdf(revised), workers=2)
+        assert syllabus_service._page_cache.stats()["misses"] - misses == 2
+        syllabus_service._page_cache.clear()
+        assert result == parse_syllabus_with_pdfplumber(build_pdf(revised), workers=1)
+
+    def test_small_pdf_stays_serial(self, monkeypatch):
+        def no_pool():
+            raise AssertionError("pool used for a small PDF")
+        monkeypatch.setattr(syllabus_service, "_get_parse_pool", no_pool)
+        monkeypatch.setattr(syllabus_service.settings, "SYLLABUS_PARALLEL_MIN_PAGES", 8)
+        result = parse_syllabus_with_pdfplumber(make_syllabus_pdf(3), workers=4)
+        assert len(result["subjects"]) == 3
+
+    def test_worker_count_setting(self, monkeypatch):
+        monkeypatch.setattr(syllabus_service.settings, "SYLLABUS_PARSE_WORKERS", 3)
+        assert syllabus_service.parse_workers() == 3
+        monkeypatch.setattr(syllabus_service.settings, "SYLLABUS_PARSE_WORKERS", 0)
+        assert syllabus_service.parse_workers() == (os.cpu_count() or 1)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,6 +1,7 @@
 """
 Unit tests for VLabs API endpoints
 """
+import json
 import pytest
 from fastapi.testclient import TestClient
 import sys
@@ -159,5 +160,184 @@ class TestSaveToVLabs:
         assert response.json()["success"] == True
 
 
+class TestRematch:
+    """Tests for bulk re-matching of stored experiments"""
+
+    def _seed(self):
+        import uuid
+        name = f"Rematch College {uuid.uuid4().hex[:8]}"
+        college_id = client.post("/vlabs/colleges", json={"name": name}).json()["id"]
+        dept_id = client.post("/vlabs/departments", json={
+            "name": "CSE", "college_id": college_id
+        }).json()["id"]
+        client.post("/vlabs/save", json={
+            "college_id": college_id,
+            "department_id": dept_id,
+            "semester": 3,
+            "subjects": [{
+                "subject": "Data Structures Lab",
+                "experiments": [{"topic": t, "suggested_simulation": t}
+                                for t in ("Bubble Sort", "Binary Search", "Stack using arrays")],
+            }],
+        })
+        return dept_id
+
+    def test_rematch_serial_then_unchanged(self):
+        from services.vlabs_rematch import rematch_all
+        self._seed()
+        seen = []
+        first = rematch_all(workers=1, chunk_size=2, progress=seen.append, force=True)
+        assert first["processed"] == first["total"] >= 3
+        assert first["recomputed"] >= 3
+        assert seen and seen[-1]["processed"] == first["processed"]
+        again = rematch_all(workers=1, chunk_size=2)
+        assert again["recomputed"] == 0         # every stamp is current
+        assert again["updated"] == 0
+
+    def test_rematch_process_pool(self):
+        from services.vlabs_rematch import rematch_all
+        self._seed()
+        summary = rematch_all(workers=2, chunk_size=2, force=True)
+        assert summary["workers"] == 2
+        assert summary["processed"] == summary["total"]
+        assert summary["updated"] == 0          # same links as the serial path
+
+    def test_hand_edit_during_rematch_is_kept(self):
+        from services import syllabus_service, vlabs_rematch
+        dept_id = self._seed()
+        exp = client.get(f"/vlabs/experiments?department_id={dept_id}").json()[0]
+        version = syllabus_service.simulation_links_version()
+        chunks = vlabs_rematch._iter_chunks(10 ** 6, version, force=True)
+        n_read, rows, current = next(chunks)
+        chunks.close()
+        assert exp["id"] in current
+
+        # Edited by hand while the chunk is being matched
+        manual = [{"source": "Custom", "url": "https://example.com/mid-job", "description": None}]
+        client.put(f"/vlabs/experiments/{exp['id']}", json={"simulation_links": manual, "links_edited": True})
+
+        results = vlabs_rematch.match_rows(rows)
+        written, _ = vlabs_rematch._write_back(results, current)
+        assert written == len(results) - 1
+        served = {e["id"]: e for e in client.get(f"/vlabs/experiments?department_id={dept_id}").json()}
+        assert served[exp["id"]]["simulation_links"] == manual
+
+    def test_stale_stamp_is_recomputed_on_read(self):
+        from database import SessionLocal
+        from models import VLabExperiment, VLabSubject
+        dept_id = self._seed()
+        fresh = client.get(f"/vlabs/experiments?department_id={dept_id}").json()
+
+        db = SessionLocal()
+        try:
+            rows = (db.query(VLabExperiment).join(VLabSubject)
+                    .filter(VLabSubject.department_id == dept_id).all())
+            assert all(r.links_stamp and r.links_stamp != "manual" for r in rows)
+            for r in rows:
+                r.simulation_links = "[]"
+                r.links_stamp = "stale"
+            db.commit()
+        finally:
+            db.close()
+
+        again = client.get(f"/vlabs/experiments?department_id={dept_id}").json()
+        assert [e["simulation_links"] for e in again] == [e["simulation_links"] for e in fresh]
+
+    def test_hand_edited_links_are_kept(self):
+        dept_id = self._seed()
+        exp = client.get(f"/vlabs/experiments?department_id={dept_id}").json()[0]
+        manual = [{"source": "Custom", "url": "https://example.com/sim", "description": None}]
+        client.put(f"/vlabs/experiments/{exp['id']}",
+                   json={"topic": "Quick Sort", "simulation_links": manual, "links_edited": True})
+        served = {e["id"]: e for e in client.get(f"/vlabs/experiments?department_id={dept_id}").json()}
+        assert served[exp["id"]]["simulation_links"] == manual
+
+    def test_reload_during_job_runs_it_again(self, monkeypatch):
+        import threading
+        from services import vlabs_rematch
+        release, calls = threading.Event(), []
+
+        def fake_rematch_all(**kwargs):
+            calls.append(kwargs)
+            release.wait(5)
+            return {"processed": 0, "recomputed": 0, "updated": 0, "rows_per_sec": 0}
+
+        monkeypatch.setattr(vlabs_rematch, "rematch_all", fake_rematch_all)
+        monkeypatch.setattr(vlabs_rematch, "_job", {"status": "idle"})
+        vlabs_rematch.on_catalogue_reload({"reloaded": True})
+        vlabs_rematch.on_catalogue_reload({"reloaded": True})     # lands mid-job
+        release.set()
+        for _ in range(100):
+            if vlabs_rematch.rematch_job_status()["status"] == "done":
+                break
+            threading.Event().wait(0.05)
+        assert vlabs_rematch.rematch_job_status()["status"] == "done"
+        assert len(calls) == 2
+
+    def test_echoed_links_do_not_freeze_row(self):
+        from database import SessionLocal
+        from models import VLabExperiment
+        dept_id = self._seed()
+        loaded = client.get(f"/vlabs/experiments?department_id={dept_id}").json()[0]
+
+        # The stored links change after the edit form loaded (e.g. a background re-match)
+        db = SessionLocal()
+        try:
+            row = db.get(VLabExperiment, loaded["id"])
+            row.simulation_links = json.dumps([{"source": "Newer", "url": "https://example.com/new",
+                                                "description": None}])
+            db.commit()
+        finally:
+            db.close()
+
+        # Topic-only edit, the form's (now outdated) links sent back unchanged
+        updated = client.put(f"/vlabs/experiments/{loaded['id']}", json={
+            "topic": "Quick Sort", "simulation_links": loaded["simulation_links"],
+        }).json()
+        db = SessionLocal()
+        try:
+            assert db.get(VLabExperiment, loaded["id"]).links_stamp != "manual"
+        finally:
+            db.close()
+        fresh = client.post("/vlabs/experiments", json={
+            "subject_id": updated["subject_id"], "topic": "Quick Sort",
+        }).json()
+        assert updated["simulation_links"] == fresh["simulation_links"]
+
+    def test_rematch_endpoint_requires_login(self):
+        assert client.post("/vlabs/catalogue/rematch").status_code == 401
+
+
+class TestCatalogueReload:
+    """Tests for /vlabs/catalogue/reload endpoint"""
+
+    def test_reload_requires_login(self):
+        response = client.post("/vlabs/catalogue/reload")
+        assert response.status_code == 401
+
+
+class TestMatcherStats:
+    """Tests for /vlabs/matcher/stats endpoints"""
+
+    def test_stats_require_login(self):
+        assert client.get("/vlabs/matcher/stats").status_code == 401
+        assert client.post("/vlabs/matcher/stats/reset").status_code == 401
+
+    def test_stats_for_admin(self):
+        from routers.auth import create_default_admin
+        db = SessionLocal()
+        try:
+            create_default_admin(db)
+        finally:
+            db.close()
+        token = client.post("/auth/login", json={
+            "email": "admin@labsynk.com", "password": "LABSYNkT3ST!"
+        }).json()["access_token"]
+        response = client.get("/vlabs/matcher/stats?top_subjects=5",
+                              headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert "counters" in response.json()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+"""
+Tests for the streaming VLabs export ingestion
+"""
+import sys
+import os
+import json
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from services import vlabs_ingest
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DATA = os.path.join(_REPO_ROOT, "backend", "data", "vlabs_experiments.json")
+
+_HEADER = ["Discipline Name", "Discipline URL", "Lab Name", "Lab URL", "PIC",
+           "Experiment Name", "Experiment URL"]
+_ROWS = [
+    ["Physics", "https://vlab.co.in/physics", "Optics Lab", "https://optics.vlabs.ac.in/",
+     "IIT Delhi", "Young's  double slit", "https://optics.vlabs.ac.in/ydse.html"],
+    # Same experiment, different case → duplicate
+    ["physics", "https://vlab.co.in/physics", "OPTICS LAB", "https://optics.vlabs.ac.in/",
+     "IIT Delhi", "Young's double slit", "https://optics.vlabs.ac.in/ydse.html"],
+    ["Physics", "not a url", "Optics Lab", "https://optics.vlabs.ac.in/",
+     "IIT Delhi", "Newton's rings", "https://optics.vlabs.ac.in/rings.html"],
+    ["Physics", "", "Optics Lab", "", "IIT Delhi", "Broken link", "javascript:void(0)"],
+    ["Physics", "", "Optics Lab", "", "IIT Delhi", "", "https://optics.vlabs.ac.in/x.html"],
+]
+
+
+def _write_csv(path):
+    import csv
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([_HEADER] + _ROWS)
+
+
+def _write_html(path):
+    def row(cells, n):
+        tds = "".join(f"<td class=\"s1\"><div>{c.replace('&', '&amp;')}</div></td>" for c in cells)
+        return f"<tr><th class=\"row-headers\">{n}</th>{tds}</tr>"
+    freeze = "<tr><th></th>" + "<td></td>" * 7 + "</tr>"
+    body = row(_HEADER, 1) + freeze + "".join(row(r, i + 2) for i, r in enumerate(_ROWS))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<html><body><table class=\"waffle\"><tbody>{body}</tbody></table></body></html>")
+
+
+class TestIngest:
+
+    @pytest.mark.parametrize("fmt", ["csv", "html"])
+    def test_cleans_validates_and_dedupes(self, tmp_path, fmt):
+        src = str(tmp_path / f"export.{fmt}")
+        (_write_csv if fmt == "csv" else _write_html)(src)
+        out = str(tmp_path / "out.json")
+        stats = vlabs_ingest.ingest(src, out)
+        entries = json.load(open(out))
+        assert [e["experiment_name"] for e in entries] == ["Young's double slit", "Newton's rings"]
+        assert entries[1]["discipline_url"] == ""          # invalid aux URL blanked
+        assert list(entries[0]) == list(vlabs_ingest.FIELDS)
+        assert stats["rows"] == 5
+        assert stats["duplicates"] == 1
+        assert stats["rejected"] == {"missing_field": 1, "invalid_url": 1}
+
+    def test_small_chunks_parse_the_same(self, tmp_path, monkeypatch):
+        src = str(tmp_path / "export.html")
+        _write_html(src)
+        whole = list(vlabs_ingest.iter_rows(src))
+        monkeypatch.setattr(vlabs_ingest, "_CHUNK", 7)
+        assert list(vlabs_ingest.iter_rows(src)) == whole
+
+    def test_unwraps_google_redirects(self):
+        row = dict(zip(vlabs_ingest.FIELDS, ["D", "", "L", "", "", "E",
+                   "https://www.google.com/url?q=https://a.vlabs.ac.in/x%23y&sa=D"]))
+        entry, reason = vlabs_ingest.clean_entry(row)
+        assert reason is None
+        assert entry["experiment_url"] == "https://a.vlabs.ac.in/x%23y"      # as entered
+
+    def test_html_link_cells_keep_href_escapes(self, tmp_path):
+        href = "https://www.google.com/url?q=https://a.vlabs.ac.in/x?d%3D%2520A%26l%3DB&amp;sa=D"
+        cells = ["D", "", "L", "", "", "E",
+                 f'<a href="{href}">https://a.vlabs.ac.in/x?d=%20A&amp;l=B</a>']
+        tds = "".join(f"<td>{c}</td>" for c in cells)
+        head = "".join(f"<td>{c}</td>" for c in _HEADER)
+        src = tmp_path / "export.html"
+        src.write_text(f"<table><tr>{head}</tr><tr>{tds}</tr></table>")
+        (row,) = vlabs_ingest.iter_rows(str(src))
+        entry, _ = vlabs_ingest.clean_entry(row)
+        assert entry["experiment_url"] == "https://a.vlabs.ac.in/x?d%3D%2520A%26l%3DB"
+
+    def test_missing_header_raises(self, tmp_path):
+        src = tmp_path / "export.csv"
+        src.write_text("a,b\n1,2\n")
+        with pytest.raises(ValueError):
+            vlabs_ingest.ingest(str(src), str(tmp_path / "out.json"))
+        assert not (tmp_path / "out.json").exists()
+
+    def test_csv_export_reproduces_data_file(self, tmp_path):
+        src = os.path.join(_REPO_ROOT, "vlabs_experiments.csv")
+        if not os.path.exists(src):
+            pytest.skip("CSV export not present")
+        out = str(tmp_path / "out.json")
+        vlabs_ingest.ingest(src, out)
+        expected, seen = [], set()
+        for e in json.load(open(_DATA)):
+            key = (e["discipline_name"].casefold(), e["lab_name"].casefold(),
+                   e["experiment_name"].casefold(), e["experiment_url"].casefold())
+            if key not in seen:
+                seen.add(key)
+                expected.append(e)
+        with open(out, encoding="utf-8") as f:
+            text = f.read()
+        assert text == json.dumps(expected, indent=2, ensure_ascii=False)
+
+    def test_html_export_keeps_data_file_urls(self, tmp_path):
+        src = os.path.join(_REPO_ROOT, "iib vlabs table.html")
+        if not os.path.exists(src):
+            pytest.skip("HTML export not present")
+        out = str(tmp_path / "out.json")
+        vlabs_ingest.ingest(src, out)
+        stored = json.load(open(_DATA))
+        for field in ("discipline_url", "lab_url", "experiment_url"):
+            urls = {e[field] for e in stored}
+            assert [e[field] for e in json.load(open(out)) if e[field] not in urls] == []
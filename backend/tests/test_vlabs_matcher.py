@@ -3,18 +3,33 @@ Unit tests for VLabs experiment matcher (hierarchical version)
 """
 import sys
 import os
+import threading
+import time
+import pytest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from services import vlabs_matcher
 from services.vlabs_matcher import (
     find_vlabs_link,
     find_all_vlabs_links,
+    find_vlabs_links_batch,
+    match_cache_stats,
+    clear_match_cache,
     _normalize,
     _tokenize,
     _overlap,
+    _score,
+    _score_prepared,
+    _prepare_query,
+    _intern_name,
     _match_discipline,
     _match_labs,
+    _match_experiment,
 )
 
+# The index is built lazily; build it before tests inspect internals directly
+vlabs_matcher.warm_up()
+
 
 class TestNormalization:
     """Tests for text normalization utilities."""
@@ -57,6 +72,264 @@ class TestTokenOverlap:
         assert _overlap(set(), {"a", "b"}) == 0.0
 
 
+class TestPreparedIndex:
+    """Tests for the precomputed name-feature index."""
+
+    def test_catalogue_names_are_preprocessed(self):
+        features = vlabs_matcher._catalogue.features
+        assert "Computer Science & Engineering" in features
+        norm, ids = features["Computer Science & Engineering"]
+        assert norm == "computer science engineering"
+        assert all(isinstance(i, int) for i in ids)
+
+    def test_prepared_score_matches_plain_score(self):
+        pairs = [
+            ("Bubble Sort", "Bubble Sort"),
+            ("Binary Search", "Binary Search Trees"),
+            ("Verify Ohm's law", "Ohm's Law"),
+            ("Heat transfer experiment", "Heat Transfer by Natural Convection"),
+            ("xyzzy foobar", "Data Structures - I (New)"),
+        ]
+        for topic, candidate in pairs:
+            expected = _score(topic, candidate, _tokenize(topic))
+            got = _score_prepared(_prepare_query(topic), _intern_name(candidate))
+            assert abs(expected - got) < 1e-12
+
+
+class TestLazyLoading:
+    """Tests for first-use index construction."""
+
+    def test_concurrent_first_callers_share_one_build(self, monkeypatch):
+        calls = []
+
+        def slow_load():
+            calls.append(1)
+            time.sleep(0.05)
+            return None
+
+        monkeypatch.setattr(vlabs_matcher, "_loaded", False)
+        monkeypatch.setattr(vlabs_matcher, "_read_catalogue", slow_load)
+        threads = [threading.Thread(target=vlabs_matcher._ensure_loaded) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert vlabs_matcher._loaded
+
+    def test_background_warm_up(self):
+        thread = vlabs_matcher.start_background_warm_up()
+        thread.join(timeout=30)
+        assert not thread.is_alive()
+        assert vlabs_matcher._catalogue.index
+
+
+class TestSnapshot:
+    """Tests for the precompiled binary index snapshot."""
+
+    def test_roundtrip_and_hash_check(self, tmp_path, monkeypatch):
+        snapshot_path = str(tmp_path / "vlabs_index.pickle")
+        monkeypatch.setattr(vlabs_matcher, "_SNAPSHOT_PATH", snapshot_path)
+        digest = vlabs_matcher.build_snapshot(snapshot_path=snapshot_path)
+
+        built = vlabs_matcher._read_snapshot(digest)
+        assert built is not None
+        assert set(built["index"]) == set(vlabs_matcher._catalogue.index)
+        assert built["features"]["Computer Science & Engineering"][0] == "computer science engineering"
+
+        assert vlabs_matcher._read_snapshot("0" * 64) is None
+
+    def test_format_change_invalidates(self, tmp_path, monkeypatch):
+        snapshot_path = str(tmp_path / "vlabs_index.pickle")
+        monkeypatch.setattr(vlabs_matcher, "_SNAPSHOT_PATH", snapshot_path)
+        digest = vlabs_matcher.build_snapshot(snapshot_path=snapshot_path)
+        monkeypatch.setattr(vlabs_matcher, "_SNAPSHOT_FORMAT", vlabs_matcher._SNAPSHOT_FORMAT + 1)
+        assert vlabs_matcher._read_snapshot(digest) is None
+
+    def test_code_change_invalidates(self, tmp_path, monkeypatch):
+        snapshot_path = str(tmp_path / "vlabs_index.pickle")
+        monkeypatch.setattr(vlabs_matcher, "_SNAPSHOT_PATH", snapshot_path)
+        digest = vlabs_matcher.build_snapshot(snapshot_path=snapshot_path)
+        monkeypatch.setattr(vlabs_matcher, "_STOP_WORDS", vlabs_matcher._STOP_WORDS | {"sort"})
+        monkeypatch.setattr(vlabs_matcher, "_SNAPSHOT_CODE", vlabs_matcher._snapshot_code())
+        assert vlabs_matcher._read_snapshot(digest) is None
+
+    def test_json_build_writes_snapshot(self, tmp_path, monkeypatch):
+        snapshot_path = str(tmp_path / "vlabs_index.pickle")
+        monkeypatch.setattr(vlabs_matcher, "_SNAPSHOT_PATH", snapshot_path)
+        cat = vlabs_matcher._read_catalogue()
+        built = vlabs_matcher._read_snapshot(cat.version)
+        assert built is not None and set(built["index"]) == set(cat.index)
+
+    def test_missing_snapshot(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(vlabs_matcher, "_SNAPSHOT_PATH", str(tmp_path / "absent.pickle"))
+        assert vlabs_matcher._read_snapshot("anything") is None
+
+
+class TestHotReload:
+    """Tests for reloading an edited catalogue without a restart."""
+
+    @staticmethod
+    def _write(path, url):
+        import json
+        path.write_text(json.dumps([{
+            "discipline_name": "Computer Science & Engineering",
+            "lab_name": "Data Structures Lab",
+            "experiment_name": "Bubble Sort",
+            "experiment_url": url,
+        }]))
+
+    @pytest.fixture
+    def catalogue_file(self, tmp_path, monkeypatch):
+        data_path = tmp_path / "vlabs_experiments.json"
+        self._write(data_path, "https://example.org/v1")
+        monkeypatch.setattr(vlabs_matcher, "_DATA_PATH", str(data_path))
+        monkeypatch.setattr(vlabs_matcher, "_SNAPSHOT_PATH", str(tmp_path / "absent.pickle"))
+        monkeypatch.setattr(vlabs_matcher, "_catalogue", vlabs_matcher._catalogue)
+        clear_match_cache()
+        yield data_path
+        clear_match_cache()
+
+    def test_changed_file_is_swapped_in(self, catalogue_file):
+        old = vlabs_matcher._catalogue
+        status = vlabs_matcher.reload_catalogue()
+        assert status["reloaded"] and status["experiments"] == 1
+        assert vlabs_matcher._catalogue is not old
+        assert find_vlabs_link("Bubble Sort", "Data Structures")["url"] == "https://example.org/v1"
+
+    def test_unchanged_file_is_not_rebuilt(self, catalogue_file):
+        vlabs_matcher.reload_catalogue()
+        current = vlabs_matcher._catalogue
+        assert not vlabs_matcher.reload_catalogue()["reloaded"]
+        os.utime(catalogue_file)                 # touched, same content
+        assert not vlabs_matcher.reload_catalogue()["reloaded"]
+        assert vlabs_matcher._catalogue is current
+
+    def test_reload_invalidates_cached_results(self, catalogue_file):
+        vlabs_matcher.reload_catalogue()
+        assert find_vlabs_link("Bubble Sort", "Data Structures")["url"] == "https://example.org/v1"
+        self._write(catalogue_file, "https://example.org/v2")
+        assert vlabs_matcher.reload_catalogue()["reloaded"]
+        assert find_vlabs_link("Bubble Sort", "Data Structures")["url"] == "https://example.org/v2"
+
+    def test_in_flight_match_keeps_old_catalogue(self, catalogue_file):
+        old = vlabs_matcher._catalogue
+        labs = _match_labs(_match_discipline("Data Structures", cat=old), "Data Structures", cat=old)
+        vlabs_matcher.reload_catalogue()
+        entry = _match_experiment(labs, "Bubble Sort", cat=old)
+        assert entry is not None and entry["experiment_url"] != "https://example.org/v1"
+        assert old.experiment_count() > 1
+
+    def test_reload_invalidates_subject_resolutions(self, catalogue_file):
+        find_vlabs_link("Bubble Sort", "Data Structures")
+        assert vlabs_matcher._subject_cache.stats()["size"] >= 1
+        assert vlabs_matcher.reload_catalogue()["reloaded"]
+        assert vlabs_matcher._subject_cache.stats()["size"] == 0
+
+    def test_listeners_called_on_swap_only(self, catalogue_file, monkeypatch):
+        monkeypatch.setattr(vlabs_matcher, "_reload_listeners", [])
+        seen = []
+        vlabs_matcher.add_reload_listener(seen.append)
+        vlabs_matcher.add_reload_listener(seen.append)
+        vlabs_matcher.reload_catalogue()
+        assert [r["experiments"] for r in seen] == [1]
+        vlabs_matcher.reload_catalogue()
+        assert len(seen) == 1
+
+    def test_broken_file_keeps_active_catalogue(self, catalogue_file):
+        current = vlabs_matcher._catalogue
+        catalogue_file.write_text("{not json")
+        assert not vlabs_matcher.reload_catalogue(force=True)["reloaded"]
+        assert vlabs_matcher._catalogue is current
+
+
+class TestCatalogueShards:
+    """Tests for extra per-source catalogue shards and the fan-out."""
+
+    @staticmethod
+    def _write(path, source, entries):
+        import json
+        path.write_text(json.dumps({"source": source, "experiments": [
+            {"discipline_name": disc, "lab_name": lab, "experiment_name": name,
+             "experiment_url": url}
+            for disc, lab, name, url in entries
+        ]}))
+
+    @pytest.fixture
+    def shard_dir(self, tmp_path, monkeypatch):
+        self._write(tmp_path / "phet.json", "PhET Simulations", [
+            ("Physics", "Physics Simulations", "Ohm's Law", "https://phet.example/ohms-law"),
+            ("Physics", "Physics Simulations", "Projectile Motion", "https://phet.example/projectile"),
+        ])
+        self._write(tmp_path / "olabs.json", "OLabs", [
+            ("Physics", "Physics Lab", "Verify Ohm's law", "https://olabs.example/ohm"),
+        ])
+        monkeypatch.setattr(vlabs_matcher, "_CATALOGUE_DIR", str(tmp_path))
+        monkeypatch.setattr(vlabs_matcher, "_shards", {})
+        vlabs_matcher.reload_catalogue()
+        yield tmp_path
+        clear_match_cache()
+
+    def test_best_hit_per_source(self, shard_dir):
+        links = vlabs_matcher.find_source_links_batch(
+            ["Ohm's law verification", "Projectile motion", "xyzzy foobar"], "Physics")
+        assert [l["source"] for l in links[0]] == ["OLabs", "PhET Simulations"]
+        assert [l["url"] for l in links[1]] == ["https://phet.example/projectile"]
+        assert links[2] == []
+
+    def test_serial_and_concurrent_fan_out_agree(self, shard_dir, monkeypatch):
+        topics = ["Ohm's law", "Projectile motion"]
+        monkeypatch.setattr(vlabs_matcher.settings, "VLABS_SHARD_WORKERS", 2)
+        concurrent = vlabs_matcher.find_source_links_batch(topics, "Physics")
+        clear_match_cache()
+        monkeypatch.setattr(vlabs_matcher.settings, "VLABS_SHARD_WORKERS", 1)
+        assert vlabs_matcher.find_source_links_batch(topics, "Physics") == concurrent
+
+    def test_fan_out_threads_only_with_sparse_backend(self, shard_dir, monkeypatch):
+        monkeypatch.setattr(vlabs_matcher.settings, "VLABS_SHARD_WORKERS", 0)
+        monkeypatch.setattr(vlabs_matcher, "_backend", "python")
+        assert vlabs_matcher._shard_workers() == 1
+
+        def no_pool():
+            raise AssertionError("thread pool used for a GIL-bound backend")
+        monkeypatch.setattr(vlabs_matcher, "_get_fanout_pool", no_pool)
+        assert vlabs_matcher.find_source_links_batch(["Ohm's law"], "Physics")[0]
+        monkeypatch.setattr(vlabs_matcher, "_backend", "sparse")
+        assert vlabs_matcher._shard_workers() == 4
+
+    def test_shards_do_not_touch_main_results(self, shard_dir):
+        link = find_vlabs_link("Bubble Sort", "Data Structures")
+        assert link["source"] == "IIT VLabs"
+        assert vlabs_matcher.matcher_stats()["counters"]["lookups"] >= 1
+
+    def test_reload_adds_changes_and_drops_shards(self, shard_dir):
+        status = vlabs_matcher.reload_catalogue()
+        assert not status["reloaded"]
+        assert status["shards"] == {"OLabs": 1, "PhET Simulations": 2}
+
+        self._write(shard_dir / "phet.json", "PhET Simulations", [
+            ("Physics", "Physics Simulations", "Ohm's Law", "https://phet.example/ohms-law-v2"),
+        ])
+        (shard_dir / "olabs.json").unlink()
+        status = vlabs_matcher.reload_catalogue()
+        assert status["reloaded"] and status["shards"] == {"PhET Simulations": 1}
+        links = vlabs_matcher.find_source_links_batch(["Ohm's law"], "Physics")[0]
+        assert links == [{"source": "PhET Simulations", "url": "https://phet.example/ohms-law-v2",
+                          "description": "Simulation: Ohm's Law (Physics Simulations)"}]
+
+    def test_broken_shard_is_skipped(self, shard_dir):
+        (shard_dir / "broken.json").write_text("{not json")
+        assert vlabs_matcher.reload_catalogue()["shards"] == {"OLabs": 1, "PhET Simulations": 2}
+
+    def test_direct_hit_replaces_search_link(self, shard_dir):
+        from services import syllabus_service
+        links = syllabus_service.get_simulation_links("Projectile motion", "Physics")
+        phet = [l for l in links if l["source"] == "PhET Simulations"]
+        assert phet == [{"source": "PhET Simulations", "url": "https://phet.example/projectile",
+                         "description": "Simulation: Projectile Motion (Physics Simulations)"}]
+        assert any(l["source"] == "OLabs" and "search" in l["url"] for l in links)
+
+
 class TestDisciplineMatching:
     """Tests for Stage 1 – discipline resolution."""
 
@@ -93,6 +366,139 @@ class TestLabMatching:
         assert len(labs) >= 1
 
 
+class TestExperimentPruning:
+    """Tests for Stage 3 postings-based pruning."""
+
+    @staticmethod
+    def _full_scan(labs, topic, threshold=0.30):
+        query = _prepare_query(topic)
+        best_score, best_entry = 0.0, None
+        for entries in labs.values():
+            for entry in entries:
+                s = _score_prepared(query, _intern_name(entry.get("experiment_name", "")))
+                if s > best_score:
+                    best_score, best_entry = s, entry
+        return best_entry if best_entry and best_score >= threshold else None
+
+    def test_bounded_score_exact_or_pruned(self):
+        query = _prepare_query("Heat transfer experiment")
+        for name in ["Heat Transfer by Natural Convection", "Bubble Sort", "Ohm's Law"]:
+            feat = _intern_name(name)
+            exact = _score_prepared(query, feat)
+            overlap = _overlap(_tokenize("Heat transfer experiment"), _tokenize(name))
+            assert vlabs_matcher._bounded_score(query[0], feat[0], overlap, 0.0) == exact
+            floor = exact + 0.01
+            assert vlabs_matcher._bounded_score(query[0], feat[0], overlap, floor) < floor
+
+    def test_postings_built(self):
+        postings = vlabs_matcher._catalogue.postings
+        assert postings
+        token_id = _prepare_query("sort")[1]
+        assert token_id and any(postings.get(t) for t in token_id)
+
+    def test_pruned_matches_full_scan_on_all_labs(self):
+        all_labs = {}
+        for labs in vlabs_matcher._catalogue.index.values():
+            all_labs.update(labs)
+        for topic in ["Verify Ohm's law", "Bubble Sort", "Binary Search",
+                      "xyzzy foobar", "Inverting Amplifier", "Heat exchanger"]:
+            assert _match_experiment(all_labs, topic) is self._full_scan(all_labs, topic)
+
+
+class TestSparseBackendParity:
+    """The sparse backend must return the same picks as the python scorer."""
+
+    CASES = [
+        ("Bubble Sort", "Data Structures"),
+        ("Binary Search", "Data Structures Lab"),
+        ("xyzzy foobar nonsense placeholder", ""),
+        ("Inverting Amplifier", "Electronics and Analog Circuits"),
+        ("Verify Ohm's law", "Lab Practice"),
+        ("Heat transfer experiment", "Thermodynamics Lab"),
+        ("Stack using arrays", ""),
+        ("!!!", "Physics"),
+    ]
+
+    @pytest.fixture
+    def sparse_backend(self, monkeypatch):
+        pytest.importorskip("scipy")
+        monkeypatch.setattr(vlabs_matcher, "_backend", "sparse")
+        assert vlabs_matcher._get_sparse_scorer() is not None
+        clear_match_cache()
+        yield
+        clear_match_cache()
+
+    def test_same_picks_as_python_scorer(self, sparse_backend, monkeypatch):
+        sparse_results = [find_vlabs_link(t, s) for t, s in self.CASES]
+        monkeypatch.setattr(vlabs_matcher, "_backend", "python")
+        clear_match_cache()
+        python_results = [find_vlabs_link(t, s) for t, s in self.CASES]
+        assert sparse_results == python_results
+
+    def test_batch_matches_python_scan(self, sparse_backend):
+        all_labs = {}
+        for labs in vlabs_matcher._catalogue.index.values():
+            all_labs.update(labs)
+        topics = [t for t, _ in self.CASES]
+        batch = vlabs_matcher._match_experiments(all_labs, topics)
+        assert batch == [vlabs_matcher._scan_experiment(all_labs, t, 0.30) for t in topics]
+
+
+    def test_pool_bounds_use_pool_columns_only(self, sparse_backend):
+        import numpy as np
+        scorer = vlabs_matcher._get_sparse_scorer()
+        queries = [_prepare_query(t) for t, _ in self.CASES]
+        every = scorer.upper_bounds(queries, np.arange(len(scorer.names)))
+        cols = np.array([5, 0, len(scorer.names) - 1, 17])
+        assert scorer.upper_bounds(queries, cols).shape == (len(queries), 4)
+        assert np.array_equal(scorer.upper_bounds(queries, cols), every[:, cols])
+
+class TestLSHBackend:
+    """The approximate LSH backend against the exhaustive scan."""
+
+    @pytest.fixture
+    def lsh(self, monkeypatch):
+        monkeypatch.setattr(vlabs_matcher, "_backend", "lsh")
+        lsh = vlabs_matcher._get_lsh_index()
+        assert lsh is not None
+        clear_match_cache()
+        yield lsh
+        clear_match_cache()
+
+    @staticmethod
+    def _all_labs():
+        all_labs = {}
+        for labs in vlabs_matcher._catalogue.index.values():
+            all_labs.update(labs)
+        return all_labs
+
+    def test_catalogue_name_is_its_own_candidate(self, lsh):
+        index, locations = lsh
+        for name in list(locations)[:200]:
+            q_norm, q_ids, _ = _prepare_query(name)
+            assert name in index.candidates(vlabs_matcher._words(q_norm), q_ids)
+
+    def test_same_picks_on_common_topics(self, lsh):
+        all_labs = self._all_labs()
+        for topic in TestSparseBackendParity.CASES:
+            assert vlabs_matcher._match_experiments(all_labs, [topic[0]])[0] is \
+                vlabs_matcher._scan_experiment(all_labs, topic[0], 0.30)
+
+    def test_recall_against_scan(self, lsh):
+        from benchmarks.workload import make_topics
+        all_labs = self._all_labs()
+        found = agree = 0
+        for topic in make_topics(150, seed=7):
+            expected = vlabs_matcher._scan_experiment(all_labs, topic, 0.30)
+            got = vlabs_matcher._lsh_experiment(lsh, all_labs, topic, 0.30)
+            if expected is None:
+                assert got is None          # re-ranking is exact: no invented matches
+            else:
+                found += 1
+                agree += got is expected
+        assert found and agree / found >= 0.9
+
+
 class TestFindVLabsLink:
     """Tests for the main hierarchical matching function."""
 
@@ -134,6 +540,116 @@ class TestFindVLabsLink:
             assert result["source"] == "IIT VLabs"
 
 
+class TestFindVLabsLinksBatch:
+    """Tests for the per-subject batch API."""
+
+    def test_batch_matches_single_calls(self):
+        topics = ["Bubble Sort", "Binary Search", "xyzzy nonsense", "Stack using arrays"]
+        batch = find_vlabs_links_batch(topics, subject_name="Data Structures Lab")
+        assert batch == [find_vlabs_link(t, "Data Structures Lab") for t in topics]
+
+    def test_blank_topics_keep_positions(self):
+        batch = find_vlabs_links_batch(["", "Bubble Sort", "   "], subject_name="Data Structures")
+        assert len(batch) == 3
+        assert batch[0] is None and batch[2] is None
+        assert batch[1] is not None
+
+    def test_empty_batch(self):
+        assert find_vlabs_links_batch([], subject_name="Physics") == []
+
+
+class TestMatchCache:
+    """Tests for the LRU result cache in front of find_vlabs_link."""
+
+    def setup_method(self):
+        clear_match_cache()
+
+    def test_repeat_lookup_hits_cache(self):
+        before = match_cache_stats()
+        first = find_vlabs_link("Bubble Sort", subject_name="Data Structures")
+        second = find_vlabs_link("bubble  sort!", subject_name="data structures")
+        after = match_cache_stats()
+        assert first == second
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+
+    def test_no_match_is_cached(self):
+        assert find_vlabs_link("xyzzy foobar nonsense") is None
+        hits = match_cache_stats()["hits"]
+        assert find_vlabs_link("xyzzy foobar nonsense") is None
+        assert match_cache_stats()["hits"] == hits + 1
+
+    def test_result_is_safe_to_mutate(self):
+        result = find_vlabs_link("Bubble Sort", subject_name="Data Structures")
+        url = result["url"]
+        result["url"] = "mutated"
+        assert find_vlabs_link("Bubble Sort", subject_name="Data Structures")["url"] == url
+
+    def test_clear_empties_cache(self):
+        find_vlabs_link("Bubble Sort", subject_name="Data Structures")
+        assert match_cache_stats()["size"] >= 1
+        clear_match_cache()
+        assert match_cache_stats()["size"] == 0
+
+
+class TestSubjectCache:
+    """Tests for the per-subject Stage 1/2 resolution cache."""
+
+    SUBJECTS = ["Data Structures Lab", "Analog Electronics", "Fluid Mechanics",
+                "xyzzy gibberish subject", "", "Lab Practice"]
+
+    def setup_method(self):
+        clear_match_cache()
+
+    def test_pool_matches_uncached_stages(self):
+        cat = vlabs_matcher._catalogue
+        for subject in self.SUBJECTS:
+            expected = _match_labs(_match_discipline(subject), subject)
+            for _ in range(2):          # miss, then hit
+                pool = vlabs_matcher._resolve_subject(subject, cat)
+                assert list(pool) == list(expected)
+                assert all(pool[lab] is expected[lab] for lab in pool)
+
+    def test_known_subject_skips_stage_1_and_2(self, monkeypatch):
+        first = find_vlabs_link("Bubble Sort", "Data Structures")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Stage 1/2 ran for a cached subject")
+        monkeypatch.setattr(vlabs_matcher, "_match_discipline", fail)
+        monkeypatch.setattr(vlabs_matcher, "_match_labs", fail)
+        assert find_vlabs_link("Binary Search", "data structures!") is not None
+        assert find_vlabs_link("Bubble Sort", "Data Structures") == first
+
+    def test_persisted_resolutions_are_preloaded(self, monkeypatch):
+        import models
+        from database import SessionLocal, engine
+        models.Base.metadata.create_all(bind=engine)
+        monkeypatch.setattr(vlabs_matcher, "_subject_persist", True)
+        cat = vlabs_matcher._catalogue
+
+        db = SessionLocal()
+        try:
+            db.merge(models.VLabSubjectResolution(subject_key="old subject", version="0:stale",
+                                                  labs="[]"))
+            db.commit()
+        finally:
+            db.close()
+
+        pool = vlabs_matcher._resolve_subject("Heat Transfer Lab", cat)
+        clear_match_cache()
+        vlabs_matcher._preload_subjects(cat)
+        assert vlabs_matcher._subject_cache.stats()["size"] >= 1
+        cached = vlabs_matcher._subject_cache.get((cat.version, "heat transfer lab"))
+        assert list(cached[0]) == list(pool)
+
+        db = SessionLocal()
+        try:
+            keys = {row.subject_key for row in db.query(models.VLabSubjectResolution)}
+        finally:
+            db.close()
+        assert "heat transfer lab" in keys and "old subject" not in keys
+
+
 class TestFindAllVLabsLinks:
     """Tests for the multi-result wrapper."""
 
@@ -149,6 +665,149 @@ class TestFindAllVLabsLinks:
         results = find_all_vlabs_links("xyzzy nonsense")
         assert results == []
 
+    def test_top_k_sorted_distinct_and_scored(self):
+        results = find_all_vlabs_links("Sort", subject_name="Data Structures", max_results=5)
+        assert 1 < len(results) <= 5
+        scores = [r["score"] for r in results]
+        assert scores == sorted(scores, reverse=True)
+        assert all(s >= 0.30 for s in scores)
+        assert len({r["url"] for r in results}) == len(results)
+
+    def test_first_result_is_best_link(self):
+        for topic, subject in [("Bubble Sort", "Data Structures"),
+                               ("Verify Ohm's law", "Lab Practice"),
+                               ("Binary Search", "Data Structures Lab")]:
+            best = find_vlabs_link(topic, subject)
+            top = find_all_vlabs_links(topic, subject, max_results=3)
+            assert {k: v for k, v in top[0].items() if k != "score"} == best
+
+    def test_top_k_matches_full_ranking(self):
+        all_labs = {}
+        for labs in vlabs_matcher._catalogue.index.values():
+            all_labs.update(labs)
+        for topic in ["Verify Ohm's law", "Binary Search", "Heat exchanger", "Sort"]:
+            query = _prepare_query(topic)
+            ranked, seen = [], set()
+            scored = [
+                (_score_prepared(query, _intern_name(e["experiment_name"])), -pos, e)
+                for pos, e in enumerate(e for es in all_labs.values() for e in es)
+            ]
+            for s, _, e in sorted(scored, key=lambda t: t[:2], reverse=True):
+                if s >= 0.30 and e["experiment_url"] not in seen:
+                    seen.add(e["experiment_url"])
+                    ranked.append((e, s))
+            top = vlabs_matcher._scan_top_k(all_labs, topic, 4)
+            assert [e for e, _ in top] == [e for e, _ in ranked[:4]]
+            assert [s for _, s in top] == pytest.approx([s for _, s in ranked[:4]])
+
+    def test_max_results_zero(self):
+        assert find_all_vlabs_links("Bubble Sort", "Data Structures", max_results=0) == []
+
+
+class TestMatcherStats:
+    """Tests for the per-stage funnel instrumentation."""
+
+    @pytest.fixture(autouse=True)
+    def fresh(self):
+        clear_match_cache()
+        vlabs_matcher.reset_matcher_stats()
+        yield
+        clear_match_cache()
+
+    def test_records_stages_and_outcome(self):
+        find_vlabs_link("Bubble Sort", "Data Structures")
+        stats = vlabs_matcher.matcher_stats()
+        assert stats["counters"]["lookups"] == 1
+        assert stats["counters"]["matched"] == 1
+        assert stats["counters"]["discipline_fallback"] == 0
+        for name in ("discipline_ms", "lab_ms", "experiment_ms", "experiment_scored"):
+            assert stats["histograms"][name]["count"] == 1
+        # keyword hint → no discipline scored
+        assert stats["histograms"]["discipline_scored"]["max"] == 0
+
+    def test_fallback_subjects_are_tallied(self):
+        find_vlabs_link("xyzzy foobar nonsense placeholder", "")
+        find_vlabs_link("Heat exchanger", "")
+        stats = vlabs_matcher.matcher_stats()
+        assert stats["counters"]["discipline_fallback"] == 2
+        assert stats["counters"]["unmatched"] >= 1
+        assert stats["fallback_subjects"] == [{"subject": "", "count": 2}]
+        assert stats["histograms"]["experiment_pool"]["max"] == vlabs_matcher._catalogue.experiment_count()
+
+    def test_cache_hits_skip_stage_histograms(self):
+        find_vlabs_link("Bubble Sort", "Data Structures")
+        find_vlabs_link("Bubble Sort", "Data Structures")
+        stats = vlabs_matcher.matcher_stats()
+        assert stats["counters"]["lookups"] == 2
+        assert stats["counters"]["cache_hits"] == 1
+        assert stats["histograms"]["lab_ms"]["count"] == 1
+
+    def test_known_subject_skips_stage_histograms(self):
+        find_vlabs_link("Bubble Sort", "Data Structures")
+        find_vlabs_link("Binary Search", "Data Structures")
+        stats = vlabs_matcher.matcher_stats()
+        assert stats["counters"]["subject_cache_hits"] == 1
+        assert stats["histograms"]["lab_ms"]["count"] == 1
+        assert stats["histograms"]["experiment_ms"]["count"] == 2
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(vlabs_matcher, "_metrics_enabled", False)
+        find_vlabs_link("Bubble Sort", "Data Structures")
+        assert vlabs_matcher.matcher_stats()["counters"]["lookups"] == 0
+
+
+class TestSimulationLinks:
+    """Tests for the memoized link lists built around matcher results."""
+
+    @pytest.fixture(autouse=True)
+    def fresh(self):
+        from services import syllabus_service
+        syllabus_service._links_cache.clear()
+        yield syllabus_service
+        syllabus_service._links_cache.clear()
+
+    def test_memoized_and_read_only(self, fresh):
+        links = fresh.get_simulation_links("Bubble Sort", "Data Structures")
+        assert fresh.get_simulation_links("Bubble Sort", "Data Structures") is links
+        assert isinstance(links, tuple)
+        with pytest.raises(TypeError):
+            links[0]["url"] = "https://example.com"
+        batch = fresh.get_simulation_links_batch(["Bubble Sort", "Linked List", "Bubble Sort"],
+                                                 "Data Structures")
+        assert batch[0] is links and batch[2] is links
+
+    def test_version_change_misses(self, fresh, monkeypatch):
+        links = fresh.get_simulation_links("Bubble Sort", "Data Structures")
+        monkeypatch.setattr(fresh, "LINKS_FORMAT", fresh.LINKS_FORMAT + 1)
+        again = fresh.get_simulation_links("Bubble Sort", "Data Structures")
+        assert again is not links and again == links
+
+    def test_reset_after_fork_drops_held_locks(self, fresh, monkeypatch):
+        # As in a forked rematch worker: a parent thread held the locks at fork time
+        monkeypatch.setattr(fresh, "_links_cache", fresh._links_cache)
+        monkeypatch.setattr(fresh, "_subject_languages", fresh._subject_languages)
+        held = [fresh._links_cache._lock, fresh._subject_languages._lock]
+        for lock in held:
+            lock.acquire()
+        try:
+            fresh.reset_after_fork()
+            assert fresh.get_simulation_links("Bubble Sort", "Data Structures")
+        finally:
+            for lock in held:
+                lock.release()
+
+    def test_subject_language_wins(self, fresh):
+        links = fresh.get_simulation_links("Calling C++ from scripts", "Python Programming")
+        assert "Programiz (Python)" in [l["source"] for l in links]
+        links = fresh.get_simulation_links("Arrays", "Programming in C")
+        assert "Programiz (C)" in [l["source"] for l in links]
+        links = fresh.get_simulation_links("Write a java program", "Object Oriented Lab")
+        assert "Programiz (Java)" in [l["source"] for l in links]
+
+    def test_generic_links_for_science_topics(self, fresh):
+        sources = [l["source"] for l in fresh.get_simulation_links("Ohm law", "Basic Electrical")]
+        assert sources[-4:] == ["PhET Simulations", "Virtual Labs India", "OLabs", "Search on YouTube"]
+
 
 if __name__ == "__main__":
     import pytest
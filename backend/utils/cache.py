@@ -0,0 +1,90 @@
+"""
+Caching utilities - size-bounded, thread-safe LRU with hit/miss statistics
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+# Returned by get() when the key is absent and no default is given
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Least-recently-used mapping bounded to `capacity` entries.
+    A capacity of 0 disables caching (every get is a miss, puts are dropped).
+    Safe to share between request threads.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(0, int(capacity))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.capacity:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def resize(self, capacity: int) -> None:
+        with self._lock:
+            self.capacity = max(0, int(capacity))
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FrozenDict(dict):
+    """
+    A dict that rejects mutation, for values handed out of a shared cache:
+    callers can read, serialise and copy it, but not change what the next
+    caller gets.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
@@ -0,0 +1,94 @@
+"""
+Executor utilities - a thread pool with a bounded queue and wait-time metrics
+"""
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from utils.metrics import COUNT_BUCKETS, LATENCY_MS_BUCKETS, MetricSet
+
+
+class QueueFull(Exception):
+    """Raised by BoundedExecutor.submit when every worker is busy and the queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"queue full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    ThreadPoolExecutor that admits at most `workers` running plus
+    `max_queue` waiting tasks; submit() raises QueueFull beyond that instead
+    of queueing without limit. Records how long tasks waited for a worker,
+    how long they ran and the queue depth each one found (see stats()).
+    """
+
+    def __init__(self, workers: int, max_queue: int, name: str = "bounded"):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._metrics = MetricSet(
+            histograms={"wait_ms": LATENCY_MS_BUCKETS, "run_ms": LATENCY_MS_BUCKETS,
+                        "queue_depth": COUNT_BUCKETS},
+            counters=("submitted", "rejected", "completed", "failed"),
+        )
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: mean run time × queue length per worker."""
+        run = self._metrics.snapshot(top=0)["histograms"]["run_ms"]
+        with self._lock:
+            waiting = self._queued + 1
+        return max(1, min(60, math.ceil(run["mean"] / 1000 * waiting / self.workers)))
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            admitted = self._queued + self._running < self.workers + self.max_queue
+            if admitted:
+                depth = self._queued
+                self._queued += 1
+        if not admitted:
+            self._metrics.record({"rejected": 1})
+            raise QueueFull(self.retry_after())
+        self._metrics.record({"submitted": 1}, {"queue_depth": depth})
+        return self._pool.submit(self._run, time.perf_counter(), fn, args, kwargs)
+
+    def _run(self, queued_at: float, fn: Callable, args, kwargs) -> Any:
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._metrics.record(
+                {"failed" if failed else "completed": 1},
+                {"wait_ms": (started - queued_at) * 1000,
+                 "run_ms": (time.perf_counter() - started) * 1000},
+            )
+
+    def stats(self) -> Dict:
+        """Current load plus counters and wait / run / queue-depth histograms since start."""
+        snapshot = self._metrics.snapshot(top=0)
+        with self._lock:
+            load = {"running": self._running, "queued": self._queued}
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            **load,
+            "counters": snapshot["counters"],
+            "histograms": snapshot["histograms"],
+        }
+
+    def reset_stats(self) -> None:
+        self._metrics.reset()
@@ -0,0 +1,84 @@
+"""
+Keyword classification utilities - ordered keyword tables compiled to one regex
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Regex source matching any of keywords, factored as a prefix trie so
+    the engine follows one branch per character instead of trying every
+    alternative at every offset. Optional tails are greedy, so a match is
+    the longest keyword starting at that offset.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    """
+    Maps text to the label of the highest-priority keyword it contains.
+
+    Semantics match the loop
+
+        for keyword, label in table:
+            if keyword in text:
+                return label
+
+    i.e. plain substring tests, and table order wins over position in text.
+    One compiled trie regex rejects texts without any keyword in a single
+    search(). On a hit, the matched keyword bounds the answer's table
+    index, and only the (usually few) higher-priority keywords are checked.
+    """
+
+    def __init__(self, table: Iterable[Tuple[str, Any]]):
+        self.keywords: List[str] = []
+        self.labels: List[Any] = []
+        first_index: Dict[str, int] = {}
+        for keyword, label in table:
+            first_index.setdefault(keyword, len(self.keywords))
+            self.keywords.append(keyword)
+            self.labels.append(label)
+        # Every keyword that is a prefix of a matched keyword also occurs in
+        # the text, so a match stands for the best index among its prefixes.
+        self._bound = {
+            k: min(i for p, i in first_index.items() if k.startswith(p))
+            for k in first_index
+        }
+        self._pattern = re.compile(_trie_pattern(first_index)) if self.keywords else None
+
+    def first_index(self, text: str) -> Optional[int]:
+        """Table index of the highest-priority keyword in text, or None."""
+        if self._pattern is None:
+            return None
+        match = self._pattern.search(text)
+        if match is None:
+            return None
+        bound = self._bound[match.group(0)]
+        for index in range(bound):
+            if self.keywords[index] in text:
+                return index
+        return bound
+
+    def classify(self, text: str, default: Any = None) -> Any:
+        """Label of the highest-priority keyword in text, or default."""
+        index = self.first_index(text)
+        return default if index is None else self.labels[index]
+
+    def matches(self, text: str) -> bool:
+        """True if any keyword occurs in text."""
+        return self._pattern is not None and self._pattern.search(text) is not None
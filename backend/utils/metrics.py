@@ -0,0 +1,104 @@
+"""
+Metrics utilities - in-process counters and fixed-bucket histograms
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+# Bucket upper bounds for latencies in milliseconds and for small counts
+LATENCY_MS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """
+    Counts observations into fixed buckets (upper bounds, plus an overflow
+    bucket). Not locked itself — MetricSet serialises access.
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (max if overflow)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 4),
+            "buckets": {
+                **{str(b): n for b, n in zip(self.bounds, self.counts)},
+                "+inf": self.counts[-1],
+            },
+        }
+
+
+class MetricSet:
+    """
+    Named counters and histograms behind one lock. record() applies a whole
+    call's worth of updates in a single acquisition, so instrumented code
+    pays one lock round-trip per call rather than one per metric.
+
+    `tally` is a bounded per-key counter (e.g. subject names that triggered
+    a slow path): once it holds `tally_capacity` keys, new keys are dropped
+    while known ones keep counting.
+    """
+
+    def __init__(self, histograms: Mapping[str, Sequence[float]],
+                 counters: Iterable[str] = (), tally_capacity: int = 200):
+        self._lock = threading.Lock()
+        self._bounds = dict(histograms)
+        self._counter_names = tuple(counters)
+        self._tally_capacity = tally_capacity
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters: Dict[str, int] = dict.fromkeys(self._counter_names, 0)
+            self.histograms = {name: Histogram(b) for name, b in self._bounds.items()}
+            self.tally: Dict[str, int] = {}
+
+    def record(self, counters: Optional[Mapping[str, int]] = None,
+               observations: Optional[Mapping[str, float]] = None,
+               tally: Optional[str] = None) -> None:
+        with self._lock:
+            if counters:
+                for name, n in counters.items():
+                    self.counters[name] = self.counters.get(name, 0) + n
+            if observations:
+                for name, value in observations.items():
+                    self.histograms[name].observe(value)
+            if tally is not None and (tally in self.tally or len(self.tally) < self._tally_capacity):
+                self.tally[tally] = self.tally.get(tally, 0) + 1
+
+    def snapshot(self, top: int = 20) -> Dict:
+        with self._lock:
+            ranked: List = sorted(self.tally.items(), key=lambda kv: -kv[1])[:top]
+            return {
+                "counters": dict(self.counters),
+                "histograms": {name: h.snapshot() for name, h in self.histograms.items()},
+                "tally": [{"key": k, "count": n} for k, n in ranked],
+            }
@@ -714,7 +714,8 @@ const LabsTab = ({ colleges, departments, showMessage }) => {
                 unit: exp.unit || '',
                 description: exp.description || '',
                 suggested_simulation: exp.suggested_simulation || '',
-                links: exp.simulation_links?.length ? exp.simulation_links : [{ source: 'IIT Bombay', url: '' }]
+                links: exp.simulation_links?.length ? exp.simulation_links.map(l => ({ ...l })) : [{ source: 'IIT Bombay', url: '' }],
+                linksEdited: false
             });
             setShowAddExperiment(null);
         } else {
@@ -733,7 +734,9 @@ const LabsTab = ({ colleges, departments, showMessage }) => {
             unit: parseInt(expForm.unit) || null,
             description: expForm.description,
             suggested_simulation: expForm.suggested_simulation,
-            simulation_links: links
+            simulation_links: links,
+            // Only hand-edited links are kept; otherwise the server recomputes them
+            links_edited: !!expForm.linksEdited
         };
         try {
             if (editingExperiment) {
@@ -929,12 +932,12 @@ const LabsTab = ({ colleges, departments, showMessage }) => {
                                                             <div key={idx} className="flex gap-2">
                                                                 <input value={link.url} onChange={e => {
                                                                     const newLinks = [...expForm.links];
-                                                                    newLinks[idx].url = e.target.value;
-                                                                    setExpForm({ ...expForm, links: newLinks });
+                                                                    newLinks[idx] = { ...newLinks[idx], url: e.target.value };
+                                                                    setExpForm({ ...expForm, links: newLinks, linksEdited: true });
                                                                 }} placeholder="https://..." className="input-field flex-1" />
                                                                 {idx > 0 && <button onClick={() => {
                                                                     const newLinks = expForm.links.filter((_, i) => i !== idx);
-                                                                    setExpForm({ ...expForm, links: newLinks });
+                                                                    setExpForm({ ...expForm, links: newLinks, linksEdited: true });
                                                                 }} className="text-red-400 p-2"><Trash2 size={16} /></button>}
                                                             </div>
                                                         ))}